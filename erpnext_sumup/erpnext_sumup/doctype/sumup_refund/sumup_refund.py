@@ -0,0 +1,138 @@
+# Copyright (c) 2025, RocketQuackIT and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Sum
+from frappe.utils import flt, now_datetime
+
+REFUND_DOCTYPE = "SumUp Refund"
+REFUND_JOB_METHOD = "erpnext_sumup.erpnext_sumup.pos.pos_invoice_refund.process_sumup_refund"
+REFUND_OPEN_STATUSES = ("Queued", "Processing")
+REFUND_COUNTED_STATUSES = (*REFUND_OPEN_STATUSES, "Successful")
+# sumup_refund_status of the return invoice for each refund status.
+REFUND_INVOICE_STATUSES = {
+	"Queued": "PENDING",
+	"Processing": "PENDING",
+	"Successful": "SUCCESSFUL",
+	"Failed": "FAILED",
+}
+
+
+class SumUpRefund(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index(REFUND_DOCTYPE, ["return_against", "status"])
+	frappe.db.add_index(REFUND_DOCTYPE, ["status", "next_attempt_at"])
+
+
+def get_refund_idempotency_key(return_invoice: str, transaction_id: str, amount) -> str:
+	message = f"{return_invoice}|{transaction_id}|{flt(amount):.6f}"
+	return hashlib.sha256(message.encode("utf-8")).hexdigest()
+
+
+def get_refund_totals(return_against: str, *, exclude_return: str | None = None) -> dict[str, float]:
+	"""Sum the refunds of `return_against` per status, leaving out failed ones."""
+	table = frappe.qb.DocType(REFUND_DOCTYPE)
+	query = (
+		frappe.qb.from_(table)
+		.select(table.status, Sum(table.amount))
+		.where((table.return_against == return_against) & table.status.isin(REFUND_COUNTED_STATUSES))
+		.groupby(table.status)
+	)
+	if exclude_return:
+		query = query.where(table.return_invoice != exclude_return)
+	return {status: flt(total) for status, total in query.run()}
+
+
+def get_refund_status(return_invoice: str, transaction_id: str, amount) -> str | None:
+	key = get_refund_idempotency_key(return_invoice, transaction_id, amount)
+	return frappe.db.get_value(REFUND_DOCTYPE, {"idempotency_key": key}, "status")
+
+
+def get_recorded_refund(return_invoice: str):
+	"""Return the latest refund of a return invoice that has not failed, if any."""
+	rows = frappe.get_all(
+		REFUND_DOCTYPE,
+		filters={"return_invoice": return_invoice, "status": ["!=", "Failed"]},
+		fields=["name", "status", "amount", "transaction_id"],
+		order_by="creation desc",
+		limit=1,
+	)
+	return rows[0] if rows else None
+
+
+def _get_or_insert_refund(*, return_invoice, return_against, transaction_id, amount, currency, status) -> str:
+	key = get_refund_idempotency_key(return_invoice, transaction_id, amount)
+	name = frappe.db.get_value(REFUND_DOCTYPE, {"idempotency_key": key})
+	if name:
+		return name
+
+	return (
+		frappe.get_doc(
+			{
+				"doctype": REFUND_DOCTYPE,
+				"return_invoice": return_invoice,
+				"return_against": return_against,
+				"transaction_id": transaction_id,
+				"amount": amount,
+				"currency": currency,
+				"status": status,
+				"idempotency_key": key,
+				"next_attempt_at": now_datetime(),
+			}
+		)
+		# Submitting a new return runs before_submit before the invoice row exists.
+		.insert(ignore_permissions=True, ignore_links=True)
+		.name
+	)
+
+
+def queue_sumup_refund(
+	*, return_invoice, return_against, transaction_id, amount, currency=None, retry_failed=False
+) -> str:
+	"""Record a refund intent in the current transaction and send it once that commits.
+
+	Writing the row together with the return invoice means a refund is queued if and only
+	if the return is submitted; the job only runs after the commit. With `retry_failed`, a
+	failed refund is queued again with a fresh set of attempts.
+	"""
+	name = _get_or_insert_refund(
+		return_invoice=return_invoice,
+		return_against=return_against,
+		transaction_id=transaction_id,
+		amount=amount,
+		currency=currency,
+		status="Queued",
+	)
+	if retry_failed:
+		_requeue_failed_refund(name)
+	enqueue_sumup_refund(name)
+	return name
+
+
+def _requeue_failed_refund(name: str):
+	# Locked, so two retries of the same refund cannot both move it back to Queued.
+	if frappe.db.get_value(REFUND_DOCTYPE, name, "status", for_update=True) != "Failed":
+		return
+
+	frappe.db.set_value(
+		REFUND_DOCTYPE,
+		name,
+		{"status": "Queued", "attempts": 0, "next_attempt_at": now_datetime(), "last_error": None},
+	)
+
+
+def enqueue_sumup_refund(name: str):
+	frappe.enqueue(
+		REFUND_JOB_METHOD,
+		queue="short",
+		job_id=f"sumup_refund::{name}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		refund=name,
+	)
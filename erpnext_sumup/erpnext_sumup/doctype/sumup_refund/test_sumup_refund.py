@@ -0,0 +1,102 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_sumup.erpnext_sumup.doctype.sumup_refund import sumup_refund
+
+
+def _insert_refund(*, return_invoice, return_against="TEST-INV", amount=12.5, status, attempts=0):
+	return (
+		frappe.get_doc(
+			{
+				"doctype": sumup_refund.REFUND_DOCTYPE,
+				"return_invoice": return_invoice,
+				"return_against": return_against,
+				"transaction_id": "TX-1",
+				"amount": amount,
+				"status": status,
+				"attempts": attempts,
+				"idempotency_key": sumup_refund.get_refund_idempotency_key(return_invoice, "TX-1", amount),
+			}
+		)
+		.insert(ignore_permissions=True, ignore_links=True)
+		.name
+	)
+
+
+class TestSumUpRefund(FrappeTestCase):
+	def test_idempotency_key_depends_on_return_transaction_and_amount(self):
+		key = sumup_refund.get_refund_idempotency_key("RET-1", "TX-1", 10)
+
+		self.assertEqual(key, sumup_refund.get_refund_idempotency_key("RET-1", "TX-1", 10.0))
+		self.assertNotEqual(key, sumup_refund.get_refund_idempotency_key("RET-2", "TX-1", 10))
+		self.assertNotEqual(key, sumup_refund.get_refund_idempotency_key("RET-1", "TX-2", 10))
+		self.assertNotEqual(key, sumup_refund.get_refund_idempotency_key("RET-1", "TX-1", 10.5))
+
+	def test_queue_inserts_one_row_per_refund(self):
+		return_invoice = f"TEST-RET-{frappe.generate_hash(length=8)}"
+		return_against = f"TEST-INV-{frappe.generate_hash(length=8)}"
+		kwargs = {
+			"return_invoice": return_invoice,
+			"return_against": return_against,
+			"transaction_id": "TX-1",
+			"amount": 12.5,
+		}
+		with patch.object(sumup_refund.frappe, "enqueue") as enqueue:
+			first = sumup_refund.queue_sumup_refund(**kwargs)
+			second = sumup_refund.queue_sumup_refund(**kwargs)
+
+		self.assertEqual(first, second)
+		self.assertEqual(frappe.db.count(sumup_refund.REFUND_DOCTYPE, {"return_invoice": return_invoice}), 1)
+		self.assertEqual(enqueue.call_args.kwargs["job_id"], f"sumup_refund::{first}")
+		self.assertTrue(enqueue.call_args.kwargs["enqueue_after_commit"])
+		self.assertEqual(sumup_refund.get_refund_totals(return_against), {"Queued": 12.5})
+		self.assertEqual(sumup_refund.get_refund_totals(return_against, exclude_return=return_invoice), {})
+
+	def test_recorded_refund_ignores_failed_attempts(self):
+		return_invoice = f"TEST-RET-{frappe.generate_hash(length=8)}"
+		name = _insert_refund(return_invoice=return_invoice, status="Failed")
+		self.assertIsNone(sumup_refund.get_recorded_refund(return_invoice))
+
+		frappe.db.set_value(sumup_refund.REFUND_DOCTYPE, name, "status", "Successful")
+
+		self.assertEqual(sumup_refund.get_recorded_refund(return_invoice).name, name)
+		self.assertEqual(sumup_refund.get_refund_status(return_invoice, "TX-1", 12.5), "Successful")
+
+	def test_retry_requeues_only_failed_refunds(self):
+		return_invoice = f"TEST-RET-{frappe.generate_hash(length=8)}"
+		name = _insert_refund(return_invoice=return_invoice, status="Failed", attempts=5)
+		kwargs = {
+			"return_invoice": return_invoice,
+			"return_against": "TEST-INV",
+			"transaction_id": "TX-1",
+			"amount": 12.5,
+			"retry_failed": True,
+		}
+		with patch.object(sumup_refund.frappe, "enqueue") as enqueue:
+			self.assertEqual(sumup_refund.queue_sumup_refund(**kwargs), name)
+
+		row = frappe.db.get_value(sumup_refund.REFUND_DOCTYPE, name, ["status", "attempts"], as_dict=True)
+		self.assertEqual((row.status, row.attempts), ("Queued", 0))
+		enqueue.assert_called_once()
+
+		frappe.db.set_value(sumup_refund.REFUND_DOCTYPE, name, "status", "Processing")
+		with patch.object(sumup_refund.frappe, "enqueue"):
+			sumup_refund.queue_sumup_refund(**kwargs)
+		self.assertEqual(frappe.db.get_value(sumup_refund.REFUND_DOCTYPE, name, "status"), "Processing")
+
+	def test_refund_totals_leave_out_failed_refunds(self):
+		return_against = f"TEST-INV-{frappe.generate_hash(length=8)}"
+		for amount, status in ((10, "Successful"), (5, "Successful"), (7, "Queued"), (20, "Failed")):
+			_insert_refund(
+				return_invoice=f"TEST-RET-{frappe.generate_hash(length=8)}",
+				return_against=return_against,
+				amount=amount,
+				status=status,
+			)
+
+		self.assertEqual(sumup_refund.get_refund_totals(return_against), {"Successful": 15, "Queued": 7})
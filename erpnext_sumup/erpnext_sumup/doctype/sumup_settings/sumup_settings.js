@@ -1,6 +1,37 @@
 // Copyright (c) 2025, RocketQuackIT and contributors
 // For license information, please see license.txt
 
+const show_api_metrics = () => {
+	frappe.call({
+		method: "erpnext_sumup.erpnext_sumup.integrations.sumup_metrics.get_sumup_call_metrics",
+		callback: (response) => {
+			const operations = (response.message && response.message.operations) || [];
+			if (!operations.length) {
+				frappe.msgprint(__("No SumUp API calls recorded yet."));
+				return;
+			}
+
+			const format_ms = (value) => (value === null || value === undefined ? "-" : `${value} ms`);
+			const body = operations
+				.map((row) => {
+					const label = frappe.utils.escape_html(row.operation);
+					return `<tr><td>${label}</td><td>${row.count}</td><td>${row.error_rate}%</td><td>${format_ms(
+						row.p50
+					)}</td><td>${format_ms(row.p95)}</td><td>${format_ms(row.p99)}</td></tr>`;
+				})
+				.join("");
+
+			frappe.msgprint({
+				title: __("SumUp API Metrics (Last 24 Hours)"),
+				message: `<table class="table table-bordered"><thead><tr><th>${__("Operation")}</th><th>${__(
+					"Calls"
+				)}</th><th>${__("Errors")}</th><th>p50</th><th>p95</th><th>p99</th></tr></thead><tbody>${body}</tbody></table>`,
+				wide: true,
+			});
+		},
+	});
+};
+
 const update_settings_buttons = (frm) => {
 	frm.clear_custom_buttons();
 
@@ -26,6 +57,10 @@ const update_settings_buttons = (frm) => {
 		});
 	});
 
+	if (frm.doc.enable_api_metrics) {
+		frm.add_custom_button(__("API Metrics"), show_api_metrics);
+	}
+
 	if (!frm.doc.enabled) {
 		return;
 	}
@@ -51,6 +86,18 @@ const update_settings_buttons = (frm) => {
 			},
 		});
 	});
+
+	frm.add_custom_button(__("Reconcile Pending Payments"), () => {
+		frappe.call({
+			method: "erpnext_sumup.erpnext_sumup.pos.pos_invoice_reconciliation.reconcile_pending_sumup_payments_now",
+			freeze: true,
+			freeze_message: __("Checking pending payments..."),
+			callback: (response) => {
+				const message = response.message && response.message.message;
+				frappe.msgprint(message || __("Pending payments checked."));
+			},
+		});
+	});
 };
 
 frappe.ui.form.on("SumUp Settings", {
@@ -60,4 +107,7 @@ frappe.ui.form.on("SumUp Settings", {
 	enabled(frm) {
 		update_settings_buttons(frm);
 	},
+	enable_api_metrics(frm) {
+		update_settings_buttons(frm);
+	},
 });
@@ -4,14 +4,15 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
+from frappe.utils import cint
 
 from erpnext_sumup.erpnext_sumup.integrations.sumup_client import (
-	extract_merchant_currency,
+	clear_merchant_facts_cache,
+	clear_sumup_client_cache,
+	clear_sumup_settings_cache,
+	get_merchant_facts,
 	normalize_api_key,
 )
-from erpnext_sumup.erpnext_sumup.integrations.sumup_client import (
-	fetch_merchant_profile as fetch_sumup_merchant_profile,
-)
 
 
 class SumUpSettings(Document):
@@ -19,6 +20,11 @@ class SumUpSettings(Document):
 		self._set_merchant_code_on_enable()
 		self._validate_affiliate_settings()
 
+	def on_update(self):
+		clear_sumup_settings_cache()
+		clear_sumup_client_cache()
+		clear_merchant_facts_cache()
+
 	def _validate_affiliate_settings(self):
 		if not self.enabled:
 			return
@@ -38,8 +44,23 @@ class SumUpSettings(Document):
 		if not (self.merchant_code or "").strip():
 			frappe.throw(_("Merchant code is required in SumUp Settings."))
 
+	def _store_merchant_currency(self, merchant_currency, api_key):
+		if not merchant_currency or merchant_currency == self.merchant_currency:
+			return
+		# The currency of an unsaved key is only set in the form and stored when the key is saved.
+		if normalize_api_key(api_key) != normalize_api_key(
+			self.get_password("api_key", raise_exception=False)
+		):
+			return
+
+		self.db_set("merchant_currency", merchant_currency)
+		# db_set skips on_update, so drop the settings snapshot that still holds the old currency.
+		clear_sumup_settings_cache()
+
 	@frappe.whitelist()
 	def fetch_merchant_code(self, api_key=None, force=0):
+		# An unsaved key typed into the form may belong to another account, so skip the cache for it.
+		force = cint(force) or bool(normalize_api_key(api_key))
 		api_key = normalize_api_key(api_key) or self.get_password("api_key")
 		if not api_key:
 			frappe.throw(_("SumUp API key is missing in SumUp Settings."))
@@ -48,13 +69,9 @@ class SumUpSettings(Document):
 		if not merchant_code:
 			frappe.throw(_("Merchant code is required in SumUp Settings."))
 
-		profile = fetch_sumup_merchant_profile(
-			api_key=api_key,
-			merchant_code=merchant_code,
-		)
-		merchant_currency = extract_merchant_currency(profile)
-		if merchant_currency:
-			self.db_set("merchant_currency", merchant_currency)
+		facts = get_merchant_facts(api_key=api_key, merchant_code=merchant_code, force=force)
+		merchant_currency = facts.get("currency")
+		self._store_merchant_currency(merchant_currency, api_key)
 
 		return {
 			"merchant_code": merchant_code,
@@ -72,14 +89,10 @@ class SumUpSettings(Document):
 		if not merchant_code:
 			frappe.throw(_("Merchant code is required in SumUp Settings."))
 
-		profile = fetch_sumup_merchant_profile(
-			api_key=api_key,
-			merchant_code=merchant_code,
-		)
-		merchant_currency = extract_merchant_currency(profile)
-
-		if merchant_currency:
-			self.db_set("merchant_currency", merchant_currency)
+		# A connection test must reach SumUp, so it always refreshes the cached merchant facts.
+		facts = get_merchant_facts(api_key=api_key, merchant_code=merchant_code, force=True)
+		merchant_currency = facts.get("currency")
+		self._store_merchant_currency(merchant_currency, api_key)
 
 		message = _("Connection successful.")
 		message = _("Connection successful. Merchant code: {0}").format(merchant_code)
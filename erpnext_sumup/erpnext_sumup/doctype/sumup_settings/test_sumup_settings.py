@@ -1,8 +1,12 @@
 # Copyright (c) 2025, RocketQuackIT and Contributors
 # See license.txt
 
+from unittest.mock import patch
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from erpnext_sumup.erpnext_sumup.doctype.sumup_settings import sumup_settings
 from erpnext_sumup.erpnext_sumup.integrations.sumup_client import (
 	extract_merchant_code,
 	extract_merchant_currency,
@@ -74,3 +78,18 @@ class TestSumUpSettings(FrappeTestCase):
 	def test_extract_merchant_currency_missing(self):
 		self.assertIsNone(extract_merchant_currency({}))
 		self.assertIsNone(extract_merchant_currency(object()))
+
+	def test_merchant_currency_is_stored_only_for_saved_key(self):
+		doc = frappe.new_doc("SumUp Settings")
+		with (
+			patch.object(doc, "get_password", return_value="sk_saved"),
+			patch.object(doc, "db_set") as db_set,
+			patch.object(sumup_settings, "clear_sumup_settings_cache") as clear_snapshot,
+		):
+			doc._store_merchant_currency("CHF", "sk_other")
+			db_set.assert_not_called()
+
+			doc._store_merchant_currency("CHF", "sk_saved")
+
+		db_set.assert_called_once_with("merchant_currency", "CHF")
+		clear_snapshot.assert_called_once()
@@ -6,15 +6,42 @@ import re
 import frappe
 from frappe import _
 from frappe.model.document import Document
+from frappe.utils import cint, now_datetime
 
+from erpnext_sumup.erpnext_sumup.doctype.sumup_terminal_status_log.sumup_terminal_status_log import (
+	STATUS_LOG_DOCTYPE,
+	log_terminal_status_transitions,
+)
 from erpnext_sumup.erpnext_sumup.integrations.sumup_client import (
+	call_sumup,
+	get_max_parallel_requests,
 	get_sumup_client,
 	get_sumup_settings,
+	map_sumup_calls,
+)
+from erpnext_sumup.erpnext_sumup.integrations.sumup_fields import (
+	compile_fields,
+	dump_model,
+	get_next_page_params,
 )
+from erpnext_sumup.erpnext_sumup.pos.pos_profile import clear_profile_terminal_cache
+
+TERMINAL_STATUS_FIELDS = ("connection_status", "online_status", "activity_status")
+RECOVERY_MAX_PAGES = 100
+TERMINAL_REMOVAL_MAX_ATTEMPTS = 10
+_READER_FIELDS = compile_fields({"id": ("id",), "status": ("status",), "name": ("name",)})
 
 
 class SumUpTerminal(Document):
-	pass
+	def on_update(self):
+		clear_profile_terminal_cache()
+
+	def after_rename(self, old, new, merge=False):
+		clear_profile_terminal_cache()
+
+	def on_trash(self):
+		frappe.db.delete(STATUS_LOG_DOCTYPE, {"terminal": self.name})
+		clear_profile_terminal_cache()
 
 
 def _normalize_pairing_code(pairing_code: str | None) -> str:
@@ -37,56 +64,21 @@ def _normalize_terminal_name(terminal_name: str | None) -> str:
 
 
 def _as_dict(value):
-	if isinstance(value, dict):
-		return value
+	data = dump_model(value)
+	return data if isinstance(data, dict) else {}
 
-	model_dump = getattr(value, "model_dump", None)
-	if callable(model_dump):
-		try:
-			return model_dump()
-		except TypeError:
-			return model_dump(exclude_none=True)
-
-	as_dict = getattr(value, "dict", None)
-	if callable(as_dict):
-		try:
-			return as_dict()
-		except TypeError:
-			return as_dict(exclude_none=True)
 
-	return {}
+def _extract_reader_fields(reader) -> dict:
+	values = _READER_FIELDS.resolve(reader)
+	for key, value in values.items():
+		if value is not None and not isinstance(value, str):
+			values[key] = str(value)
+	return values
 
 
 def _extract_reader_data(reader):
-	reader_id = getattr(reader, "id", None)
-	status = getattr(reader, "status", None)
-
-	reader_data = _as_dict(reader)
-	if not reader_id:
-		reader_id = reader_data.get("id")
-	if not status:
-		status = reader_data.get("status")
-
-	if reader_id is not None and not isinstance(reader_id, str):
-		reader_id = str(reader_id)
-	if status is not None and not isinstance(status, str):
-		status = str(status)
-
-	return reader_id, status
-
-
-def _extract_reader_name(reader):
-	name = getattr(reader, "name", None)
-	if name:
-		return str(name)
-
-	reader_data = _as_dict(reader)
-	if isinstance(reader_data, dict):
-		value = reader_data.get("name")
-		if value:
-			return str(value)
-
-	return None
+	values = _extract_reader_fields(reader)
+	return values["id"], values["status"]
 
 
 def _parse_terminal_names(value):
@@ -232,15 +224,14 @@ def _extract_reader_items(list_response):
 
 
 def _fetch_reader_status_index(client, merchant_code: str) -> dict[str, str]:
-	response = client.readers.list(merchant_code)
+	response = call_sumup("readers.list", client.readers.list, merchant_code)
 	items = _extract_reader_items(response)
 	index: dict[str, str] = {}
 
 	for item in items:
-		item_id = getattr(item, "id", None) or _as_dict(item).get("id")
-		item_status = getattr(item, "status", None) or _as_dict(item).get("status")
+		item_id, item_status = _extract_reader_data(item)
 		if item_id:
-			index[str(item_id)] = item_status
+			index[item_id] = item_status
 
 	return index
 
@@ -261,27 +252,51 @@ def _get_status_context(*, throw_on_missing: bool = True):
 	return get_sumup_client(require_enabled=False), merchant_code
 
 
-def _get_linked_pos_profiles(terminal_name: str | None) -> list[str]:
-	if not terminal_name:
-		return []
+def _get_linked_pos_profiles(terminal_names: list[str]) -> dict[str, list[str]]:
+	"""Return the POS Profiles linked to each of `terminal_names`, fetched in one query."""
+	if not terminal_names:
+		return {}
 
 	try:
 		meta = frappe.get_meta("POS Profile")
 	except Exception:
-		return []
+		return {}
 
 	if not meta.has_field("sumup_terminal"):
-		return []
+		return {}
 
-	return frappe.get_all("POS Profile", filters={"sumup_terminal": terminal_name}, pluck="name")
+	linked = {}
+	for row in frappe.get_all(
+		"POS Profile",
+		filters={"sumup_terminal": ["in", list(terminal_names)]},
+		fields=["name", "sumup_terminal"],
+		order_by="name asc",
+	):
+		linked.setdefault(row.sumup_terminal, []).append(row.name)
+	return linked
+
+
+def _get_linked_profiles_error(terminal_name: str, linked_profiles: list[str]) -> str:
+	return _("Cannot remove terminal {0} because it is linked to POS Profile(s): {1}.").format(
+		terminal_name, ", ".join(linked_profiles)
+	)
+
+
+def _delete_reader(client, merchant_code: str, terminal_id: str):
+	try:
+		call_sumup("readers.delete", client.readers.delete, merchant_code, terminal_id)
+	except Exception as exc:
+		# Already gone upstream, e.g. removed by an earlier attempt whose response was lost.
+		if getattr(exc, "status", None) != 404:
+			raise
 
 
 def _fetch_terminal_status_payload(client, merchant_code: str, terminal_id: str) -> dict:
-	status_response = client.readers.get_status(merchant_code, terminal_id)
+	status_response = call_sumup("readers.get_status", client.readers.get_status, merchant_code, terminal_id)
 	return _extract_status_payload(status_response)
 
 
-def _update_terminal_statuses(client, merchant_code: str, terminal: dict, reader_index=None):
+def _fetch_terminal_statuses(client, merchant_code: str, terminal: dict, reader_index=None):
 	terminal_id = terminal.get("terminal_id") or terminal.get("name")
 	errors = []
 	connection_status = "Unknown"
@@ -314,24 +329,40 @@ def _update_terminal_statuses(client, merchant_code: str, terminal: dict, reader
 	):
 		raise errors[0]["error"]
 
-	frappe.db.set_value(
-		"SumUp Terminal",
-		terminal.get("name") or terminal_id,
-		"connection_status",
-		connection_status,
-	)
-	frappe.db.set_value(
-		"SumUp Terminal",
-		terminal.get("name") or terminal_id,
-		"activity_status",
-		activity_status,
-	)
-	frappe.db.set_value(
-		"SumUp Terminal",
-		terminal.get("name") or terminal_id,
-		"online_status",
-		online_status,
+	return connection_status, online_status, activity_status, errors
+
+
+def _get_terminal_status_changes(terminal: dict, connection_status, online_status, activity_status) -> dict:
+	values = {
+		"connection_status": connection_status,
+		"online_status": online_status,
+		"activity_status": activity_status,
+	}
+	return {field: value for field, value in values.items() if terminal.get(field) != value}
+
+
+def _apply_terminal_statuses(terminal: dict, connection_status, online_status, activity_status) -> dict:
+	changes = _get_terminal_status_changes(terminal, connection_status, online_status, activity_status)
+	if changes:
+		frappe.db.set_value("SumUp Terminal", terminal.get("name") or terminal.get("terminal_id"), changes)
+		log_terminal_status_transitions([(terminal, changes)])
+	return changes
+
+
+def _apply_terminal_status_updates(transitions: list[tuple[dict, dict]]):
+	updates = {terminal.get("name"): changes for terminal, changes in transitions if changes}
+	if not updates:
+		return
+
+	frappe.db.bulk_update("SumUp Terminal", updates)
+	log_terminal_status_transitions(transitions)
+
+
+def _update_terminal_statuses(client, merchant_code: str, terminal: dict, reader_index=None):
+	connection_status, online_status, activity_status, errors = _fetch_terminal_statuses(
+		client, merchant_code, terminal, reader_index=reader_index
 	)
+	_apply_terminal_statuses(terminal, connection_status, online_status, activity_status)
 	return connection_status, online_status, activity_status, errors
 
 
@@ -374,7 +405,7 @@ def pair_terminal(
 	)
 
 	try:
-		reader = client.readers.create(merchant_code, payload)
+		reader = call_sumup("readers.create", client.readers.create, merchant_code, payload)
 	except Exception as exc:
 		status = getattr(exc, "status", None)
 		body = getattr(exc, "body", None)
@@ -452,7 +483,7 @@ def refresh_terminal_status(*, terminal_name: str | None = None):
 	terminal = frappe.db.get_value(
 		"SumUp Terminal",
 		terminal_name,
-		["name", "terminal_id"],
+		["name", "terminal_id", *TERMINAL_STATUS_FIELDS],
 		as_dict=True,
 	)
 	if not terminal:
@@ -496,7 +527,7 @@ def refresh_terminal_statuses(*, terminal_names=None, throw_on_missing: bool = T
 	terminals = frappe.get_all(
 		"SumUp Terminal",
 		filters=filters,
-		fields=["name", "terminal_id"],
+		fields=["name", "terminal_id", *TERMINAL_STATUS_FIELDS],
 	)
 
 	if not terminals:
@@ -509,6 +540,7 @@ def refresh_terminal_statuses(*, terminal_names=None, throw_on_missing: bool = T
 	updated = []
 	failed = []
 	debug_details = []
+	status_transitions = []
 	reader_index = None
 
 	try:
@@ -517,11 +549,23 @@ def refresh_terminal_statuses(*, terminal_names=None, throw_on_missing: bool = T
 		if debug_enabled:
 			debug_details.append({"name": "readers.list", "error": _format_sumup_error(exc)})
 
-	for terminal in terminals:
+	# Reader statuses are fetched concurrently; database writes happen afterwards on this thread.
+	results = map_sumup_calls(
+		lambda terminal: _fetch_terminal_statuses(client, merchant_code, terminal, reader_index=reader_index),
+		terminals,
+		max_workers=get_max_parallel_requests(settings),
+	)
+
+	for terminal, (statuses, fetch_error) in zip(terminals, results, strict=True):
 		try:
-			connection_status, online_status, activity_status, errors = _update_terminal_statuses(
-				client, merchant_code, terminal, reader_index=reader_index
+			if fetch_error is not None:
+				raise fetch_error
+			connection_status, online_status, activity_status, errors = statuses
+			changes = _get_terminal_status_changes(
+				terminal, connection_status, online_status, activity_status
 			)
+			if changes:
+				status_transitions.append((terminal, changes))
 			updated.append(
 				{
 					"name": terminal.get("name"),
@@ -554,6 +598,8 @@ def refresh_terminal_statuses(*, terminal_names=None, throw_on_missing: bool = T
 					title=_("SumUp terminal status update failed"),
 				)
 
+	_apply_terminal_status_updates(status_transitions)
+
 	message = _("Updated {0} terminal(s).").format(len(updated))
 	if failed:
 		message = _("Updated {0} terminal(s), {1} failed.").format(len(updated), len(failed))
@@ -571,8 +617,126 @@ def refresh_terminal_statuses_hourly():
 	refresh_terminal_statuses(throw_on_missing=False)
 
 
+def _fetch_all_readers(client, merchant_code: str) -> tuple[list, bool]:
+	"""Return the readers of every page and whether the listing was cut short.
+
+	Pages after the first follow the `next` link; the listing is truncated when a `next` link
+	is left after `RECOVERY_MAX_PAGES` pages or cannot be followed without an HTTP client.
+	"""
+	response = call_sumup("readers.list", client.readers.list, merchant_code)
+	items = list(_extract_reader_items(response))
+	params = get_next_page_params(response)
+	http_client = getattr(client, "_client", None)
+	for _page in range(RECOVERY_MAX_PAGES - 1):
+		if not params or http_client is None:
+			break
+		page = call_sumup(
+			"readers.list",
+			http_client.get,
+			f"/v0.1/merchants/{merchant_code}/readers",
+			params=params,
+		)
+		if page.status_code != 200:
+			raise frappe.ValidationError(
+				_("SumUp API error: {0}{1}").format(page.status_code, f" {page.text}" if page.text else "")
+			)
+
+		payload = page.json() or {}
+		page_items = payload.get("items") or []
+		items.extend(page_items)
+		params = get_next_page_params(payload) if page_items else None
+
+	return items, bool(params)
+
+
+def _diff_terminals(readers: list[dict], local_rows: list[dict], *, complete: bool = True) -> dict:
+	"""Compare SumUp readers with local terminals by terminal_id.
+
+	Returns the readers to create, the terminals to rename, to mark as missing in SumUp or
+	to restore, and the unchanged ones. Readers listed twice are only counted once. Terminals
+	are only marked as missing when `readers` is the `complete` listing.
+	"""
+	upstream = {}
+	for reader in readers:
+		upstream.setdefault(reader["terminal_id"], reader)
+	local_index = {row["terminal_id"]: row for row in local_rows}
+
+	diff = {"create": [], "rename": [], "orphan": [], "restore": [], "unchanged": []}
+	for terminal_id, reader in upstream.items():
+		row = local_index.get(terminal_id)
+		if not row:
+			diff["create"].append(reader)
+			continue
+
+		terminal_name = (row.get("terminal_name") or "").strip()
+		if reader["terminal_name"] and reader["terminal_name"] != terminal_name:
+			diff["rename"].append({**reader, "name": row["name"]})
+		elif not row.get("missing_in_sumup"):
+			diff["unchanged"].append({"name": row["name"], "terminal_id": terminal_id})
+		if row.get("missing_in_sumup"):
+			diff["restore"].append({"name": row["name"], "terminal_id": terminal_id})
+
+	for row in local_rows if complete else []:
+		if row["terminal_id"] not in upstream and not row.get("missing_in_sumup"):
+			diff["orphan"].append({"name": row["name"], "terminal_id": row["terminal_id"]})
+
+	return diff
+
+
+def _apply_terminal_diff(diff: dict):
+	if diff["create"]:
+		now = now_datetime()
+		user = frappe.session.user
+		frappe.db.bulk_insert(
+			"SumUp Terminal",
+			fields=[
+				"name",
+				"terminal_id",
+				"terminal_name",
+				"enabled",
+				*TERMINAL_STATUS_FIELDS,
+				"missing_in_sumup",
+				"docstatus",
+				"owner",
+				"modified_by",
+				"creation",
+				"modified",
+			],
+			values=[
+				(
+					reader["terminal_id"],
+					reader["terminal_id"],
+					reader["terminal_name"],
+					1,
+					*(["Unknown"] * len(TERMINAL_STATUS_FIELDS)),
+					0,
+					0,
+					user,
+					user,
+					now,
+					now,
+				)
+				for reader in diff["create"]
+			],
+			ignore_duplicates=True,
+		)
+
+	updates = {}
+	for row in diff["rename"]:
+		updates[row["name"]] = {"terminal_name": row["terminal_name"]}
+	for row in diff["orphan"]:
+		updates.setdefault(row["name"], {})["missing_in_sumup"] = 1
+	for row in diff["restore"]:
+		updates.setdefault(row["name"], {})["missing_in_sumup"] = 0
+	if updates:
+		frappe.db.bulk_update("SumUp Terminal", updates)
+	if diff["create"]:
+		# Bulk writes skip the controller hooks; profiles may already point at a recovered terminal.
+		clear_profile_terminal_cache()
+
+
 @frappe.whitelist()
-def recover_terminals_from_sumup():
+def recover_terminals_from_sumup(dry_run=0):
 	settings = get_sumup_settings()
 	if not settings.enabled:
 		frappe.throw(_("SumUp is disabled in settings."))
@@ -584,92 +748,76 @@ def recover_terminals_from_sumup():
 	if not merchant_code:
 		frappe.throw(_("Merchant code is missing in SumUp Settings."))
 
+	dry_run = bool(cint(dry_run))
 	client = get_sumup_client(require_enabled=False)
 	try:
-		response = client.readers.list(merchant_code)
+		items, truncated = _fetch_all_readers(client, merchant_code)
 	except Exception as exc:
 		frappe.throw(_("SumUp API error: {0}").format(exc))
 
-	items = _extract_reader_items(response)
-	if not items:
-		return {
-			"created": [],
-			"updated": [],
-			"skipped": [],
-			"failed": [],
-			"message": _("No readers found in SumUp."),
-		}
-
-	entries = []
+	readers = []
 	failed = []
 	for item in items:
-		reader_id, reader_status = _extract_reader_data(item)
+		reader = _extract_reader_fields(item)
+		reader_id = reader["id"]
 		if not reader_id:
 			failed.append({"terminal_id": None, "error": _("Reader ID missing in SumUp response.")})
 			continue
-		reader_name = _extract_reader_name(item) or reader_id
-		entries.append({"terminal_id": str(reader_id), "terminal_name": reader_name})
+		readers.append({"terminal_id": reader_id, "terminal_name": reader["name"] or reader_id})
 
-	if not entries:
+	if items and not readers:
 		return {
 			"created": [],
 			"updated": [],
 			"skipped": [],
+			"orphaned": [],
+			"restored": [],
 			"failed": failed,
+			"dry_run": dry_run,
 			"message": _("No valid readers found in SumUp response."),
 		}
 
-	existing = frappe.get_all(
+	local_rows = frappe.get_all(
 		"SumUp Terminal",
-		filters={"terminal_id": ["in", [entry["terminal_id"] for entry in entries]]},
-		fields=["name", "terminal_id", "terminal_name"],
+		fields=["name", "terminal_id", "terminal_name", "missing_in_sumup"],
 	)
-	existing_index = {row["terminal_id"]: row for row in existing}
-
-	created = []
-	updated = []
-	skipped = []
-
-	for entry in entries:
+	# A partial listing says nothing about the terminals it does not contain.
+	diff = _diff_terminals(readers, local_rows, complete=not truncated and not failed)
+	if not dry_run:
 		try:
-			existing_row = existing_index.get(entry["terminal_id"])
-			if existing_row:
-				updates = {}
-				terminal_name = (existing_row.get("terminal_name") or "").strip()
-				if entry["terminal_name"] and entry["terminal_name"] != terminal_name:
-					updates["terminal_name"] = entry["terminal_name"]
-				if updates:
-					frappe.db.set_value("SumUp Terminal", existing_row["name"], updates)
-					updated.append({"name": existing_row["name"], "terminal_id": entry["terminal_id"]})
-				else:
-					skipped.append({"name": existing_row["name"], "terminal_id": entry["terminal_id"]})
-				continue
-
-			doc = frappe.get_doc(
-				{
-					"doctype": "SumUp Terminal",
-					"terminal_id": entry["terminal_id"],
-					"terminal_name": entry["terminal_name"],
-					"enabled": 1,
-				}
-			)
-			doc.insert()
-			created.append({"name": doc.name, "terminal_id": entry["terminal_id"]})
+			_apply_terminal_diff(diff)
 		except Exception as exc:
-			failed.append({"terminal_id": entry["terminal_id"], "error": _format_sumup_error(exc)})
-
-	message = _("Recovered {0} terminal(s), updated {1}, skipped {2}, failed {3}.").format(
-		len(created),
-		len(updated),
-		len(skipped),
-		len(failed),
-	)
+			frappe.db.rollback()
+			frappe.throw(_("Terminal recovery failed: {0}").format(_format_sumup_error(exc)))
+
+	created = [{"name": row["terminal_id"], "terminal_id": row["terminal_id"]} for row in diff["create"]]
+	updated = [{"name": row["name"], "terminal_id": row["terminal_id"]} for row in diff["rename"]]
+	if dry_run:
+		message = _(
+			"Preview: {0} terminal(s) to create, {1} to update, {2} missing in SumUp, {3} to restore."
+		).format(len(created), len(updated), len(diff["orphan"]), len(diff["restore"]))
+	elif not readers and not diff["orphan"]:
+		message = _("No readers found in SumUp.")
+	else:
+		message = _("Recovered {0} terminal(s), updated {1}, skipped {2}, failed {3}.").format(
+			len(created),
+			len(updated),
+			len(diff["unchanged"]),
+			len(failed),
+		)
+		if diff["orphan"]:
+			message += " " + _("{0} terminal(s) are missing in SumUp.").format(len(diff["orphan"]))
+	if truncated or failed:
+		message += " " + _("The SumUp reader list is incomplete; no terminals were marked as missing.")
 
 	return {
 		"created": created,
 		"updated": updated,
-		"skipped": skipped,
+		"skipped": diff["unchanged"],
+		"orphaned": diff["orphan"],
+		"restored": diff["restore"],
 		"failed": failed,
+		"dry_run": dry_run,
 		"message": message,
 	}
 
@@ -690,43 +838,135 @@ def remove_terminals(*, terminal_names=None):
 	if not terminals:
 		frappe.throw(_("No terminals found."))
 
-	debug_enabled = bool(getattr(get_sumup_settings(), "enable_debug_logging", 0))
+	settings = get_sumup_settings()
+	debug_enabled = bool(getattr(settings, "enable_debug_logging", 0))
 	removed = []
 	failed = []
+	queued = []
 	debug_details = []
 
+	def add_failure(name, error_text):
+		failed.append({"name": name, "error": error_text})
+		if debug_enabled:
+			debug_details.append({"name": name, "error": error_text})
+
+	linked = _get_linked_pos_profiles([terminal.name for terminal in terminals])
+	removable = []
 	for terminal in terminals:
-		try:
-			linked_profiles = _get_linked_pos_profiles(terminal.get("name"))
-			if linked_profiles:
-				frappe.throw(
-					_("Cannot remove terminal {0} because it is linked to POS Profile(s): {1}.").format(
-						terminal.get("name"), ", ".join(linked_profiles)
-					)
-				)
+		if linked.get(terminal.name):
+			add_failure(terminal.name, _get_linked_profiles_error(terminal.name, linked[terminal.name]))
+		else:
+			removable.append(terminal)
 
-			client.readers.delete(merchant_code, terminal.get("terminal_id"))
-			frappe.delete_doc("SumUp Terminal", terminal.get("name"))
-			removed.append({"name": terminal.get("name")})
+	# Readers are deleted in SumUp concurrently; local deletes happen afterwards on this thread.
+	results = map_sumup_calls(
+		lambda terminal: _delete_reader(client, merchant_code, terminal.terminal_id),
+		removable,
+		max_workers=get_max_parallel_requests(settings),
+	)
+
+	for terminal, (_result, delete_error) in zip(removable, results, strict=True):
+		if delete_error is not None:
+			error_text = _format_sumup_error(delete_error) if debug_enabled else str(delete_error)
+			add_failure(terminal.name, error_text)
+			queued.append({"name": terminal.name, "error": _format_sumup_error(delete_error)})
+			continue
+
+		try:
+			frappe.delete_doc("SumUp Terminal", terminal.name)
+			removed.append({"name": terminal.name})
 		except Exception as exc:
-			error_text = _format_sumup_error(exc) if debug_enabled else str(exc)
-			failed.append({"name": terminal.get("name"), "error": error_text})
-			if debug_enabled:
-				debug_details.append({"name": terminal.get("name"), "error": error_text})
+			add_failure(terminal.name, _format_sumup_error(exc) if debug_enabled else str(exc))
+
+	_queue_terminal_removals(queued)
 
 	message = _("Removed {0} terminal(s).").format(len(removed))
 	if failed:
 		message = _("Removed {0} terminal(s), {1} failed.").format(len(removed), len(failed))
+	if queued:
+		message += " " + _("{0} terminal(s) will be removed in the background.").format(len(queued))
 
 	return {
 		"removed": removed,
 		"failed": failed,
+		"queued": [row["name"] for row in queued],
 		"debug_details": debug_details,
 		"debug_enabled": debug_enabled,
 		"message": message,
 	}
 
 
+def _queue_terminal_removals(rows: list[dict]):
+	"""Disable the terminals and mark them for `retry_pending_terminal_removals`."""
+	if not rows:
+		return
+
+	updates = {}
+	for row in rows:
+		updates[row["name"]] = {
+			"enabled": 0,
+			"pending_removal": 1,
+			"removal_attempts": 0,
+			"removal_error": row["error"],
+		}
+	frappe.db.bulk_update("SumUp Terminal", updates)
+	clear_profile_terminal_cache()
+
+
+def retry_pending_terminal_removals():
+	client, merchant_code = _get_status_context(throw_on_missing=False)
+	if not client:
+		return
+
+	terminals = frappe.get_all(
+		"SumUp Terminal",
+		filters={"pending_removal": 1, "removal_attempts": ["<", TERMINAL_REMOVAL_MAX_ATTEMPTS]},
+		fields=["name", "terminal_id", "removal_attempts"],
+		order_by="modified asc",
+	)
+	if not terminals:
+		return
+
+	linked = _get_linked_pos_profiles([terminal.name for terminal in terminals])
+	updates = {}
+	removable = []
+	for terminal in terminals:
+		if linked.get(terminal.name):
+			# Linked again since the removal was requested; keep the terminal.
+			updates[terminal.name] = {
+				"pending_removal": 0,
+				"removal_error": _get_linked_profiles_error(terminal.name, linked[terminal.name]),
+			}
+		else:
+			removable.append(terminal)
+
+	results = map_sumup_calls(
+		lambda terminal: _delete_reader(client, merchant_code, terminal.terminal_id),
+		removable,
+		max_workers=get_max_parallel_requests(),
+	)
+
+	for terminal, (_result, delete_error) in zip(removable, results, strict=True):
+		if delete_error is None:
+			try:
+				frappe.delete_doc("SumUp Terminal", terminal.name, ignore_permissions=True)
+				continue
+			except Exception as exc:
+				delete_error = exc
+
+		attempts = cint(terminal.removal_attempts) + 1
+		error_text = _format_sumup_error(delete_error)
+		updates[terminal.name] = {"removal_attempts": attempts, "removal_error": error_text}
+		if attempts >= TERMINAL_REMOVAL_MAX_ATTEMPTS:
+			frappe.log_error(
+				message=error_text,
+				title=_("SumUp terminal removal failed: {0}").format(terminal.name),
+			)
+
+	if updates:
+		frappe.db.bulk_update("SumUp Terminal", updates)
+
+
 @frappe.whitelist()
 def force_remove_terminals(*, terminal_names=None):
 	names = _parse_terminal_names(terminal_names)
@@ -747,15 +987,12 @@ def force_remove_terminals(*, terminal_names=None):
 	failed = []
 	debug_details = []
 
+	linked = _get_linked_pos_profiles([terminal.get("name") for terminal in terminals])
 	for terminal in terminals:
 		try:
-			linked_profiles = _get_linked_pos_profiles(terminal.get("name"))
+			linked_profiles = linked.get(terminal.get("name"))
 			if linked_profiles:
-				frappe.throw(
-					_("Cannot remove terminal {0} because it is linked to POS Profile(s): {1}.").format(
-						terminal.get("name"), ", ".join(linked_profiles)
-					)
-				)
+				frappe.throw(_get_linked_profiles_error(terminal.get("name"), linked_profiles))
 
 			frappe.delete_doc("SumUp Terminal", terminal.get("name"))
 			removed.append({"name": terminal.get("name")})
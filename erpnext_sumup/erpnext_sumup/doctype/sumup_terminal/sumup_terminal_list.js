@@ -156,6 +156,12 @@ const refresh_terminal_statuses = (listview, terminal_names) => {
 };
 
 const get_status_indicator = (doc) => {
+	if (cint(doc.missing_in_sumup)) {
+		return [__("Missing in SumUp"), "red", "missing_in_sumup,=,1"];
+	}
+	if (cint(doc.pending_removal)) {
+		return [__("Pending Removal"), "orange", "pending_removal,=,1"];
+	}
 	const status = get_connection_status_label(doc.connection_status);
 	const color = CONNECTION_STATUS_COLORS[status] || "gray";
 	return [__(status), color, `connection_status,=,${status}`];
@@ -296,20 +302,64 @@ const ensure_sumup_enabled = (listview) => {
 };
 
 const run_recovery_sync = (listview) => {
-	frappe.confirm(__("Fetch readers from SumUp and sync local terminals?"), () => {
+	const recover = (dry_run, callback) =>
 		frappe.call({
 			method: "erpnext_sumup.erpnext_sumup.doctype.sumup_terminal.sumup_terminal.recover_terminals_from_sumup",
+			args: { dry_run: dry_run ? 1 : 0 },
 			freeze: true,
-			freeze_message: __("Syncing terminals..."),
-			callback: (response) => {
-				const result = response.message || {};
+			freeze_message: dry_run ? __("Fetching readers...") : __("Syncing terminals..."),
+			callback: (response) => callback(response.message || {}),
+		});
+
+	recover(true, (preview) => {
+		const changes =
+			(preview.created || []).length +
+			(preview.updated || []).length +
+			(preview.orphaned || []).length +
+			(preview.restored || []).length;
+		if (!changes) {
+			show_recovery_message(preview);
+			return;
+		}
+
+		frappe.confirm(`${frappe.utils.escape_html(preview.message)}<br><br>${__("Apply these changes?")}`, () => {
+			recover(false, (result) => {
 				listview.refresh();
 				show_recovery_message(result);
-			},
+			});
 		});
 	});
 };
 
+const show_status_summary = () => {
+	frappe.call({
+		method: "erpnext_sumup.erpnext_sumup.doctype.sumup_terminal_status_log.sumup_terminal_status_log.get_terminal_status_summary",
+		callback: (response) => {
+			const rows = response.message || [];
+			if (!rows.length) {
+				frappe.msgprint(__("No terminals found."));
+				return;
+			}
+
+			const body = rows
+				.map((row) => {
+					const label = frappe.utils.escape_html(row.terminal_name || row.name);
+					const flapping = row.flapping ? ` (${__("Flapping")})` : "";
+					return `<tr><td>${label}</td><td>${row.uptime_percent}%</td><td>${row.transitions}${flapping}</td></tr>`;
+				})
+				.join("");
+
+			frappe.msgprint({
+				title: __("Terminal Status (Last 7 Days)"),
+				message: `<table class="table table-bordered"><thead><tr><th>${__("Terminal")}</th><th>${__(
+					"Uptime"
+				)}</th><th>${__("Transitions")}</th></tr></thead><tbody>${body}</tbody></table>`,
+				wide: true,
+			});
+		},
+	});
+};
+
 const remove_selected_terminals = (listview) => {
 	const terminal_names = get_selected_terminal_names(listview);
 	if (!terminal_names.length) {
@@ -373,7 +423,7 @@ const force_remove_selected_terminals = (listview) => {
 };
 
 frappe.listview_settings["SumUp Terminal"] = {
-	add_fields: ["connection_status", "online_status", "activity_status"],
+	add_fields: ["connection_status", "online_status", "activity_status", "missing_in_sumup", "pending_removal"],
 	onload(listview) {
 		listview.sumup_debug_enabled = false;
 		listview.sumup_enabled = undefined;
@@ -406,6 +456,7 @@ frappe.listview_settings["SumUp Terminal"] = {
 		listview.page.add_inner_button(__("Remove from SumUp"), () => {
 			remove_selected_terminals(listview);
 		});
+		listview.page.add_inner_button(__("Status History"), show_status_summary);
 
 		frappe.db
 			.get_value("SumUp Settings", "SumUp Settings", "enable_debug_logging")
@@ -1,6 +1,10 @@
 # Copyright (c) 2025, RocketQuackIT and Contributors
 # See license.txt
 
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
 import frappe
 from frappe.tests.utils import FrappeTestCase
 
@@ -21,6 +25,43 @@ class DictReader:
 		return dict(self._payload)
 
 
+class StatusReaders:
+	def __init__(self, paired, failing=()):
+		self._paired = paired
+		self._failing = set(failing)
+
+	def list(self, merchant_code):
+		return SimpleNamespace(
+			items=[SimpleNamespace(id=reader_id, status="PAIRED") for reader_id in self._paired]
+		)
+
+	def get_status(self, merchant_code, reader_id):
+		if reader_id in self._failing:
+			raise Exception("reader unreachable")
+		return {"data": {"status": "ONLINE", "screen_state": "IDLE"}}
+
+
+class DeleteError(Exception):
+	def __init__(self, status):
+		super().__init__(f"status {status}")
+		self.status = status
+
+
+class DeleteReaders:
+	def __init__(self, errors=None):
+		self._errors = errors or {}
+		self.deleted = []
+
+	def delete(self, merchant_code, reader_id):
+		self.deleted.append(reader_id)
+		if reader_id in self._errors:
+			raise DeleteError(self._errors[reader_id])
+
+
+def call_directly(operation, func, *args):
+	return func(*args)
+
+
 class TestSumUpTerminal(FrappeTestCase):
 	def test_normalize_pairing_code(self):
 		self.assertEqual(sumup_terminal._normalize_pairing_code(" abcd-1234 "), "ABCD1234")
@@ -126,3 +167,161 @@ class TestSumUpTerminal(FrappeTestCase):
 		self.assertIn("boom", message)
 		self.assertIn("status 400", message)
 		self.assertIn("body", message)
+
+	def test_refresh_terminal_statuses_fans_out(self):
+		terminals = [
+			frappe._dict(name="T-1", terminal_id="R-1"),
+			frappe._dict(name="T-2", terminal_id="R-2"),
+			frappe._dict(name="T-3", terminal_id="R-3"),
+		]
+		client = SimpleNamespace(readers=StatusReaders(["R-1", "R-2"], failing=["R-2", "R-3"]))
+		with self._patch_refresh(terminals, client) as writes:
+			result = sumup_terminal.refresh_terminal_statuses()
+
+		updated = {row["name"]: row for row in result["updated"]}
+		self.assertEqual(set(updated), {"T-1", "T-2"})
+		self.assertEqual(updated["T-1"]["online_status"], "Online")
+		self.assertEqual(updated["T-1"]["activity_status"], "Idle")
+		self.assertEqual(updated["T-2"]["connection_status"], "Paired")
+		self.assertEqual(updated["T-2"]["online_status"], "Unknown")
+		self.assertEqual([row["name"] for row in result["failed"]], ["T-3"])
+		self.assertEqual(len(writes), 1)
+		self.assertEqual(set(writes[0]), {"T-1", "T-2"})
+
+	def test_refresh_terminal_statuses_skips_unchanged(self):
+		terminals = [
+			frappe._dict(
+				name="T-1",
+				terminal_id="R-1",
+				connection_status="Paired",
+				online_status="Online",
+				activity_status="Idle",
+			),
+			frappe._dict(
+				name="T-2",
+				terminal_id="R-2",
+				connection_status="Paired",
+				online_status="Offline",
+				activity_status="Idle",
+			),
+		]
+		client = SimpleNamespace(readers=StatusReaders(["R-1", "R-2"]))
+
+		with self._patch_refresh(terminals, client) as writes:
+			result = sumup_terminal.refresh_terminal_statuses()
+
+		self.assertEqual(len(result["updated"]), 2)
+		self.assertEqual(writes, [{"T-2": {"online_status": "Online"}}])
+		(transitions,) = self.logged_transitions.call_args.args
+		self.assertEqual(
+			[(terminal.name, changes) for terminal, changes in transitions],
+			[("T-2", {"online_status": "Online"})],
+		)
+		self.assertEqual(transitions[0][0].online_status, "Offline")
+
+	def test_apply_terminal_statuses_single_write(self):
+		terminal = frappe._dict(name="T-1", terminal_id="R-1", connection_status="Paired")
+		with (
+			patch.object(sumup_terminal.frappe.db, "set_value") as set_value,
+			patch.object(sumup_terminal, "log_terminal_status_transitions") as log_transitions,
+		):
+			changes = sumup_terminal._apply_terminal_statuses(terminal, "Paired", "Online", "Idle")
+
+		self.assertEqual(changes, {"online_status": "Online", "activity_status": "Idle"})
+		set_value.assert_called_once_with("SumUp Terminal", "T-1", changes)
+		log_transitions.assert_called_once_with([(terminal, changes)])
+
+	def test_remove_terminals_checks_links_once_and_queues_failures(self):
+		terminals = [
+			frappe._dict(name="T-1", terminal_id="R-1"),
+			frappe._dict(name="T-2", terminal_id="R-2"),
+			frappe._dict(name="T-3", terminal_id="R-3"),
+			frappe._dict(name="T-4", terminal_id="R-4"),
+		]
+		profiles = [frappe._dict(name="POS-A", sumup_terminal="T-4")]
+		readers = DeleteReaders(errors={"R-2": 503, "R-3": 404})
+
+		with self._patch_removal(terminals, profiles, readers) as (writes, deleted, get_all):
+			result = sumup_terminal.remove_terminals(terminal_names=["T-1", "T-2", "T-3", "T-4"])
+
+		self.assertEqual(sorted(readers.deleted), ["R-1", "R-2", "R-3"])
+		self.assertEqual(deleted, ["T-1", "T-3"])
+		self.assertEqual([row["name"] for row in result["removed"]], ["T-1", "T-3"])
+		self.assertEqual([row["name"] for row in result["failed"]], ["T-4", "T-2"])
+		self.assertEqual(result["queued"], ["T-2"])
+		self.assertEqual(set(writes[0]), {"T-2"})
+		self.assertEqual(writes[0]["T-2"]["pending_removal"], 1)
+		self.assertEqual(writes[0]["T-2"]["enabled"], 0)
+		profile_queries = [call for call in get_all.call_args_list if call.args[0] == "POS Profile"]
+		self.assertEqual(len(profile_queries), 1)
+
+	def test_retry_pending_terminal_removals(self):
+		max_attempts = sumup_terminal.TERMINAL_REMOVAL_MAX_ATTEMPTS
+		terminals = [
+			frappe._dict(name="T-1", terminal_id="R-1", removal_attempts=0),
+			frappe._dict(name="T-2", terminal_id="R-2", removal_attempts=max_attempts - 1),
+			frappe._dict(name="T-3", terminal_id="R-3", removal_attempts=2),
+		]
+		profiles = [frappe._dict(name="POS-A", sumup_terminal="T-3")]
+		readers = DeleteReaders(errors={"R-2": 500})
+
+		with (
+			self._patch_removal(terminals, profiles, readers) as (writes, deleted, _get_all),
+			patch.object(sumup_terminal.frappe, "log_error") as log_error,
+		):
+			sumup_terminal.retry_pending_terminal_removals()
+
+		self.assertEqual(sorted(readers.deleted), ["R-1", "R-2"])
+		self.assertEqual(deleted, ["T-1"])
+		self.assertEqual(writes[0]["T-2"]["removal_attempts"], max_attempts)
+		self.assertEqual(writes[0]["T-3"]["pending_removal"], 0)
+		log_error.assert_called_once()
+
+	@contextmanager
+	def _patch_removal(self, terminals, profiles, readers):
+		settings = SimpleNamespace(
+			enabled=1, merchant_code="MRC", enable_debug_logging=0, max_parallel_requests=2
+		)
+		writes = []
+		deleted = []
+		with (
+			patch.object(sumup_terminal, "get_sumup_settings", return_value=settings),
+			patch.object(sumup_terminal, "get_sumup_client", return_value=SimpleNamespace(readers=readers)),
+			patch.object(sumup_terminal, "call_sumup", side_effect=call_directly),
+			patch.object(
+				sumup_terminal.frappe,
+				"get_all",
+				side_effect=lambda doctype, **kwargs: profiles if doctype == "POS Profile" else terminals,
+			) as get_all,
+			patch.object(
+				sumup_terminal.frappe,
+				"delete_doc",
+				side_effect=lambda doctype, name, **kwargs: deleted.append(name),
+			),
+			patch.object(
+				sumup_terminal.frappe.db,
+				"bulk_update",
+				side_effect=lambda doctype, updates, **kwargs: writes.append(updates),
+			),
+		):
+			yield writes, deleted, get_all
+
+	@contextmanager
+	def _patch_refresh(self, terminals, client):
+		settings = SimpleNamespace(
+			enabled=1, merchant_code="MRC", enable_debug_logging=0, max_parallel_requests=2
+		)
+		writes = []
+		with (
+			patch.object(sumup_terminal, "get_sumup_settings", return_value=settings),
+			patch.object(sumup_terminal, "get_sumup_client", return_value=client),
+			patch.object(sumup_terminal.frappe, "get_all", return_value=terminals),
+			patch.object(
+				sumup_terminal.frappe.db,
+				"bulk_update",
+				side_effect=lambda doctype, updates, **kwargs: writes.append(updates),
+			),
+			patch.object(sumup_terminal, "log_terminal_status_transitions") as log_transitions,
+		):
+			self.logged_transitions = log_transitions
+			yield writes
@@ -0,0 +1,130 @@
+# Copyright (c) 2025, RocketQuackIT and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Interval
+from frappe.query_builder.functions import Now
+from frappe.utils import add_to_date, cint, get_datetime, now_datetime
+
+from erpnext_sumup.erpnext_sumup.integrations.sumup_client import get_sumup_settings
+
+STATUS_LOG_DOCTYPE = "SumUp Terminal Status Log"
+STATUS_LOG_FIELDS = ("connection_status", "online_status", "activity_status")
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_SUMMARY_DAYS = 7
+FLAPPING_THRESHOLD = 6
+
+
+class SumUpTerminalStatusLog(Document):
+	@staticmethod
+	def clear_old_logs(days=DEFAULT_RETENTION_DAYS):
+		table = frappe.qb.DocType(STATUS_LOG_DOCTYPE)
+		frappe.db.delete(table, filters=(table.logged_at < (Now() - Interval(days=days))))
+
+
+def on_doctype_update():
+	frappe.db.add_index(STATUS_LOG_DOCTYPE, ["terminal", "logged_at"])
+
+
+def log_terminal_status_transitions(transitions):
+	"""Append one row per terminal whose statuses changed.
+
+	`transitions` is a list of `(terminal, changes)` pairs where `terminal` holds the
+	previously stored statuses and `changes` only the fields that moved.
+	"""
+	transitions = [(terminal, changes) for terminal, changes in transitions if changes]
+	if not transitions:
+		return
+
+	now = now_datetime()
+	user = frappe.session.user
+	fields = ["name", "creation", "modified", "owner", "modified_by", "terminal", "logged_at"]
+	for status_field in STATUS_LOG_FIELDS:
+		fields.extend((f"{status_field}_from", f"{status_field}_to"))
+
+	values = []
+	for terminal, changes in transitions:
+		row = [frappe.generate_hash(length=10), now, now, user, user, terminal.get("name"), now]
+		for status_field in STATUS_LOG_FIELDS:
+			previous = terminal.get(status_field)
+			row.extend((previous, changes.get(status_field, previous)))
+		values.append(row)
+
+	frappe.db.bulk_insert(STATUS_LOG_DOCTYPE, fields, values)
+
+
+def clear_old_status_logs():
+	days = cint(getattr(get_sumup_settings(), "status_log_retention_days", 0)) or DEFAULT_RETENTION_DAYS
+	SumUpTerminalStatusLog.clear_old_logs(days=days)
+
+
+def _summarize_terminal_logs(rows, since, until):
+	"""Compute online share and transition counts from ordered log rows of one terminal."""
+	window = (until - since).total_seconds()
+	online_seconds = 0.0
+	transitions = 0
+	current_status = None
+	current_since = since
+
+	for row in rows:
+		logged_at = get_datetime(row.get("logged_at"))
+		if current_status is None:
+			current_status = row.get("online_status_from")
+		if row.get("online_status_from") != row.get("online_status_to"):
+			transitions += 1
+		if logged_at > since:
+			if current_status == "Online":
+				online_seconds += (logged_at - current_since).total_seconds()
+			current_since = logged_at
+		current_status = row.get("online_status_to")
+
+	if current_status == "Online":
+		online_seconds += (until - current_since).total_seconds()
+
+	return {
+		"uptime_percent": round(online_seconds * 100 / window, 2) if window > 0 else 0,
+		"transitions": transitions,
+		"flapping": transitions >= FLAPPING_THRESHOLD,
+	}
+
+
+@frappe.whitelist()
+def get_terminal_status_summary(days=DEFAULT_SUMMARY_DAYS):
+	frappe.only_for("System Manager")
+
+	until = now_datetime()
+	since = add_to_date(until, days=-max(cint(days), 1))
+	terminals = frappe.get_all("SumUp Terminal", fields=["name", "terminal_name", "online_status"])
+	logs = frappe.get_all(
+		STATUS_LOG_DOCTYPE,
+		filters={"logged_at": [">=", since]},
+		fields=["terminal", "logged_at", "online_status_from", "online_status_to"],
+		order_by="logged_at asc",
+	)
+
+	logs_by_terminal = {}
+	for row in logs:
+		logs_by_terminal.setdefault(row.terminal, []).append(row)
+
+	summary = []
+	for terminal in terminals:
+		rows = logs_by_terminal.get(terminal.name)
+		if not rows:
+			# No transition in the window, so the stored status held throughout.
+			rows = [
+				{
+					"logged_at": since,
+					"online_status_from": terminal.online_status,
+					"online_status_to": terminal.online_status,
+				}
+			]
+		summary.append(
+			{
+				"name": terminal.name,
+				"terminal_name": terminal.terminal_name,
+				**_summarize_terminal_logs(rows, since, until),
+			}
+		)
+
+	return summary
@@ -0,0 +1,79 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_sumup.erpnext_sumup.doctype.sumup_terminal_status_log import sumup_terminal_status_log
+
+
+class TestSumUpTerminalStatusLog(FrappeTestCase):
+	def test_transitions_are_bulk_inserted(self):
+		terminal = frappe._dict(
+			name="T-1",
+			connection_status="Paired",
+			online_status="Offline",
+			activity_status="Idle",
+		)
+		with patch.object(sumup_terminal_status_log.frappe.db, "bulk_insert") as bulk_insert:
+			sumup_terminal_status_log.log_terminal_status_transitions(
+				[(terminal, {"online_status": "Online"}), (frappe._dict(name="T-2"), {})]
+			)
+
+		bulk_insert.assert_called_once()
+		doctype, fields, values = bulk_insert.call_args.args
+		self.assertEqual(doctype, "SumUp Terminal Status Log")
+		self.assertEqual(len(values), 1)
+		row = dict(zip(fields, values[0], strict=True))
+		self.assertEqual(row["terminal"], "T-1")
+		self.assertEqual(row["online_status_from"], "Offline")
+		self.assertEqual(row["online_status_to"], "Online")
+		self.assertEqual(row["connection_status_from"], row["connection_status_to"])
+
+	def test_no_transitions_skip_insert(self):
+		with patch.object(sumup_terminal_status_log.frappe.db, "bulk_insert") as bulk_insert:
+			sumup_terminal_status_log.log_terminal_status_transitions([])
+
+		bulk_insert.assert_not_called()
+
+	def test_summary_uptime_and_flapping(self):
+		since = datetime(2025, 1, 1)
+		until = since + timedelta(hours=10)
+		rows = [
+			{
+				"logged_at": since + timedelta(hours=2),
+				"online_status_from": "Online",
+				"online_status_to": "Offline",
+			},
+			{
+				"logged_at": since + timedelta(hours=4),
+				"online_status_from": "Offline",
+				"online_status_to": "Online",
+			},
+		]
+
+		summary = sumup_terminal_status_log._summarize_terminal_logs(rows, since, until)
+
+		self.assertEqual(summary["uptime_percent"], 80.0)
+		self.assertEqual(summary["transitions"], 2)
+		self.assertFalse(summary["flapping"])
+
+	def test_summary_marks_flapping_terminal(self):
+		since = datetime(2025, 1, 1)
+		rows = []
+		for index in range(sumup_terminal_status_log.FLAPPING_THRESHOLD):
+			online = index % 2 == 0
+			rows.append(
+				{
+					"logged_at": since + timedelta(minutes=index + 1),
+					"online_status_from": "Online" if online else "Offline",
+					"online_status_to": "Offline" if online else "Online",
+				}
+			)
+
+		summary = sumup_terminal_status_log._summarize_terminal_logs(rows, since, since + timedelta(hours=1))
+
+		self.assertTrue(summary["flapping"])
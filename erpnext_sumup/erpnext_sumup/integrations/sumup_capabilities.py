@@ -0,0 +1,64 @@
+# Copyright (c) 2025, RocketQuackIT and contributors
+# For license information, please see license.txt
+
+"""Per-process record of SumUp SDK features that fail on the installed version.
+
+Some SDK releases reject valid API responses during typed parsing. Instead of paying for
+the typed request, the validation error and a raw retry on every call, the first failure
+is remembered for the installed SDK version and later calls go straight to the raw path.
+"""
+
+import threading
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+
+_unsupported: set[tuple[str, str]] = set()
+_unsupported_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_sdk_version() -> str:
+	try:
+		return version("sumup")
+	except PackageNotFoundError:
+		return "unknown"
+
+
+def is_validation_error(exc) -> bool:
+	try:
+		import pydantic
+	except Exception:
+		pydantic = None
+
+	if pydantic and isinstance(exc, pydantic.ValidationError):
+		return True
+	# frappe.ValidationError shares the name but is raised by our own checks.
+	return exc.__class__.__name__ == "ValidationError" and not exc.__class__.__module__.startswith("frappe")
+
+
+def is_typed_parsing_supported(feature: str) -> bool:
+	return (feature, get_sdk_version()) not in _unsupported
+
+
+def mark_typed_parsing_unsupported(feature: str):
+	with _unsupported_lock:
+		_unsupported.add((feature, get_sdk_version()))
+
+
+def clear_capabilities():
+	with _unsupported_lock:
+		_unsupported.clear()
+
+
+def call_with_raw_fallback(feature: str, typed_call, raw_call) -> tuple:
+	"""Return `(result, is_raw)`, using `raw_call` once typed parsing of `feature` has failed."""
+	if not is_typed_parsing_supported(feature):
+		return raw_call(), True
+
+	try:
+		return typed_call(), False
+	except Exception as exc:
+		if not is_validation_error(exc):
+			raise
+		mark_typed_parsing_unsupported(feature)
+	return raw_call(), True
@@ -1,7 +1,96 @@
+import contextvars
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+from types import MappingProxyType
+
 import frappe
+import httpx
 from frappe import _
+from frappe.model import no_value_fields
+from frappe.utils import cint, flt
+from frappe.utils.password import get_decrypted_password
 from sumup import Sumup
 
+from erpnext_sumup.erpnext_sumup.integrations.sumup_currency import get_currency_minor_unit
+from erpnext_sumup.erpnext_sumup.integrations.sumup_fields import compile_fields
+from erpnext_sumup.erpnext_sumup.integrations.sumup_metrics import record_sumup_call
+
+DEFAULT_MAX_PARALLEL_REQUESTS = 8
+MERCHANT_FACTS_CACHE_KEY = "erpnext_sumup:merchant_facts"
+MERCHANT_FACTS_TTL_SECONDS = 6 * 60 * 60
+SETTINGS_CACHE_KEY = "erpnext_sumup:settings"
+SETTINGS_CACHE_TTL_SECONDS = 60 * 60
+SETTINGS_SECRET_FIELDS = ("api_key", "affiliate_key")
+CIRCUIT_CACHE_KEY = "erpnext_sumup:circuit_state"
+CIRCUIT_FAILURE_WINDOW_SECONDS = 60
+DEFAULT_CIRCUIT_FAILURE_THRESHOLD = 5
+DEFAULT_CIRCUIT_COOLDOWN_SECONDS = 30
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 10
+DEFAULT_LATENCY_BUDGET_SECONDS = 5
+RATE_LIMIT_CACHE_KEY = "erpnext_sumup:rate_limit"
+DEFAULT_RATE_LIMIT_PER_SECOND = 10
+DEFAULT_RATE_LIMIT_BURST = 20
+DEFAULT_RATE_LIMIT_MAX_WAIT_SECONDS = 10
+# Share of the bucket that only payment-critical calls may use.
+RATE_LIMIT_PRIORITY_RESERVE = 0.25
+PRIORITY_OPERATIONS = frozenset(
+	{"readers.create_checkout", "readers.terminate_checkout", "transactions.refund"}
+)
+
+# Refill and take one token atomically. Returns how long to wait, as a string so that
+# Redis does not truncate the fraction; "0" means a token was taken.
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 + reserve then
+	tokens = tokens - 1
+else
+	wait = (1 + reserve - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+# Counts a failure and opens the circuit in one step, so concurrent workers never lose a failure.
+_CIRCUIT_FAILURE_SCRIPT = """
+local failures = redis.call("HINCRBY", KEYS[1], "failures", 1)
+if failures >= tonumber(ARGV[1]) then
+	redis.call("HSET", KEYS[1], "opened_until", ARGV[2])
+end
+redis.call("EXPIRE", KEYS[1], ARGV[3])
+return failures
+"""
+
+_CURRENCY_KEYS = ("currency", "currency_code", "currencyCode", "default_currency", "defaultCurrency")
+_MERCHANT_FIELDS = compile_fields(
+	{
+		"merchant_code": ("merchant_code", "merchant_profile.merchant_code"),
+		"currency": (*_CURRENCY_KEYS, *(f"merchant_profile.{key}" for key in _CURRENCY_KEYS)),
+	}
+)
+
+# Clients are pooled per worker process and keyed by a digest of the API key, so the
+# underlying HTTP transport (and its keep-alive connections) is reused across requests.
+_client_cache: dict[str, Sumup] = {}
+_client_cache_lock = threading.Lock()
+
+sumup_client_logger = frappe.logger("sumup_client", allow_site=True)
+
+# Decrypted secrets never go to Redis; each worker keeps them per site and settings version.
+_settings_secrets: dict[str, tuple[str, dict]] = {}
+
 
 class SumUpNotEnabledError(frappe.ValidationError):
 	"""Raised when SumUp is disabled but a client is required."""
@@ -9,8 +98,97 @@ class SumUpNotEnabledError(frappe.ValidationError):
 	pass
 
 
-def get_sumup_settings():
-	return frappe.get_single("SumUp Settings")
+class SumUpDegradedError(frappe.ValidationError):
+	"""Raised without calling SumUp while the circuit of an operation is open."""
+
+	pass
+
+
+class SumUpRateLimitedError(frappe.ValidationError):
+	"""Raised when no SumUp request token was free in time or SumUp answered 429."""
+
+	pass
+
+
+class SumUpSettingsSnapshot:
+	"""Read-only SumUp Settings shared by everything running in one request or job."""
+
+	__slots__ = ("_secrets", "_values", "version")
+
+	def __init__(self, values: dict, secrets: dict, version: str):
+		object.__setattr__(self, "_values", MappingProxyType(dict(values)))
+		object.__setattr__(self, "_secrets", MappingProxyType(dict(secrets)))
+		object.__setattr__(self, "version", version)
+
+	def __getattr__(self, name):
+		try:
+			return self._values[name]
+		except KeyError:
+			raise AttributeError(name) from None
+
+	def __setattr__(self, name, value):
+		raise AttributeError(_("SumUp settings snapshots are read-only."))
+
+	def get(self, fieldname, default=None):
+		return self._values.get(fieldname, default)
+
+	def get_password(self, fieldname="password", raise_exception=True):
+		return self._secrets.get(fieldname)
+
+
+def _load_settings_values() -> dict:
+	doc = frappe.get_single("SumUp Settings")
+	values = {
+		df.fieldname: doc.get(df.fieldname)
+		for df in doc.meta.fields
+		if df.fieldtype not in no_value_fields and df.fieldtype != "Password"
+	}
+	return {"version": str(doc.modified), "values": values}
+
+
+def _get_settings_secrets(version: str) -> dict:
+	site = getattr(frappe.local, "site", None) or ""
+	cached = _settings_secrets.get(site)
+	if cached and cached[0] == version:
+		return cached[1]
+
+	secrets = {
+		fieldname: get_decrypted_password(
+			"SumUp Settings", "SumUp Settings", fieldname, raise_exception=False
+		)
+		for fieldname in SETTINGS_SECRET_FIELDS
+	}
+	_settings_secrets[site] = (version, secrets)
+	return secrets
+
+
+def get_sumup_settings() -> SumUpSettingsSnapshot:
+	snapshot = getattr(frappe.local, "sumup_settings", None)
+	if snapshot is not None:
+		return snapshot
+
+	cached = frappe.cache.get_value(SETTINGS_CACHE_KEY)
+	if not cached:
+		cached = _load_settings_values()
+		frappe.cache.set_value(SETTINGS_CACHE_KEY, cached, expires_in_sec=SETTINGS_CACHE_TTL_SECONDS)
+
+	snapshot = SumUpSettingsSnapshot(
+		cached["values"], _get_settings_secrets(cached["version"]), cached["version"]
+	)
+	frappe.local.sumup_settings = snapshot
+	return snapshot
+
+
+def _clear_settings_snapshot():
+	frappe.cache.delete_value(SETTINGS_CACHE_KEY)
+	frappe.local.sumup_settings = None
+	_settings_secrets.pop(getattr(frappe.local, "site", None) or "", None)
+
+
+def clear_sumup_settings_cache():
+	_clear_settings_snapshot()
+	# Another worker may re-read the old values before this transaction commits.
+	frappe.db.after_commit.add(_clear_settings_snapshot)
 
 
 def normalize_api_key(api_key):
@@ -24,6 +202,44 @@ def normalize_api_key(api_key):
 	return api_key
 
 
+def _api_key_digest(api_key: str) -> str:
+	return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def _close_client(client):
+	http_client = getattr(client, "_client", None)
+	close = getattr(http_client, "close", None)
+	if not callable(close):
+		return
+	try:
+		close()
+	except Exception:
+		pass
+
+
+def get_cached_client(api_key: str) -> Sumup:
+	digest = _api_key_digest(api_key)
+	client = _client_cache.get(digest)
+	if client is not None:
+		return client
+
+	with _client_cache_lock:
+		client = _client_cache.get(digest)
+		if client is None:
+			client = Sumup(api_key=api_key)
+			_client_cache[digest] = client
+	return client
+
+
+def clear_sumup_client_cache():
+	with _client_cache_lock:
+		clients = list(_client_cache.values())
+		_client_cache.clear()
+
+	for client in clients:
+		_close_client(client)
+
+
 def get_sumup_client(*, require_enabled: bool = True) -> Sumup:
 	settings = get_sumup_settings()
 
@@ -34,7 +250,211 @@ def get_sumup_client(*, require_enabled: bool = True) -> Sumup:
 	if not api_key:
 		frappe.throw(_("SumUp API key is missing in SumUp Settings."))
 
-	return Sumup(api_key=api_key)
+	client = get_cached_client(api_key)
+	_apply_request_timeout(client, settings)
+	return client
+
+
+def _apply_request_timeout(client, settings):
+	http_client = getattr(client, "_client", None)
+	if isinstance(http_client, httpx.Client):
+		http_client.timeout = get_circuit_policy(settings)["timeout"]
+
+
+def get_circuit_policy(settings=None) -> dict:
+	if settings is None:
+		settings = get_sumup_settings()
+	return {
+		"threshold": cint(getattr(settings, "circuit_failure_threshold", 0))
+		or DEFAULT_CIRCUIT_FAILURE_THRESHOLD,
+		"cooldown": cint(getattr(settings, "circuit_cooldown_seconds", 0))
+		or DEFAULT_CIRCUIT_COOLDOWN_SECONDS,
+		"timeout": flt(getattr(settings, "request_timeout_seconds", 0)) or DEFAULT_REQUEST_TIMEOUT_SECONDS,
+		"latency_budget": flt(getattr(settings, "latency_budget_seconds", 0))
+		or DEFAULT_LATENCY_BUDGET_SECONDS,
+	}
+
+
+def _get_circuit_key(operation: str) -> str:
+	return f"{CIRCUIT_CACHE_KEY}:{operation}"
+
+
+def _is_sumup_outage(exc) -> bool:
+	"""Only unavailability counts against the circuit, not rejected requests such as a 404."""
+	status = getattr(exc, "status", None) or getattr(getattr(exc, "response", None), "status_code", None)
+	if isinstance(status, int):
+		return status == 429 or status >= 500
+	return isinstance(exc, httpx.TransportError | TimeoutError | ConnectionError)
+
+
+def _is_outage_response(response) -> bool:
+	status_code = getattr(response, "status_code", None)
+	return isinstance(status_code, int) and (status_code == 429 or status_code >= 500)
+
+
+def _get_circuit_state(operation: str) -> dict | None:
+	failures, opened_until = frappe.cache.execute_command(
+		"HMGET", frappe.cache.make_key(_get_circuit_key(operation)), "failures", "opened_until"
+	)
+	if failures is None:
+		return None
+	return {"failures": int(failures), "opened_until": float(opened_until or 0)}
+
+
+def _enter_circuit(operation: str, policy: dict) -> dict | None:
+	state = _get_circuit_state(operation)
+	if not state or state["failures"] < policy["threshold"]:
+		return state
+
+	now = time.time()
+	# Half-open: once the cooldown is over, a single caller across all workers probes SumUp.
+	if now >= state["opened_until"] and frappe.cache.set(
+		frappe.cache.make_key(f"{_get_circuit_key(operation)}:probe"),
+		1,
+		ex=max(1, ceil(policy["timeout"])),
+		nx=True,
+	):
+		return state
+
+	raise SumUpDegradedError(
+		_("SumUp is degraded: {0} failed repeatedly. Retrying in {1} seconds.").format(
+			operation, max(1, ceil(state["opened_until"] - now))
+		)
+	)
+
+
+def _record_circuit_result(operation: str, policy: dict, state: dict | None, *, failed: bool):
+	key = _get_circuit_key(operation)
+	if not failed:
+		if state:
+			frappe.cache.delete_value(key)
+		return
+
+	script = frappe.cache.register_script(_CIRCUIT_FAILURE_SCRIPT)
+	failures = int(
+		script(
+			keys=[frappe.cache.make_key(key)],
+			args=[
+				policy["threshold"],
+				time.time() + policy["cooldown"],
+				policy["cooldown"] + CIRCUIT_FAILURE_WINDOW_SECONDS,
+			],
+		)
+	)
+	if failures == policy["threshold"]:
+		sumup_client_logger.warning("SumUp circuit opened (operation=%s)", operation)
+
+
+def _get_rate_limit_key() -> str:
+	return frappe.cache.make_key(RATE_LIMIT_CACHE_KEY)
+
+
+def _take_rate_limit_token(rate: float, burst: int, reserve: float) -> float:
+	script = frappe.cache.register_script(_TOKEN_BUCKET_SCRIPT)
+	return float(script(keys=[_get_rate_limit_key()], args=[rate, burst, reserve]))
+
+
+def _drain_rate_limit():
+	"""SumUp answered 429: make every worker wait for a refill before the next call."""
+	frappe.cache.execute_command("HSET", _get_rate_limit_key(), "tokens", "0")
+
+
+def _acquire_rate_limit_token(operation: str, settings):
+	"""Wait for a token of the site-wide bucket shared by all workers.
+
+	Payment-critical operations may use the whole bucket; status and telemetry calls leave
+	a reserve, so background refreshes cannot use up the quota needed for checkouts.
+	"""
+	if not cint(getattr(settings, "enable_rate_limiting", 0)):
+		return
+
+	rate = flt(getattr(settings, "rate_limit_per_second", 0)) or DEFAULT_RATE_LIMIT_PER_SECOND
+	burst = cint(getattr(settings, "rate_limit_burst", 0)) or DEFAULT_RATE_LIMIT_BURST
+	max_wait = flt(getattr(settings, "rate_limit_max_wait_seconds", 0)) or DEFAULT_RATE_LIMIT_MAX_WAIT_SECONDS
+	reserve = 0 if operation in PRIORITY_OPERATIONS else burst * RATE_LIMIT_PRIORITY_RESERVE
+	deadline = time.monotonic() + max_wait
+	while True:
+		wait = _take_rate_limit_token(rate, burst, reserve)
+		if wait <= 0:
+			return
+		if time.monotonic() + wait > deadline:
+			raise SumUpRateLimitedError(_("SumUp rate limit reached. Please try again in a moment."))
+		time.sleep(wait)
+
+
+def _is_rate_limited(value) -> bool:
+	status = getattr(value, "status", None) or getattr(value, "status_code", None)
+	if status is None:
+		status = getattr(getattr(value, "response", None), "status_code", None)
+	return status == 429
+
+
+def call_sumup(operation: str, func, *args, **kwargs):
+	"""Call SumUp through the rate limiter and circuit breaker of `operation`.
+
+	`operation` names the endpoint, e.g. `readers.create_checkout`. Timeouts, 429 and 5xx
+	responses and calls slower than the latency budget count as failures. After `threshold`
+	failures in a row, calls fail fast with `SumUpDegradedError` until the cooldown has
+	passed and a probe call succeeds.
+	"""
+	settings = get_sumup_settings()
+	policy = get_circuit_policy(settings)
+	record_metrics = cint(getattr(settings, "enable_api_metrics", 0))
+	state = _enter_circuit(operation, policy)
+	_acquire_rate_limit_token(operation, settings)
+	started = time.monotonic()
+	try:
+		result = func(*args, **kwargs)
+	except Exception as exc:
+		_record_circuit_result(operation, policy, state, failed=_is_sumup_outage(exc))
+		if record_metrics:
+			record_sumup_call(operation, time.monotonic() - started, failed=True)
+		if _is_rate_limited(exc):
+			_drain_rate_limit()
+			raise SumUpRateLimitedError(_("SumUp rate limit reached. Please try again in a moment.")) from exc
+		raise
+
+	elapsed = time.monotonic() - started
+	failed = _is_outage_response(result) or elapsed > policy["latency_budget"]
+	_record_circuit_result(operation, policy, state, failed=failed)
+	if _is_rate_limited(result):
+		_drain_rate_limit()
+	if record_metrics:
+		status_code = getattr(result, "status_code", None)
+		record_sumup_call(operation, elapsed, failed=isinstance(status_code, int) and status_code >= 400)
+	return result
+
+
+def get_max_parallel_requests(settings=None) -> int:
+	if settings is None:
+		settings = get_sumup_settings()
+	return max(1, cint(getattr(settings, "max_parallel_requests", 0)) or DEFAULT_MAX_PARALLEL_REQUESTS)
+
+
+def map_sumup_calls(func, items, *, max_workers: int | None = None) -> list[tuple]:
+	"""Run `func` for each item with bounded concurrency.
+
+	Returns `(result, exception)` pairs in input order. Worker threads run in a copy of
+	the caller's context so site config and cache are available, but they must not touch
+	`frappe.db`; apply database writes on the calling thread afterwards.
+	"""
+	items = list(items)
+	if not items:
+		return []
+
+	def run(item):
+		try:
+			return func(item), None
+		except Exception as exc:
+			return None, exc
+
+	workers = max(1, min(max_workers or DEFAULT_MAX_PARALLEL_REQUESTS, len(items)))
+	if workers == 1:
+		return [run(item) for item in items]
+
+	with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sumup") as executor:
+		futures = [executor.submit(contextvars.copy_context().run, run, item) for item in items]
+		return [future.result() for future in futures]
 
 
 def fetch_merchant_profile(*, api_key=None, merchant_code=None):
@@ -49,7 +469,8 @@ def fetch_merchant_profile(*, api_key=None, merchant_code=None):
 	if not merchant_code:
 		frappe.throw(_("Merchant code is required in SumUp Settings."))
 
-	client = Sumup(api_key=api_key)
+	client = get_cached_client(api_key)
+	_apply_request_timeout(client, get_sumup_settings())
 
 	merchants_resource = getattr(client, "merchants", None)
 	if merchants_resource is None:
@@ -60,111 +481,71 @@ def fetch_merchant_profile(*, api_key=None, merchant_code=None):
 		frappe.throw(_("SumUp client does not expose a merchants endpoint."))
 
 	try:
-		return method(merchant_code)
+		return call_sumup("merchants.get", method, merchant_code)
 	except Exception as exc:
 		frappe.throw(_("SumUp API error: {0}").format(exc))
 
 
 def extract_merchant_code(profile):
-	if profile is None:
-		return None
+	return _MERCHANT_FIELDS.resolve_one(profile, "merchant_code")
 
-	merchant_code = getattr(profile, "merchant_code", None)
-	if merchant_code:
-		return merchant_code
-
-	merchant_profile = getattr(profile, "merchant_profile", None)
-	if merchant_profile:
-		if isinstance(merchant_profile, dict):
-			merchant_code = merchant_profile.get("merchant_code")
-			if merchant_code:
-				return merchant_code
-		else:
-			merchant_code = getattr(merchant_profile, "merchant_code", None)
-			if merchant_code:
-				return merchant_code
-
-	if hasattr(profile, "model_dump"):
-		return extract_merchant_code(profile.model_dump())
-
-	if not isinstance(profile, dict):
-		return None
 
-	merchant_code = profile.get("merchant_code")
-	if merchant_code:
-		return merchant_code
+def extract_merchant_currency(profile):
+	return _MERCHANT_FIELDS.resolve_one(profile, "currency")
 
-	merchant_profile = profile.get("merchant_profile")
-	if isinstance(merchant_profile, dict):
-		return merchant_profile.get("merchant_code")
 
-	return None
+def fetch_merchant_code(*, api_key=None, merchant_code=None):
+	profile = fetch_merchant_profile(api_key=api_key, merchant_code=merchant_code)
+	merchant_code = extract_merchant_code(profile)
+	if not merchant_code:
+		frappe.throw(_("Merchant code not found in SumUp response."))
 
+	return merchant_code
 
-def extract_merchant_currency(profile):
-	if profile is None:
+
+def get_cached_merchant_facts(merchant_code: str | None = None) -> dict | None:
+	facts = frappe.cache.get_value(MERCHANT_FACTS_CACHE_KEY)
+	if not facts:
 		return None
 
-	currency = getattr(profile, "currency", None) or getattr(profile, "currency_code", None)
-	if currency:
-		return currency
-
-	merchant_profile = getattr(profile, "merchant_profile", None)
-	if merchant_profile:
-		if isinstance(merchant_profile, dict):
-			currency = (
-				merchant_profile.get("currency")
-				or merchant_profile.get("currency_code")
-				or merchant_profile.get("currencyCode")
-				or merchant_profile.get("default_currency")
-				or merchant_profile.get("defaultCurrency")
-			)
-			if currency:
-				return currency
-		else:
-			currency = (
-				getattr(merchant_profile, "currency", None)
-				or getattr(merchant_profile, "currency_code", None)
-				or getattr(merchant_profile, "currencyCode", None)
-				or getattr(merchant_profile, "default_currency", None)
-				or getattr(merchant_profile, "defaultCurrency", None)
-			)
-			if currency:
-				return currency
-
-	if hasattr(profile, "model_dump"):
-		return extract_merchant_currency(profile.model_dump())
-
-	if not isinstance(profile, dict):
+	if merchant_code and facts.get("merchant_code") != merchant_code:
 		return None
 
-	currency = (
-		profile.get("currency")
-		or profile.get("currency_code")
-		or profile.get("currencyCode")
-		or profile.get("default_currency")
-		or profile.get("defaultCurrency")
-	)
-	if currency:
-		return currency
-
-	merchant_profile = profile.get("merchant_profile")
-	if isinstance(merchant_profile, dict):
-		return (
-			merchant_profile.get("currency")
-			or merchant_profile.get("currency_code")
-			or merchant_profile.get("currencyCode")
-			or merchant_profile.get("default_currency")
-			or merchant_profile.get("defaultCurrency")
-		)
+	return facts
 
-	return None
 
+def clear_merchant_facts_cache():
+	frappe.cache.delete_value(MERCHANT_FACTS_CACHE_KEY)
+
+
+def get_merchant_facts(*, api_key=None, merchant_code=None, force=False) -> dict:
+	"""Return the merchant code, currency and minor unit, fetching the profile only on a cache miss."""
+	merchant_code = (merchant_code or "").strip()
+	api_key = normalize_api_key(api_key)
+	if not force:
+		facts = get_cached_merchant_facts(merchant_code)
+		if facts:
+			return facts
 
-def fetch_merchant_code(*, api_key=None, merchant_code=None):
 	profile = fetch_merchant_profile(api_key=api_key, merchant_code=merchant_code)
-	merchant_code = extract_merchant_code(profile)
-	if not merchant_code:
-		frappe.throw(_("Merchant code not found in SumUp response."))
+	resolved = _MERCHANT_FIELDS.resolve(profile)
+	currency = resolved["currency"]
+	facts = {
+		"merchant_code": resolved["merchant_code"] or merchant_code,
+		"currency": currency,
+		"minor_unit": get_currency_minor_unit(currency) if currency else None,
+	}
+	# A key that is not saved yet may belong to another account; its facts must not be shared.
+	if not api_key or api_key == normalize_api_key(get_sumup_settings().get_password("api_key")):
+		frappe.cache.set_value(MERCHANT_FACTS_CACHE_KEY, facts, expires_in_sec=MERCHANT_FACTS_TTL_SECONDS)
+	return facts
+
+
+def get_merchant_currency() -> str | None:
+	settings = get_sumup_settings()
+	merchant_code = (settings.get("merchant_code") or "").strip()
+	facts = get_cached_merchant_facts(merchant_code) if merchant_code else None
+	if facts and facts.get("currency"):
+		return facts["currency"]
 
-	return merchant_code
+	return (settings.get("merchant_currency") or "").strip() or None
@@ -0,0 +1,85 @@
+# Copyright (c) 2025, RocketQuackIT and contributors
+# For license information, please see license.txt
+
+from decimal import ROUND_HALF_UP, Decimal
+
+import frappe
+
+CURRENCY_TABLE_VERSION_KEY = "erpnext_sumup:currency_table_version"
+DEFAULT_MINOR_UNIT = 2
+
+# ISO code -> minor unit, kept per site in every worker. The version in Redis changes whenever
+# a Currency is saved or deleted, so all workers rebuild on their next lookup.
+_currency_tables: dict[str, tuple[str, dict[str, int]]] = {}
+
+_ONE = Decimal("1")
+
+
+def _get_minor_unit(fraction_units, smallest_currency_fraction_value) -> int:
+	if fraction_units:
+		try:
+			fraction_units = int(fraction_units)
+			if fraction_units <= 0:
+				return 0
+			return max(0, len(str(abs(fraction_units))) - 1)
+		except Exception:
+			pass
+
+	if smallest_currency_fraction_value:
+		try:
+			decimal = Decimal(str(smallest_currency_fraction_value)).normalize()
+			return max(0, -decimal.as_tuple().exponent)
+		except Exception:
+			pass
+
+	return DEFAULT_MINOR_UNIT
+
+
+def _build_currency_table() -> dict[str, int]:
+	rows = frappe.get_all(
+		"Currency",
+		fields=["name", "fraction_units", "smallest_currency_fraction_value"],
+	)
+	return {
+		row.name: _get_minor_unit(row.fraction_units, row.smallest_currency_fraction_value) for row in rows
+	}
+
+
+def _get_currency_table_version() -> str:
+	version = getattr(frappe.local, "sumup_currency_table_version", None)
+	if version:
+		return version
+
+	version = frappe.cache.get_value(CURRENCY_TABLE_VERSION_KEY)
+	if not version:
+		version = frappe.generate_hash(length=10)
+		frappe.cache.set_value(CURRENCY_TABLE_VERSION_KEY, version)
+	frappe.local.sumup_currency_table_version = version
+	return version
+
+
+def get_currency_table() -> dict[str, int]:
+	version = _get_currency_table_version()
+	cached = _currency_tables.get(frappe.local.site)
+	if cached and cached[0] == version:
+		return cached[1]
+
+	table = _build_currency_table()
+	_currency_tables[frappe.local.site] = (version, table)
+	return table
+
+
+def clear_currency_table(doc=None, method=None):
+	"""Currency doc_events hook: make every worker rebuild its table on the next lookup."""
+	frappe.cache.set_value(CURRENCY_TABLE_VERSION_KEY, frappe.generate_hash(length=10))
+	_currency_tables.pop(frappe.local.site, None)
+	frappe.local.sumup_currency_table_version = None
+
+
+def get_currency_minor_unit(currency: str) -> int:
+	return get_currency_table().get(currency, DEFAULT_MINOR_UNIT)
+
+
+def to_minor_value(amount, minor_unit: int) -> int:
+	scale = Decimal(10) ** minor_unit
+	return int((Decimal(str(amount)) * scale).quantize(_ONE, rounding=ROUND_HALF_UP))
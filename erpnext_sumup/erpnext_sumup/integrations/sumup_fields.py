@@ -0,0 +1,132 @@
+# Copyright (c) 2025, RocketQuackIT and contributors
+# For license information, please see license.txt
+
+"""Field extraction for SumUp SDK responses.
+
+SDK responses arrive as pydantic models, plain dicts (raw HTTP fallback) or test
+doubles. A `FieldResolver` compiles the accepted paths for every field once, reads what
+it can from attributes and falls back to a single `model_dump()` per object for the rest.
+"""
+
+from urllib.parse import parse_qsl
+
+_MISSING = object()
+
+
+def dump_model(value):
+	"""Convert an SDK model to a plain dict once; dicts and other objects are returned as-is."""
+	if value is None or isinstance(value, dict | list | str | int | float):
+		return value
+
+	model_dump = getattr(value, "model_dump", None)
+	if callable(model_dump):
+		try:
+			return model_dump()
+		except TypeError:
+			return model_dump(exclude_none=True)
+
+	as_dict = getattr(value, "dict", None)
+	if callable(as_dict):
+		try:
+			return as_dict()
+		except TypeError:
+			return as_dict(exclude_none=True)
+
+	return value
+
+
+def _get(node, key):
+	if isinstance(node, dict):
+		return node.get(key, _MISSING)
+	return getattr(node, key, _MISSING)
+
+
+def _is_empty(value) -> bool:
+	return value is _MISSING or value is None or value == ""
+
+
+class FieldResolver:
+	"""Resolve named fields from a response using precompiled dotted paths.
+
+	`fields` maps a result name to its accepted paths in priority order. When a field is
+	not found on the root, the `nested` containers and the first element of `first_item`
+	are searched the same way, mirroring the shapes of the SumUp list/detail endpoints.
+	"""
+
+	__slots__ = ("_fields", "_first_item", "_nested")
+
+	def __init__(self, fields: dict[str, tuple[str, ...]], *, nested=(), first_item=None):
+		self._fields = tuple(
+			(name, tuple(tuple(path.split(".")) for path in paths)) for name, paths in fields.items()
+		)
+		self._nested = tuple(nested)
+		self._first_item = first_item
+
+	def resolve(self, value) -> dict:
+		result = dict.fromkeys(name for name, _paths in self._fields)
+		self._resolve_into(value, self._fields, result)
+		return result
+
+	def resolve_one(self, value, name: str):
+		return self.resolve(value).get(name)
+
+	def _match(self, node, pending, result):
+		unresolved = []
+		for name, paths in pending:
+			for path in paths:
+				current = node
+				for key in path:
+					current = _get(current, key)
+					if _is_empty(current):
+						break
+				if not _is_empty(current):
+					result[name] = current
+					break
+			else:
+				unresolved.append((name, paths))
+		return unresolved
+
+	def _resolve_into(self, node, pending, result):
+		if node is None or not pending:
+			return pending
+
+		# Typed models usually expose the fields as attributes; dump only when some are missing.
+		pending = self._match(node, pending, result)
+		if pending and not isinstance(node, dict):
+			dumped = dump_model(node)
+			if isinstance(dumped, dict):
+				node = dumped
+				pending = self._match(node, pending, result)
+
+		for key in self._nested:
+			if not pending:
+				break
+			nested = _get(node, key)
+			if not _is_empty(nested):
+				pending = self._resolve_into(nested, pending, result)
+
+		if pending and self._first_item:
+			items = _get(node, self._first_item)
+			if isinstance(items, list) and items:
+				pending = self._resolve_into(items[0], pending, result)
+
+		return pending
+
+
+def compile_fields(fields: dict[str, tuple[str, ...]], *, nested=(), first_item=None) -> FieldResolver:
+	return FieldResolver(fields, nested=nested, first_item=first_item)
+
+
+def get_next_page_params(payload) -> dict | None:
+	"""Return the query parameters of the `rel=next` link of a paginated list response."""
+	payload = dump_model(payload)
+	if not isinstance(payload, dict):
+		return None
+
+	for link in payload.get("links") or []:
+		link = dump_model(link)
+		if not isinstance(link, dict) or link.get("rel") != "next" or not link.get("href"):
+			continue
+		query = link["href"].split("?", 1)[-1]
+		return dict(parse_qsl(query))
+	return None
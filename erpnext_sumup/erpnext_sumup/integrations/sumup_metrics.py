@@ -0,0 +1,142 @@
+# Copyright (c) 2025, RocketQuackIT and contributors
+# For license information, please see license.txt
+
+"""Latency and error counters for SumUp API calls.
+
+Every call recorded by `call_sumup` increments three fields of an hourly Redis hash in one
+round trip: the call count, the error count and a latency bucket. Buckets are log-linear
+like an HDR histogram, with 8 sub-buckets per power of two (about 9% relative error), so
+percentiles can be merged across workers and hours by adding the counters.
+"""
+
+import math
+import time
+from collections import Counter
+
+import frappe
+from frappe.utils import cint
+
+METRICS_CACHE_KEY = "erpnext_sumup:metrics"
+METRICS_RETENTION_HOURS = 48
+METRICS_SUB_BUCKETS = 8
+DEFAULT_METRICS_HOURS = 24
+PERCENTILES = (50, 95, 99)
+
+
+def _get_bucket(milliseconds: float) -> int:
+	if milliseconds <= 1:
+		return 0
+	return math.ceil(math.log2(milliseconds) * METRICS_SUB_BUCKETS)
+
+
+def _get_bucket_upper_ms(bucket: int) -> float:
+	return 2 ** (bucket / METRICS_SUB_BUCKETS)
+
+
+def get_percentiles(buckets: dict[int, int], percentiles=PERCENTILES) -> dict[str, float | None]:
+	"""Return the upper bound in ms of the bucket holding each percentile."""
+	result = {f"p{percentile}": None for percentile in percentiles}
+	total = sum(buckets.values())
+	if not total:
+		return result
+
+	ordered = sorted(buckets.items())
+	for percentile in percentiles:
+		rank = math.ceil(total * percentile / 100)
+		seen = 0
+		for bucket, count in ordered:
+			seen += count
+			if seen >= rank:
+				result[f"p{percentile}"] = round(_get_bucket_upper_ms(bucket), 1)
+				break
+	return result
+
+
+def _get_hour_key(hour: int) -> str:
+	return frappe.cache.make_key(f"{METRICS_CACHE_KEY}:{hour}")
+
+
+def record_sumup_call(operation: str, seconds: float, *, failed: bool):
+	key = _get_hour_key(int(time.time()) // 3600)
+	try:
+		pipeline = frappe.cache.pipeline()
+		pipeline.hincrby(key, f"{operation}|count", 1)
+		if failed:
+			pipeline.hincrby(key, f"{operation}|errors", 1)
+		pipeline.hincrby(key, f"{operation}|{_get_bucket(seconds * 1000)}", 1)
+		pipeline.expire(key, METRICS_RETENTION_HOURS * 3600)
+		pipeline.execute()
+	except Exception:
+		# Metrics must never fail a payment.
+		pass
+
+
+def _load_metrics(hours: int) -> dict[str, dict]:
+	current = int(time.time()) // 3600
+	pipeline = frappe.cache.pipeline()
+	for hour in range(current - hours + 1, current + 1):
+		pipeline.hgetall(_get_hour_key(hour))
+
+	stats = {}
+	for values in pipeline.execute():
+		for field, count in values.items():
+			operation, _sep, name = frappe.safe_decode(field).rpartition("|")
+			entry = stats.setdefault(operation, {"count": 0, "errors": 0, "buckets": Counter()})
+			if name in ("count", "errors"):
+				entry[name] += int(count)
+			else:
+				entry["buckets"][int(name)] += int(count)
+	return stats
+
+
+def _summarize(count: int, errors: int, buckets) -> dict:
+	return {
+		"count": count,
+		"errors": errors,
+		"error_rate": round(errors * 100 / count, 2) if count else 0,
+		**get_percentiles(buckets),
+	}
+
+
+def get_sumup_metrics(hours: int = DEFAULT_METRICS_HOURS) -> dict:
+	hours = min(max(1, cint(hours)), METRICS_RETENTION_HOURS)
+	stats = _load_metrics(hours)
+	operations = [
+		{"operation": operation, **_summarize(entry["count"], entry["errors"], entry["buckets"])}
+		for operation, entry in sorted(stats.items())
+	]
+
+	total_buckets = Counter()
+	for entry in stats.values():
+		total_buckets.update(entry["buckets"])
+	total = _summarize(
+		sum(entry["count"] for entry in stats.values()),
+		sum(entry["errors"] for entry in stats.values()),
+		total_buckets,
+	)
+	return {"hours": hours, "operations": operations, "total": total}
+
+
+@frappe.whitelist()
+def get_sumup_call_metrics(hours: int = DEFAULT_METRICS_HOURS):
+	frappe.only_for("System Manager")
+	return get_sumup_metrics(hours)
+
+
+def _can_read_metrics() -> bool:
+	return "System Manager" in frappe.get_roles()
+
+
+@frappe.whitelist()
+def get_sumup_latency_card(filters=None):
+	# The workspace is public, so other users get an empty card instead of a permission error.
+	if not _can_read_metrics():
+		return {"value": None, "fieldtype": "Float"}
+	return {"value": get_sumup_metrics()["total"]["p95"] or 0, "fieldtype": "Float"}
+
+
+@frappe.whitelist()
+def get_sumup_error_rate_card(filters=None):
+	if not _can_read_metrics():
+		return {"value": None, "fieldtype": "Percent"}
+	return {"value": get_sumup_metrics()["total"]["error_rate"], "fieldtype": "Percent"}
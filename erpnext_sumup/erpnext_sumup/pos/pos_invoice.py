@@ -1,19 +1,84 @@
 # Copyright (c) 2025, RocketQuackIT and contributors
 # For license information, please see license.txt
 
-from decimal import ROUND_HALF_UP, Decimal
+import hashlib
+import hmac
+import random
+from urllib.parse import urlencode
 
 import frappe
 from frappe import _
-from frappe.utils import cint, flt
-
-from erpnext_sumup.erpnext_sumup.integrations.sumup_client import get_sumup_client, get_sumup_settings
-from erpnext_sumup.erpnext_sumup.pos.pos_profile import _ensure_terminal_enabled
+from frappe.query_builder.functions import Coalesce
+from frappe.utils import cint, flt, get_url, now_datetime, time_diff_in_seconds
+from frappe.utils.password import get_encryption_key
+
+from erpnext_sumup.erpnext_sumup.doctype.sumup_refund.sumup_refund import (
+	REFUND_INVOICE_STATUSES,
+	REFUND_OPEN_STATUSES,
+	get_recorded_refund,
+	get_refund_status,
+	get_refund_totals,
+	queue_sumup_refund,
+)
+from erpnext_sumup.erpnext_sumup.integrations.sumup_capabilities import call_with_raw_fallback
+from erpnext_sumup.erpnext_sumup.integrations.sumup_client import (
+	call_sumup,
+	get_merchant_currency,
+	get_sumup_client,
+	get_sumup_settings,
+)
+from erpnext_sumup.erpnext_sumup.integrations.sumup_currency import get_currency_minor_unit, to_minor_value
+from erpnext_sumup.erpnext_sumup.integrations.sumup_fields import compile_fields
+from erpnext_sumup.erpnext_sumup.pos.pos_profile import get_enabled_profile_terminal
 
 SUMUP_FINAL_STATUSES = {"SUCCESSFUL", "FAILED", "CANCELLED"}
+SUMUP_WEBHOOK_METHOD = "erpnext_sumup.erpnext_sumup.pos.pos_invoice.handle_sumup_webhook"
+SUMUP_CHECKOUT_JOB_METHOD = "erpnext_sumup.erpnext_sumup.pos.pos_invoice.run_sumup_checkout_job"
+SUMUP_CHECKOUT_JOB_PREFIX = "sumup_checkout::"
+SUMUP_CHECKOUT_JOB_TIMEOUT = 120
+SUMUP_CHECKOUT_EVENT = "sumup_checkout_started"
+SUMUP_POLL_INTERVAL_MS = 3000
+SUMUP_WEBHOOK_POLL_INTERVAL_MS = 15000
+SUMUP_POLL_BACKOFF_STEP_SECONDS = 10
+SUMUP_POLL_MAX_FACTOR = 5
+SUMUP_POLL_JITTER = 0.2
+REFUND_PREVIEW_CACHE_KEY = "erpnext_sumup:refund_preview"
+REFUND_PREVIEW_TTL_SECONDS = 60
+SUMUP_INVOICE_FIELDS = [
+	"name",
+	"owner",
+	"docstatus",
+	"pos_profile",
+	"is_return",
+	"return_against",
+	"currency",
+	"grand_total",
+	"rounded_total",
+	"sumup_status",
+	"sumup_client_transaction_id",
+	"sumup_transaction_id",
+	"sumup_amount",
+	"sumup_currency",
+	"sumup_refund_status",
+	"sumup_refund_amount",
+	"sumup_started_at",
+]
 sumup_payment_logger = frappe.logger("sumup_payment", allow_site=True)
 sumup_refund_logger = frappe.logger("sumup_refund", allow_site=True)
 
+_TRANSACTION_FIELDS = compile_fields(
+	{
+		"status": ("status", "simple_status"),
+		"amount": ("amount",),
+		"currency": ("currency",),
+		"transaction_id": ("id", "transaction_id", "transactionId", "transaction_code", "transactionCode"),
+		"refunded_amount": ("refunded_amount",),
+	},
+	nested=("data", "transaction"),
+	first_item="items",
+)
+_CHECKOUT_RESPONSE_FIELDS = compile_fields({"client_transaction_id": ("data.client_transaction_id",)})
+
 
 def _safe_debug_payload(value):
 	if value is None:
@@ -42,6 +107,10 @@ def _extract_sumup_error_details(exc):
 	return details
 
 
+def _get_refund_error_text(error_details: dict) -> str:
+	return str(error_details.get("body") or error_details.get("message"))
+
+
 def _publish_sumup_refund_debug(doc, step, details=None):
 	settings = get_sumup_settings()
 	if not getattr(settings, "enable_debug_logging", 0):
@@ -54,6 +123,83 @@ def _publish_sumup_refund_debug(doc, step, details=None):
 		pass
 
 
+def _get_sumup_webhook_token(pos_invoice: str) -> str:
+	secret = get_encryption_key()
+	message = f"sumup-webhook:{pos_invoice}"
+	return hmac.new(secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _get_sumup_webhook_url(pos_invoice: str) -> str:
+	query = urlencode({"pos_invoice": pos_invoice, "token": _get_sumup_webhook_token(pos_invoice)})
+	return get_url(f"/api/method/{SUMUP_WEBHOOK_METHOD}?{query}")
+
+
+def _get_sumup_poll_interval(settings) -> int:
+	if getattr(settings, "enable_webhooks", 0):
+		return SUMUP_WEBHOOK_POLL_INTERVAL_MS
+	return SUMUP_POLL_INTERVAL_MS
+
+
+def _get_next_poll_after_ms(started_at, settings) -> int:
+	base = _get_sumup_poll_interval(settings)
+	elapsed = 0
+	if started_at:
+		try:
+			elapsed = max(0, time_diff_in_seconds(now_datetime(), started_at))
+		except Exception:
+			elapsed = 0
+
+	# Double the interval for every backoff step since the checkout started, capped at
+	# SUMUP_POLL_MAX_FACTOR times the base interval, and spread tills apart with jitter.
+	exponent = min(int(elapsed // SUMUP_POLL_BACKOFF_STEP_SECONDS), 8)
+	delay = base * min(2**exponent, SUMUP_POLL_MAX_FACTOR)
+	jitter = delay * random.uniform(-SUMUP_POLL_JITTER, SUMUP_POLL_JITTER)
+	return int(delay + jitter)
+
+
+def _get_persisted_sumup_payment_status(doc):
+	status = (getattr(doc, "sumup_status", "") or "").upper()
+	if status not in SUMUP_FINAL_STATUSES:
+		return None
+
+	return {
+		"status": status,
+		"amount": getattr(doc, "sumup_amount", None),
+		"currency": getattr(doc, "sumup_currency", None),
+		"transaction_id": getattr(doc, "sumup_transaction_id", None) or None,
+		"refunded_amount": getattr(doc, "sumup_refund_amount", None),
+		"next_poll_after_ms": None,
+	}
+
+
+def _extract_webhook_event(data):
+	if not isinstance(data, dict):
+		return {}
+
+	payload = data.get("payload")
+	if isinstance(payload, dict):
+		return payload
+
+	return data
+
+
+def _publish_sumup_payment_status(invoice, result):
+	payload = {"pos_invoice": invoice.name}
+	payload.update(result or {})
+	try:
+		frappe.publish_realtime("sumup_payment_status", payload, user=invoice.owner, after_commit=True)
+	except Exception:
+		pass
+
+
+def _get_sumup_invoice(pos_invoice: str):
+	"""Load the POS Invoice columns the SumUp endpoints use, without child tables."""
+	invoice = frappe.db.get_value("POS Invoice", pos_invoice, SUMUP_INVOICE_FIELDS, as_dict=True)
+	if not invoice:
+		frappe.throw(_("{0} {1} not found").format(_("POS Invoice"), pos_invoice), frappe.DoesNotExistError)
+	return invoice
+
+
 def _get_sumup_payment_modes(pos_profile_doc):
 	return {
 		row.mode_of_payment for row in pos_profile_doc.payments or [] if getattr(row, "use_sumup_terminal", 0)
@@ -85,6 +231,35 @@ def _get_refund_amount(doc) -> float:
 	return abs(_get_invoice_total(doc))
 
 
+def _get_return_rows(names: list[str]) -> dict:
+	"""Load the returns together with the SumUp fields of their originals in one query."""
+	invoice = frappe.qb.DocType("POS Invoice")
+	original = frappe.qb.DocType("POS Invoice").as_("original")
+	rows = (
+		frappe.qb.from_(invoice)
+		.left_join(original)
+		.on(original.name == invoice.return_against)
+		.select(
+			invoice.name,
+			invoice.is_return,
+			invoice.docstatus,
+			invoice.return_against,
+			invoice.currency,
+			invoice.grand_total,
+			invoice.rounded_total,
+			invoice.sumup_refund_status,
+			original.sumup_transaction_id,
+			original.sumup_status,
+			original.sumup_amount,
+			original.sumup_refund_amount,
+			original.sumup_currency,
+			original.currency.as_("original_currency"),
+		)
+		.where(invoice.name.isin(names))
+	).run(as_dict=True)
+	return {row.name: row for row in rows}
+
+
 def _get_sumup_payment_breakdown(doc, sumup_modes):
 	sumup_rows = []
 	sumup_amount = 0
@@ -101,178 +276,36 @@ def _get_sumup_payment_breakdown(doc, sumup_modes):
 	return sumup_rows, sumup_amount, other_amount
 
 
-def _get_minor_unit(currency: str) -> int:
-	fraction_units = frappe.db.get_value("Currency", currency, "fraction_units", cache=True)
-	if fraction_units:
-		try:
-			fraction_units = int(fraction_units)
-			if fraction_units <= 0:
-				return 0
-			return max(0, len(str(abs(fraction_units))) - 1)
-		except Exception:
-			pass
-
-	smallest = frappe.db.get_value(
-		"Currency",
-		currency,
-		"smallest_currency_fraction_value",
-		cache=True,
-	)
-	if smallest:
-		try:
-			decimal = Decimal(str(smallest)).normalize()
-			return max(0, -decimal.as_tuple().exponent)
-		except Exception:
-			pass
-
-	return 2
-
-
-def _to_minor_value(amount: float, minor_unit: int) -> int:
-	scale = Decimal(10) ** minor_unit
-	value = (Decimal(str(amount)) * scale).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
-	return int(value)
-
-
 def _get_sumup_terminal_from_profile(pos_profile_doc):
-	terminal_name = (getattr(pos_profile_doc, "sumup_terminal", "") or "").strip()
-	_ensure_terminal_enabled(terminal_name)
-	terminal = frappe.db.get_value(
-		"SumUp Terminal",
-		terminal_name,
-		["name", "terminal_id"],
-		as_dict=True,
-	)
-	if not terminal or not terminal.get("terminal_id"):
-		frappe.throw(_("Terminal ID is missing for SumUp Terminal {0}.").format(terminal_name))
-	return terminal
+	return get_enabled_profile_terminal(pos_profile_doc.name)
 
 
 def _extract_client_transaction_id(response):
-	data = getattr(response, "data", None)
-	if data:
-		value = getattr(data, "client_transaction_id", None)
-		if value:
-			return value
-		if isinstance(data, dict):
-			return data.get("client_transaction_id")
-
-	if isinstance(response, dict):
-		data = response.get("data") or {}
-		if isinstance(data, dict):
-			return data.get("client_transaction_id")
-
-	return None
-
-
-def _extract_transaction_status(transaction):
-	if transaction is None:
-		return None
+	return _CHECKOUT_RESPONSE_FIELDS.resolve_one(response, "client_transaction_id")
 
-	status = getattr(transaction, "status", None) or getattr(transaction, "simple_status", None)
-	if status:
-		return str(status).upper()
-
-	if isinstance(transaction, dict):
-		value = transaction.get("status") or transaction.get("simple_status")
-		if value:
-			return str(value).upper()
-		for key in ("data", "transaction"):
-			nested = transaction.get(key)
-			value = _extract_transaction_status(nested)
-			if value:
-				return value
-		items = transaction.get("items")
-		if isinstance(items, list) and items:
-			value = _extract_transaction_status(items[0])
-			if value:
-				return value
-
-	return None
-
-
-def _extract_transaction_amount_currency(transaction):
-	amount = getattr(transaction, "amount", None)
-	currency = getattr(transaction, "currency", None)
-	if isinstance(transaction, dict):
-		if amount is None:
-			amount = transaction.get("amount")
-		if not currency:
-			currency = transaction.get("currency")
-		if amount is None or not currency:
-			for key in ("data", "transaction"):
-				nested = transaction.get(key)
-				if isinstance(nested, dict):
-					if amount is None:
-						amount = nested.get("amount", amount)
-					if not currency:
-						currency = nested.get("currency", currency)
-			if (amount is None or not currency) and isinstance(transaction.get("items"), list):
-				items = transaction.get("items")
-				if items:
-					nested_amount, nested_currency = _extract_transaction_amount_currency(items[0])
-					if amount is None:
-						amount = nested_amount
-					if not currency:
-						currency = nested_currency
-	return amount, currency
-
-
-def _extract_transaction_refunded_amount(transaction):
-	if transaction is None:
-		return None
 
-	value = getattr(transaction, "refunded_amount", None)
-	if value is not None:
-		return value
+def _extract_transaction_fields(transaction) -> dict:
+	values = _TRANSACTION_FIELDS.resolve(transaction)
+	if values["status"] is not None:
+		values["status"] = str(values["status"]).upper()
+	if values["transaction_id"] is not None:
+		values["transaction_id"] = str(values["transaction_id"])
+	return values
 
-	if isinstance(transaction, dict):
-		if "refunded_amount" in transaction:
-			return transaction.get("refunded_amount")
-		for key in ("data", "transaction"):
-			nested = transaction.get(key)
-			value = _extract_transaction_refunded_amount(nested)
-			if value is not None:
-				return value
-		items = transaction.get("items")
-		if isinstance(items, list) and items:
-			value = _extract_transaction_refunded_amount(items[0])
-			if value is not None:
-				return value
-
-	return None
-
-
-def _extract_transaction_id(transaction):
-	if transaction is None:
-		return None
 
-	value = getattr(transaction, "id", None)
-	if value:
-		return str(value)
-
-	if isinstance(transaction, dict):
-		value = (
-			transaction.get("id")
-			or transaction.get("transaction_id")
-			or transaction.get("transactionId")
-			or transaction.get("transaction_code")
-			or transaction.get("transactionCode")
-		)
-		if value:
-			return str(value)
-		for key in ("data", "transaction"):
-			nested = transaction.get(key)
-			value = _extract_transaction_id(nested)
-			if value:
-				return value
-		items = transaction.get("items")
-		if isinstance(items, list) and items:
-			value = _extract_transaction_id(items[0])
-			if value:
-				return value
-
-	return None
+def _get_sumup_status_update_values(fields: dict) -> dict:
+	update_values = {}
+	if fields.get("amount") is not None:
+		update_values["sumup_amount"] = fields["amount"]
+	if fields.get("currency"):
+		update_values["sumup_currency"] = fields["currency"]
+	if fields.get("transaction_id"):
+		update_values["sumup_transaction_id"] = fields["transaction_id"]
+	if fields.get("refunded_amount") is not None:
+		update_values["sumup_refund_amount"] = fields["refunded_amount"]
+	if fields.get("status") in SUMUP_FINAL_STATUSES:
+		update_values["sumup_status"] = fields["status"]
+	return update_values
 
 
 def _set_sumup_refund_state(doc, status, refund_amount, transaction_id):
@@ -293,30 +326,55 @@ def _set_sumup_refund_state(doc, status, refund_amount, transaction_id):
 
 
 def _update_original_refund_amount(original, refund_amount):
-	refunded_total = flt(getattr(original, "sumup_refund_amount", 0) or 0)
-	frappe.db.set_value(
-		"POS Invoice",
-		original.name,
-		"sumup_refund_amount",
-		refunded_total + refund_amount,
-		update_modified=False,
-	)
+	# Incremented in the database, so parallel refunds against one invoice cannot lose an update.
+	table = frappe.qb.DocType("POS Invoice")
+	(
+		frappe.qb.update(table)
+		.set(table.sumup_refund_amount, Coalesce(table.sumup_refund_amount, 0) + refund_amount)
+		.where(table.name == original.name)
+	).run()
+
+
+def _get_refund_payload(refund_amount):
+	try:
+		from sumup.transactions.resource import RefundTransactionBody
+	except Exception:
+		return {"amount": refund_amount}
+	return RefundTransactionBody(amount=refund_amount)
+
+
+def _split_refund_totals(totals: dict, original_refund_amount) -> tuple[float, float]:
+	# sumup_refund_amount is synced from the SumUp transaction, so it also covers refunds made in SumUp.
+	refunded_total = max(flt(totals.get("Successful")), flt(original_refund_amount))
+	open_total = sum(flt(totals.get(status)) for status in REFUND_OPEN_STATUSES)
+	return refunded_total, open_total
+
+
+def _get_original_refund_totals(original, return_against, exclude_return):
+	"""Return the refunded and the still open amount of the original invoice."""
+	totals = get_refund_totals(return_against, exclude_return=exclude_return)
+	return _split_refund_totals(totals, getattr(original, "sumup_refund_amount", 0) or 0)
 
 
 def _refresh_original_refund_amount(original):
 	try:
-		get_sumup_payment_status(original.name)
-		return frappe.get_doc("POS Invoice", original.name)
+		_lookup_sumup_payment_status(_get_sumup_invoice(original.name))
+		return _get_sumup_invoice(original.name)
 	except Exception:
 		return None
 
 
-def _get_sumup_refund_context(doc, *, strict_missing_transaction=False):
+def _get_sumup_refund_context(doc, *, strict_missing_transaction=False, lock_original=False):
 	return_against = _get_return_against(doc)
 	if not return_against:
 		return None
 
-	original = frappe.get_doc("POS Invoice", return_against)
+	if lock_original:
+		# Parallel returns against the same invoice wait here, so each one sees the refunds
+		# queued by the others when checking the remaining amount.
+		frappe.db.get_value("POS Invoice", return_against, "name", for_update=True)
+
+	original = _get_sumup_invoice(return_against)
 	transaction_id = (getattr(original, "sumup_transaction_id", "") or "").strip()
 	original_has_sumup = bool(
 		getattr(original, "sumup_client_transaction_id", None) or getattr(original, "sumup_status", None)
@@ -345,9 +403,9 @@ def _get_sumup_refund_context(doc, *, strict_missing_transaction=False):
 			)
 		)
 
-	refunded_total = flt(getattr(original, "sumup_refund_amount", 0) or 0)
 	paid_total = flt(getattr(original, "sumup_amount", 0) or 0)
-	if paid_total and refunded_total + refund_amount > paid_total + 0.0001:
+	refunded_total, open_total = _get_original_refund_totals(original, return_against, doc.name)
+	if paid_total and refunded_total + open_total + refund_amount > paid_total + 0.0001:
 		frappe.throw(_("SumUp refund amount exceeds the original payment amount."))
 
 	return {
@@ -359,7 +417,12 @@ def _get_sumup_refund_context(doc, *, strict_missing_transaction=False):
 	}
 
 
-def _attempt_sumup_return_refund(doc, context, *, raise_on_error):
+def _attempt_sumup_return_refund(doc, context, *, raise_on_error, reraise_if=None):
+	"""Send the refund and record the outcome on the return invoice.
+
+	Errors for which `reraise_if(exc)` is true are raised unchanged and leave the refund
+	state alone, so the caller can retry them.
+	"""
 	original = context["original"]
 	return_against = context["return_against"]
 	transaction_id = context["transaction_id"]
@@ -367,14 +430,17 @@ def _attempt_sumup_return_refund(doc, context, *, raise_on_error):
 	refunded_total = context["refunded_total"]
 
 	client = get_sumup_client(require_enabled=False)
-	try:
-		from sumup.transactions.resource import RefundTransactionBody
-	except Exception:
-		RefundTransactionBody = None
+	if get_refund_status(doc.name, transaction_id, refund_amount) == "Successful":
+		# Recorded in the refund ledger: repeating it would only end in a 409.
+		_set_sumup_refund_state(doc, "SUCCESSFUL", refund_amount, transaction_id)
+		_publish_sumup_refund_debug(
+			doc,
+			"success",
+			{"reason": "already_refunded", "transaction_id": transaction_id, "amount": refund_amount},
+		)
+		return True
 
-	payload = (
-		RefundTransactionBody(amount=refund_amount) if RefundTransactionBody else {"amount": refund_amount}
-	)
+	payload = _get_refund_payload(refund_amount)
 	sumup_refund_logger.info(
 		"SumUp refund call (doc=%s original=%s transaction_id=%s amount=%s)",
 		doc.name,
@@ -392,11 +458,15 @@ def _attempt_sumup_return_refund(doc, context, *, raise_on_error):
 		},
 	)
 	try:
-		client.transactions.refund(transaction_id, payload)
+		call_sumup("transactions.refund", client.transactions.refund, transaction_id, payload)
 	except Exception as exc:
 		status_code = getattr(exc, "status", None)
 		error_details = _extract_sumup_error_details(exc)
+		if reraise_if and reraise_if(exc):
+			raise
 		is_conflict = status_code == 409 or str(exc).lower() == "conflict"
+		# The ledger had no successful refund, e.g. because an earlier response was lost, so
+		# only SumUp can tell whether this refund went through.
 		if is_conflict:
 			refreshed_original = _refresh_original_refund_amount(original)
 			if refreshed_original:
@@ -430,8 +500,9 @@ def _attempt_sumup_return_refund(doc, context, *, raise_on_error):
 			},
 		)
 		_set_sumup_refund_state(doc, "FAILED", refund_amount, transaction_id)
+		error_text = _get_refund_error_text(error_details)
+		context["error"] = error_text
 		if raise_on_error:
-			error_text = error_details.get("body") or error_details.get("message") or str(exc)
 			frappe.throw(_("SumUp refund failed: {0}").format(error_text))
 		return False
 
@@ -463,8 +534,7 @@ def validate_pos_invoice_sumup_currency(doc, method=None):
 	if not _invoice_uses_sumup_payment(doc.payments, sumup_modes):
 		return
 
-	settings = get_sumup_settings()
-	merchant_currency = (getattr(settings, "merchant_currency", "") or "").strip()
+	merchant_currency = get_merchant_currency()
 	if not merchant_currency:
 		frappe.throw(_("SumUp merchant currency is missing. Please run Test Connection in SumUp Settings."))
 
@@ -530,6 +600,10 @@ def validate_pos_invoice_sumup_payment_status(doc, method=None):
 
 @frappe.whitelist()
 def start_sumup_payment(pos_invoice: str):
+	return _start_sumup_payment(pos_invoice, allow_async=True)
+
+
+def _start_sumup_payment(pos_invoice: str, *, allow_async=False):
 	doc = frappe.get_doc("POS Invoice", pos_invoice)
 	if doc.docstatus != 0:
 		frappe.throw(_("POS Invoice must be in Draft state."))
@@ -555,14 +629,17 @@ def start_sumup_payment(pos_invoice: str):
 	current_status = (getattr(doc, "sumup_status", "") or "").upper()
 	if current_status == "SUCCESSFUL":
 		frappe.throw(_("SumUp payment already completed."))
+
+	settings = get_sumup_settings()
 	if current_status == "PENDING" and getattr(doc, "sumup_client_transaction_id", None):
 		return {
 			"status": "PENDING",
 			"client_transaction_id": doc.sumup_client_transaction_id,
+			"poll_interval_ms": _get_sumup_poll_interval(settings),
+			"webhook": bool(getattr(settings, "enable_webhooks", 0)),
 			"message": _("SumUp payment already in progress."),
 		}
 
-	settings = get_sumup_settings()
 	debug_enabled = bool(getattr(settings, "enable_debug_logging", 0))
 	if not settings.enabled:
 		if debug_enabled:
@@ -575,10 +652,12 @@ def start_sumup_payment(pos_invoice: str):
 
 	terminal = _get_sumup_terminal_from_profile(pos_profile)
 	reader_id = terminal.get("terminal_id")
+	if allow_async and cint(getattr(settings, "enable_async_checkout", 0)):
+		return _enqueue_sumup_checkout(doc.name, settings)
 
 	currency = (getattr(doc, "currency", "") or "").strip()
-	minor_unit = _get_minor_unit(currency)
-	value = _to_minor_value(total, minor_unit)
+	minor_unit = get_currency_minor_unit(currency)
+	value = to_minor_value(total, minor_unit)
 	debug_details = None
 	if debug_enabled:
 		debug_details = {
@@ -602,6 +681,9 @@ def start_sumup_payment(pos_invoice: str):
 			"value": value,
 		}
 	}
+	webhook_enabled = bool(getattr(settings, "enable_webhooks", 0))
+	if webhook_enabled:
+		payload_data["return_url"] = _get_sumup_webhook_url(doc.name)
 	payload = CreateReaderCheckoutBody(**payload_data) if CreateReaderCheckoutBody else payload_data
 
 	if debug_enabled:
@@ -615,7 +697,9 @@ def start_sumup_payment(pos_invoice: str):
 			minor_unit,
 		)
 	try:
-		response = client.readers.create_checkout(merchant_code, reader_id, payload)
+		response = call_sumup(
+			"readers.create_checkout", client.readers.create_checkout, merchant_code, reader_id, payload
+		)
 	except Exception as exc:
 		if debug_enabled:
 			sumup_payment_logger.exception(
@@ -647,6 +731,7 @@ def start_sumup_payment(pos_invoice: str):
 			"sumup_client_transaction_id": client_transaction_id,
 			"sumup_amount": total,
 			"sumup_currency": currency,
+			"sumup_started_at": now_datetime(),
 		},
 		update_modified=False,
 	)
@@ -654,6 +739,8 @@ def start_sumup_payment(pos_invoice: str):
 	result = {
 		"status": "PENDING",
 		"client_transaction_id": client_transaction_id,
+		"webhook": webhook_enabled,
+		"poll_interval_ms": _get_sumup_poll_interval(settings),
 		"message": _("SumUp payment started."),
 	}
 	if debug_enabled and debug_details:
@@ -661,9 +748,96 @@ def start_sumup_payment(pos_invoice: str):
 	return result
 
 
+def _enqueue_sumup_checkout(pos_invoice: str, settings):
+	job_id = f"{SUMUP_CHECKOUT_JOB_PREFIX}{pos_invoice}"
+	# A second click while the job is queued or running must not start another checkout.
+	frappe.enqueue(
+		SUMUP_CHECKOUT_JOB_METHOD,
+		queue="short",
+		timeout=SUMUP_CHECKOUT_JOB_TIMEOUT,
+		job_id=job_id,
+		deduplicate=True,
+		pos_invoice=pos_invoice,
+	)
+	return {
+		"status": "QUEUED",
+		"job_id": job_id,
+		"poll_interval_ms": _get_sumup_poll_interval(settings),
+		"message": _("SumUp payment is being started."),
+	}
+
+
+def run_sumup_checkout_job(pos_invoice: str):
+	"""Background job: create the reader checkout and tell the cashier over realtime."""
+	user = frappe.session.user
+	try:
+		result = _start_sumup_payment(pos_invoice)
+	except Exception as exc:
+		frappe.db.rollback()
+		frappe.clear_messages()
+		if not isinstance(exc, frappe.ValidationError):
+			frappe.log_error(
+				title=_("SumUp checkout failed"),
+				reference_doctype="POS Invoice",
+				reference_name=pos_invoice,
+			)
+		frappe.publish_realtime(
+			SUMUP_CHECKOUT_EVENT,
+			{
+				"pos_invoice": pos_invoice,
+				"status": "ERROR",
+				"message": str(exc) or _("Unable to start SumUp payment."),
+			},
+			user=user,
+		)
+		return
+
+	# After commit, so the cashier's first status poll already sees the pending checkout.
+	frappe.publish_realtime(
+		SUMUP_CHECKOUT_EVENT,
+		{**result, "pos_invoice": pos_invoice},
+		user=user,
+		after_commit=True,
+	)
+
+
 @frappe.whitelist()
 def get_sumup_payment_status(pos_invoice: str):
-	doc = frappe.get_doc("POS Invoice", pos_invoice)
+	doc = _get_sumup_invoice(pos_invoice)
+	persisted = _get_persisted_sumup_payment_status(doc)
+	if persisted:
+		return persisted
+
+	result = _lookup_sumup_payment_status(doc)
+	if result.get("status") in SUMUP_FINAL_STATUSES:
+		result["next_poll_after_ms"] = None
+	else:
+		result["next_poll_after_ms"] = _get_next_poll_after_ms(
+			getattr(doc, "sumup_started_at", None),
+			get_sumup_settings(),
+		)
+	return result
+
+
+def _get_pending_lookup_result(doc, debug_details):
+	"""SumUp answers 404 until the checkout shows up as a transaction."""
+	result = {
+		"status": "PENDING",
+		"amount": None,
+		"currency": None,
+	}
+	if debug_details is not None:
+		debug_details["status_code"] = 404
+		sumup_payment_logger.info(
+			"SumUp status 404 -> pending (doc=%s client_transaction_id=%s)",
+			doc.name,
+			debug_details.get("client_transaction_id"),
+		)
+		result["debug_details"] = debug_details
+	return result
+
+
+def _lookup_sumup_payment_status(doc):
 	transaction_id = getattr(doc, "sumup_client_transaction_id", None)
 	if not transaction_id:
 		frappe.throw(_("SumUp payment is missing a transaction id."))
@@ -708,82 +882,43 @@ def get_sumup_payment_status(pos_invoice: str):
 			merchant_code,
 			client_transaction_id,
 		)
-	try:
-		transaction = client.transactions.get(merchant_code, params=params)
-	except Exception as exc:
-		status_code = getattr(exc, "status", None)
-		if status_code == 404:
-			if debug_enabled and debug_details is not None:
-				debug_details["status_code"] = 404
-			if debug_enabled:
-				sumup_payment_logger.info(
-					"SumUp status 404 -> pending (doc=%s client_transaction_id=%s)",
-					doc.name,
-					client_transaction_id,
-				)
-			result = {
-				"status": "PENDING",
-				"amount": None,
-				"currency": None,
-			}
-			if debug_enabled and debug_details:
-				result["debug_details"] = debug_details
-			return result
-		is_validation_error = False
-		try:
-			import pydantic
-		except Exception:
-			pydantic = None
 
-		if pydantic and isinstance(exc, pydantic.ValidationError):
-			is_validation_error = True
-		elif exc.__class__.__name__ == "ValidationError":
-			is_validation_error = True
-
-		if not is_validation_error:
-			if debug_enabled:
-				sumup_payment_logger.exception(
-					"SumUp status error (doc=%s client_transaction_id=%s)",
-					doc.name,
-					client_transaction_id,
-				)
-			frappe.throw(_("SumUp API error: {0}").format(exc))
+	http_client = getattr(client, "_client", None)
 
-		http_client = getattr(client, "_client", None)
+	def fetch_raw_transaction():
+		# Fallback for SDK versions whose models reject valid transaction responses.
 		if http_client is None:
 			frappe.throw(_("SumUp API error: client transport not available."))
+		return call_sumup(
+			"transactions.get_raw",
+			http_client.get,
+			f"/v2.1/merchants/{merchant_code}/transactions",
+			params=params_dict,
+		)
 
-		try:
-			response = http_client.get(
-				f"/v2.1/merchants/{merchant_code}/transactions",
-				params=params_dict,
+	try:
+		transaction, is_raw = call_with_raw_fallback(
+			"transactions.get",
+			lambda: call_sumup("transactions.get", client.transactions.get, merchant_code, params=params),
+			fetch_raw_transaction,
+		)
+	except frappe.ValidationError:
+		raise
+	except Exception as exc:
+		if getattr(exc, "status", None) == 404:
+			return _get_pending_lookup_result(doc, debug_details)
+		if debug_enabled:
+			sumup_payment_logger.exception(
+				"SumUp status error (doc=%s client_transaction_id=%s)",
+				doc.name,
+				client_transaction_id,
 			)
-		except Exception as raw_exc:
-			if debug_enabled:
-				sumup_payment_logger.exception(
-					"SumUp status fallback error (doc=%s client_transaction_id=%s)",
-					doc.name,
-					client_transaction_id,
-				)
-			frappe.throw(_("SumUp API error: {0}").format(raw_exc))
+		frappe.throw(_("SumUp API error: {0}").format(exc))
 
+	if is_raw:
+		response = transaction
 		if response.status_code == 404:
-			if debug_enabled and debug_details is not None:
-				debug_details["status_code"] = 404
-			if debug_enabled:
-				sumup_payment_logger.info(
-					"SumUp status fallback 404 -> pending (doc=%s client_transaction_id=%s)",
-					doc.name,
-					client_transaction_id,
-				)
-			result = {
-				"status": "PENDING",
-				"amount": None,
-				"currency": None,
-			}
-			if debug_enabled and debug_details:
-				result["debug_details"] = debug_details
-			return result
+			return _get_pending_lookup_result(doc, debug_details)
 		if response.status_code != 200:
 			detail = f" {response.text}" if response.text else ""
 			frappe.throw(_("SumUp API error: {0}{1}").format(response.status_code, detail))
@@ -799,23 +934,14 @@ def get_sumup_payment_status(pos_invoice: str):
 				)
 			frappe.throw(_("SumUp API error: {0}").format(raw_exc))
 
-	status = _extract_transaction_status(transaction) or "UNKNOWN"
-	amount, currency = _extract_transaction_amount_currency(transaction)
-	transaction_id = _extract_transaction_id(transaction)
-	refunded_amount = _extract_transaction_refunded_amount(transaction)
-
-	update_values = {}
-	if amount is not None:
-		update_values["sumup_amount"] = amount
-	if currency:
-		update_values["sumup_currency"] = currency
-	if transaction_id:
-		update_values["sumup_transaction_id"] = transaction_id
-	if refunded_amount is not None:
-		update_values["sumup_refund_amount"] = refunded_amount
-	if status in SUMUP_FINAL_STATUSES:
-		update_values["sumup_status"] = status
+	fields = _extract_transaction_fields(transaction)
+	status = fields["status"] or "UNKNOWN"
+	amount = fields["amount"]
+	currency = fields["currency"]
+	transaction_id = fields["transaction_id"]
+	refunded_amount = fields["refunded_amount"]
 
+	update_values = _get_sumup_status_update_values(fields)
 	if update_values:
 		frappe.db.set_value(
 			"POS Invoice",
@@ -855,10 +981,64 @@ def get_sumup_payment_status(pos_invoice: str):
 	return result
 
 
+@frappe.whitelist(allow_guest=True, methods=["POST"])
+def handle_sumup_webhook(pos_invoice: str | None = None, token: str | None = None, **kwargs):
+	if not pos_invoice or not token:
+		frappe.throw(_("Invalid SumUp webhook request."), frappe.AuthenticationError)
+
+	if not hmac.compare_digest(str(token), _get_sumup_webhook_token(pos_invoice)):
+		frappe.throw(_("Invalid SumUp webhook request."), frappe.AuthenticationError)
+
+	settings = get_sumup_settings()
+	if not settings.enabled or not getattr(settings, "enable_webhooks", 0):
+		return {"status": "ignored"}
+
+	invoice = frappe.db.get_value(
+		"POS Invoice",
+		pos_invoice,
+		["name", "owner", "sumup_client_transaction_id"],
+		as_dict=True,
+	)
+	if not invoice or not invoice.sumup_client_transaction_id:
+		return {"status": "ignored"}
+
+	request = getattr(frappe.local, "request", None)
+	data = request.get_json(silent=True) if request is not None else None
+	event = _extract_webhook_event(data or kwargs)
+	client_transaction_id = event.get("client_transaction_id") or event.get("clientTransactionId")
+	if client_transaction_id and client_transaction_id != invoice.sumup_client_transaction_id:
+		return {"status": "ignored"}
+
+	# Webhook payloads are not signed by SumUp, so the reported status is confirmed
+	# against the transactions API before it is persisted and pushed to the till.
+	result = get_sumup_payment_status(invoice.name)
+	_publish_sumup_payment_status(invoice, result)
+	return {"status": "ok"}
+
+
+def _get_refund_preview_row(pos_invoice: str):
+	# The confirm dialog asks again every time it opens; on_update drops the entry of a saved return.
+	key = f"{REFUND_PREVIEW_CACHE_KEY}:{pos_invoice}"
+	row = frappe.cache.get_value(key)
+	if row is None:
+		row = _get_return_rows([pos_invoice]).get(pos_invoice)
+		if not row:
+			frappe.throw(
+				_("{0} {1} not found").format(_("POS Invoice"), pos_invoice), frappe.DoesNotExistError
+			)
+		frappe.cache.set_value(key, row, expires_in_sec=REFUND_PREVIEW_TTL_SECONDS)
+	return frappe._dict(row)
+
+
+def clear_refund_preview_cache(doc, method=None):
+	if getattr(doc, "is_return", 0):
+		frappe.cache.delete_value(f"{REFUND_PREVIEW_CACHE_KEY}:{doc.name}")
+
+
 @frappe.whitelist()
 def get_sumup_return_refund_preview(pos_invoice: str):
-	doc = frappe.get_doc("POS Invoice", pos_invoice)
-	if not getattr(doc, "is_return", 0):
+	row = _get_refund_preview_row(pos_invoice)
+	if not row.is_return:
 		return {"needs_refund": False}
 
 	settings = get_sumup_settings()
@@ -868,14 +1048,13 @@ def get_sumup_return_refund_preview(pos_invoice: str):
 			return {"needs_refund": False, "debug_details": {"reason": "settings_disabled"}}
 		return {"needs_refund": False}
 
-	return_against = _get_return_against(doc)
+	return_against = _get_return_against(row)
 	if not return_against:
 		if debug_enabled:
 			return {"needs_refund": False, "debug_details": {"reason": "return_against_missing"}}
 		return {"needs_refund": False}
 
-	original = frappe.get_doc("POS Invoice", return_against)
-	transaction_id = (getattr(original, "sumup_transaction_id", "") or "").strip()
+	transaction_id = (row.sumup_transaction_id or "").strip()
 	if not transaction_id:
 		if debug_enabled:
 			return {
@@ -887,7 +1066,7 @@ def get_sumup_return_refund_preview(pos_invoice: str):
 			}
 		return {"needs_refund": False}
 
-	refund_amount = _get_refund_amount(doc)
+	refund_amount = _get_refund_amount(row)
 	if refund_amount <= 0:
 		if debug_enabled:
 			return {
@@ -901,7 +1080,7 @@ def get_sumup_return_refund_preview(pos_invoice: str):
 			}
 		return {"needs_refund": False}
 
-	currency = (getattr(doc, "currency", "") or "").strip()
+	currency = (row.currency or "").strip()
 	result = {
 		"needs_refund": True,
 		"amount": refund_amount,
@@ -914,6 +1093,9 @@ def get_sumup_return_refund_preview(pos_invoice: str):
 			"transaction_id": transaction_id,
 			"amount": refund_amount,
 			"currency": currency,
+			"original_status": row.sumup_status,
+			"original_amount": flt(row.sumup_amount),
+			"original_refund_amount": flt(row.sumup_refund_amount),
 		}
 	return result
 
@@ -930,6 +1112,18 @@ def validate_sumup_return_refund(doc, method=None):
 	return
 
 
+def _apply_recorded_refund(doc) -> bool:
+	"""Sync the return with a refund already in the ledger, without loading the original."""
+	recorded = get_recorded_refund(doc.name)
+	if not recorded:
+		return False
+
+	status = REFUND_INVOICE_STATUSES[recorded.status]
+	if (getattr(doc, "sumup_refund_status", "") or "").upper() != status:
+		_set_sumup_refund_state(doc, status, flt(recorded.amount), recorded.transaction_id)
+	return True
+
+
 def process_sumup_return_refund_before_submit(doc, method=None):
 	if not doc or not getattr(doc, "is_return", 0):
 		return
@@ -941,22 +1135,43 @@ def process_sumup_return_refund_before_submit(doc, method=None):
 	if not settings.enabled:
 		frappe.throw(_("SumUp is disabled in settings."))
 
-	context = _get_sumup_refund_context(doc, strict_missing_transaction=True)
+	if _apply_recorded_refund(doc):
+		return
+
+	context = _get_sumup_refund_context(doc, strict_missing_transaction=True, lock_original=True)
 	if not context:
 		return
 
-	_attempt_sumup_return_refund(doc, context, raise_on_error=True)
+	_queue_return_refund(doc, context)
+
+
+def _queue_return_refund(doc, context, *, retry_failed=False):
+	# SumUp is called by a background job after the transaction commits, so the caller
+	# neither waits for SumUp nor holds its row locks during the request.
+	queue_sumup_refund(
+		return_invoice=doc.name,
+		return_against=context["return_against"],
+		transaction_id=context["transaction_id"],
+		amount=context["refund_amount"],
+		currency=getattr(doc, "currency", None),
+		retry_failed=retry_failed,
+	)
+	_set_sumup_refund_state(doc, "PENDING", context["refund_amount"], context["transaction_id"])
 
 
 @frappe.whitelist()
 def retry_sumup_return_refund(pos_invoice: str):
-	doc = frappe.get_doc("POS Invoice", pos_invoice)
+	doc = _get_sumup_invoice(pos_invoice)
 	if not doc or not getattr(doc, "is_return", 0):
 		frappe.throw(_("Refund retries are only available for return invoices."))
 
 	if doc.docstatus != 1:
 		frappe.throw(_("Refund retries are only available for submitted returns."))
 
+	if _apply_recorded_refund(doc):
+		message = _("SumUp refund retry completed with status: {0}.").format(doc.sumup_refund_status)
+		return {"status": doc.sumup_refund_status, "message": message}
+
 	settings = get_sumup_settings()
 	if not settings.enabled:
 		frappe.throw(_("SumUp is disabled in settings."))
@@ -965,26 +1180,19 @@ def retry_sumup_return_refund(pos_invoice: str):
 	if status != "FAILED":
 		frappe.throw(_("Refund can only be retried when status is FAILED."))
 
-	context = _get_sumup_refund_context(doc, strict_missing_transaction=True)
+	context = _get_sumup_refund_context(doc, strict_missing_transaction=True, lock_original=True)
 	if not context:
 		frappe.throw(_("SumUp refund cannot be processed for this return."))
 
-	_set_sumup_refund_state(
-		doc,
-		"PENDING",
-		context["refund_amount"],
-		context["transaction_id"],
-	)
-	_attempt_sumup_return_refund(doc, context, raise_on_error=False)
-
-	final_status = frappe.db.get_value("POS Invoice", doc.name, "sumup_refund_status")
-	message = _("SumUp refund retry completed with status: {0}.").format(final_status or "UNKNOWN")
-	return {"status": final_status, "message": message}
+	# The refund outbox claims the refund before sending it, so a retry can never race
+	# another retry or the outbox sweep into a second refund.
+	_queue_return_refund(doc, context, retry_failed=True)
+	return {"status": "PENDING", "message": _("SumUp refund queued for retry.")}
 
 
 @frappe.whitelist()
 def cancel_sumup_payment(pos_invoice: str):
-	doc = frappe.get_doc("POS Invoice", pos_invoice)
+	doc = _get_sumup_invoice(pos_invoice)
 	if not getattr(doc, "pos_profile", None):
 		frappe.throw(_("POS Profile is required."))
 
@@ -1004,7 +1212,7 @@ def cancel_sumup_payment(pos_invoice: str):
 	debug_enabled = bool(getattr(settings, "enable_debug_logging", 0))
 	debug_error = None
 	try:
-		client.readers.terminate_checkout(merchant_code, reader_id)
+		call_sumup("readers.terminate_checkout", client.readers.terminate_checkout, merchant_code, reader_id)
 	except Exception as exc:
 		debug_error = str(exc)
 
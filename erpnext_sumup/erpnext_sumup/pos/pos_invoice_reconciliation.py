@@ -0,0 +1,210 @@
+# Copyright (c) 2025, RocketQuackIT and contributors
+# For license information, please see license.txt
+
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+import frappe
+from frappe import _
+from frappe.query_builder.functions import Coalesce
+from frappe.utils import get_datetime, get_system_timezone, now_datetime
+
+from erpnext_sumup.erpnext_sumup.integrations.sumup_client import (
+	call_sumup,
+	get_max_parallel_requests,
+	get_sumup_client,
+	get_sumup_settings,
+	map_sumup_calls,
+)
+from erpnext_sumup.erpnext_sumup.integrations.sumup_fields import get_next_page_params
+from erpnext_sumup.erpnext_sumup.pos.pos_invoice import (
+	SUMUP_FINAL_STATUSES,
+	_extract_transaction_fields,
+	_get_sumup_status_update_values,
+	_publish_sumup_payment_status,
+)
+
+RECONCILE_WINDOW_MARGIN = timedelta(minutes=10)
+RECONCILE_CHECKOUT_DURATION = timedelta(minutes=30)
+RECONCILE_MIN_AGE = timedelta(minutes=5)
+# Older checkouts were abandoned; the scheduled run leaves them to the manual reconciliation.
+RECONCILE_MAX_AGE = timedelta(days=2)
+RECONCILE_PAGE_SIZE = 100
+RECONCILE_MAX_PAGES = 200
+
+sumup_reconciliation_logger = frappe.logger("sumup_reconciliation", allow_site=True)
+
+
+def _get_pending_sumup_invoices(started_before=None, started_after=None):
+	table = frappe.qb.DocType("POS Invoice")
+	# Payments started before the start time was recorded fall back to the invoice creation.
+	started_at = Coalesce(table.sumup_started_at, table.creation)
+	query = (
+		frappe.qb.from_(table)
+		.select(
+			table.name,
+			table.owner,
+			table.sumup_client_transaction_id,
+			table.sumup_started_at,
+			table.creation,
+		)
+		.where(
+			(table.sumup_status == "PENDING")
+			& (Coalesce(table.sumup_client_transaction_id, "") != "")
+			& (table.docstatus != 2)
+		)
+		.orderby(table.creation)
+	)
+	if started_before:
+		query = query.where(started_at < started_before)
+	if started_after:
+		query = query.where(started_at >= started_after)
+	return query.run(as_dict=True)
+
+
+def _get_history_windows(invoices, until) -> list[tuple]:
+	"""Merge the checkout periods of the invoices into as few history windows as possible."""
+	starts = sorted(get_datetime(row.sumup_started_at or row.creation) for row in invoices)
+	windows = []
+	for started_at in starts:
+		window_start = started_at - RECONCILE_WINDOW_MARGIN
+		window_end = min(started_at + RECONCILE_CHECKOUT_DURATION, until)
+		if windows and window_start <= windows[-1][1]:
+			windows[-1] = (windows[-1][0], max(windows[-1][1], window_end))
+		else:
+			windows.append((window_start, window_end))
+	return windows
+
+
+def _format_history_time(value) -> str:
+	return get_datetime(value).replace(tzinfo=ZoneInfo(get_system_timezone())).isoformat()
+
+
+def _fetch_transaction_history(client, merchant_code: str, window) -> list[dict]:
+	"""Return every transaction of the merchant in the window, following pagination links.
+
+	Runs on worker threads, so it only talks to SumUp. The raw transport is used because
+	history items regularly fail the SDK's strict response validation.
+	"""
+	http_client = getattr(client, "_client", None)
+	if http_client is None:
+		raise frappe.ValidationError(_("SumUp API error: client transport not available."))
+
+	params = {
+		"oldest_time": _format_history_time(window[0]),
+		"newest_time": _format_history_time(window[1]),
+		"order": "ascending",
+		"limit": RECONCILE_PAGE_SIZE,
+	}
+	transactions = []
+	for _page in range(RECONCILE_MAX_PAGES):
+		response = call_sumup(
+			"transactions.history",
+			http_client.get,
+			f"/v2.1/merchants/{merchant_code}/transactions/history",
+			params=params,
+		)
+		if response.status_code == 404:
+			break
+		if response.status_code != 200:
+			raise frappe.ValidationError(
+				_("SumUp API error: {0}{1}").format(
+					response.status_code, f" {response.text}" if response.text else ""
+				)
+			)
+
+		payload = response.json() or {}
+		items = payload.get("items") or []
+		transactions.extend(items)
+		next_params = get_next_page_params(payload)
+		if not items or not next_params:
+			break
+		params = next_params
+
+	return transactions
+
+
+def reconcile_pending_sumup_payments(*, min_age=RECONCILE_MIN_AGE, max_age=RECONCILE_MAX_AGE) -> dict:
+	settings = get_sumup_settings()
+	merchant_code = (getattr(settings, "merchant_code", "") or "").strip()
+	if not settings.enabled or not merchant_code:
+		return {"checked": 0, "updated": [], "pending": 0, "failed_windows": 0}
+
+	now = now_datetime()
+	invoices = _get_pending_sumup_invoices(
+		started_before=now - min_age if min_age else None,
+		started_after=now - max_age if max_age else None,
+	)
+	if not invoices:
+		return {"checked": 0, "updated": [], "pending": 0, "failed_windows": 0}
+
+	client = get_sumup_client()
+	windows = _get_history_windows(invoices, now)
+	results = map_sumup_calls(
+		lambda window: _fetch_transaction_history(client, merchant_code, window),
+		windows,
+		max_workers=get_max_parallel_requests(settings),
+	)
+
+	invoices_by_transaction = {row.sumup_client_transaction_id: row for row in invoices}
+	found = {}
+	failed_windows = 0
+	for window, (transactions, error) in zip(windows, results, strict=True):
+		if error is not None:
+			failed_windows += 1
+			sumup_reconciliation_logger.warning(
+				"SumUp history lookup failed (window=%s..%s): %s", window[0], window[1], error
+			)
+			continue
+		for transaction in transactions:
+			invoice = invoices_by_transaction.get(transaction.get("client_transaction_id"))
+			if not invoice:
+				continue
+			fields = _extract_transaction_fields(transaction)
+			# Keep a final result if the history also lists an earlier, still pending attempt.
+			if found.get(invoice.name, {}).get("status") in SUMUP_FINAL_STATUSES:
+				continue
+			found[invoice.name] = fields
+
+	updates = {}
+	for name, fields in found.items():
+		update_values = _get_sumup_status_update_values(fields)
+		if update_values:
+			updates[name] = update_values
+
+	if updates:
+		frappe.db.bulk_update("POS Invoice", updates, update_modified=False)
+
+	updated = []
+	for invoice in invoices:
+		fields = found.get(invoice.name)
+		if not fields or invoice.name not in updates:
+			continue
+		updated.append({"name": invoice.name, "status": fields["status"]})
+		if fields["status"] in SUMUP_FINAL_STATUSES:
+			_publish_sumup_payment_status(invoice, {**fields, "next_poll_after_ms": None})
+
+	final_count = sum(1 for row in updated if row["status"] in SUMUP_FINAL_STATUSES)
+	return {
+		"checked": len(invoices),
+		"updated": updated,
+		"pending": len(invoices) - final_count,
+		"failed_windows": failed_windows,
+	}
+
+
+@frappe.whitelist(methods=["POST"])
+def reconcile_pending_sumup_payments_now():
+	frappe.only_for("System Manager")
+	result = reconcile_pending_sumup_payments(min_age=None, max_age=None)
+	result["message"] = _("Checked {0} pending SumUp payment(s), {1} still pending.").format(
+		result["checked"], result["pending"]
+	)
+	return result
+
+
+def reconcile_pending_sumup_payments_scheduled():
+	try:
+		reconcile_pending_sumup_payments()
+	except Exception:
+		frappe.log_error(title=_("SumUp payment reconciliation failed"))
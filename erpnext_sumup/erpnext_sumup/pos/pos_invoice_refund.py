@@ -0,0 +1,125 @@
+# Copyright (c) 2025, RocketQuackIT and contributors
+# For license information, please see license.txt
+
+import frappe
+import httpx
+from frappe import _
+from frappe.utils import add_to_date, cint, flt, now_datetime
+
+from erpnext_sumup.erpnext_sumup.doctype.sumup_refund.sumup_refund import (
+	REFUND_DOCTYPE,
+	enqueue_sumup_refund,
+)
+from erpnext_sumup.erpnext_sumup.integrations.sumup_client import SumUpDegradedError, SumUpRateLimitedError
+from erpnext_sumup.erpnext_sumup.pos.pos_invoice import (
+	_attempt_sumup_return_refund,
+	_get_original_refund_totals,
+	_get_sumup_invoice,
+	_set_sumup_refund_state,
+)
+
+REFUND_MAX_ATTEMPTS = 5
+REFUND_RETRY_BASE_SECONDS = 60
+REFUND_STALE_MINUTES = 15
+REFUND_DRAIN_BATCH_SIZE = 100
+SUMUP_REFUND_EVENT = "sumup_refund_status"
+REFUND_RETRYABLE_ERRORS = (
+	SumUpDegradedError,
+	SumUpRateLimitedError,
+	httpx.ConnectError,
+	httpx.ConnectTimeout,
+)
+
+
+def _is_retryable_refund_error(exc) -> bool:
+	"""Only errors where SumUp cannot have executed the refund are retried automatically."""
+	return isinstance(exc, REFUND_RETRYABLE_ERRORS)
+
+
+def _claim_refund(refund: str):
+	row = frappe.db.get_value(
+		REFUND_DOCTYPE,
+		refund,
+		["name", "return_invoice", "return_against", "transaction_id", "amount", "status", "attempts"],
+		as_dict=True,
+		for_update=True,
+	)
+	if not row or row.status != "Queued":
+		return None
+
+	row.attempts = cint(row.attempts) + 1
+	frappe.db.set_value(REFUND_DOCTYPE, row.name, {"status": "Processing", "attempts": row.attempts})
+	# Release the row lock before the SumUp request.
+	frappe.db.commit()
+	return row
+
+
+def process_sumup_refund(refund: str):
+	"""Background job: send one queued refund to SumUp and write the outcome back."""
+	row = _claim_refund(refund)
+	if not row:
+		return
+
+	doc = _get_sumup_invoice(row.return_invoice)
+	original = _get_sumup_invoice(row.return_against)
+	refunded_total = _get_original_refund_totals(original, row.return_against, doc.name)[0]
+	context = {
+		"original": original,
+		"return_against": row.return_against,
+		"transaction_id": row.transaction_id,
+		"refund_amount": flt(row.amount),
+		"refunded_total": refunded_total,
+	}
+	values = {}
+	try:
+		succeeded = _attempt_sumup_return_refund(
+			doc, context, raise_on_error=False, reraise_if=_is_retryable_refund_error
+		)
+		values = {"status": "Successful" if succeeded else "Failed", "last_error": context.get("error")}
+	except REFUND_RETRYABLE_ERRORS as exc:
+		# Anything else propagates and leaves the row Processing until the stale sweep fails it.
+		values["last_error"] = str(exc)
+		if row.attempts < REFUND_MAX_ATTEMPTS:
+			delay = REFUND_RETRY_BASE_SECONDS * 2 ** (row.attempts - 1)
+			values.update(status="Queued", next_attempt_at=add_to_date(now_datetime(), seconds=delay))
+		else:
+			values["status"] = "Failed"
+			_set_sumup_refund_state(doc, "FAILED", context["refund_amount"], row.transaction_id)
+
+	frappe.db.set_value(REFUND_DOCTYPE, row.name, values)
+	frappe.publish_realtime(
+		SUMUP_REFUND_EVENT,
+		{"pos_invoice": doc.name, "status": doc.sumup_refund_status},
+		user=doc.owner,
+		after_commit=True,
+	)
+
+
+def drain_sumup_refund_outbox():
+	"""Scheduled: pick up refunds that are due for a retry or whose job was lost."""
+	stale_before = add_to_date(now_datetime(), minutes=-REFUND_STALE_MINUTES)
+	stale = frappe.get_all(
+		REFUND_DOCTYPE,
+		filters={"status": "Processing", "modified": ["<", stale_before]},
+		fields=["name", "return_invoice"],
+	)
+	for row in stale:
+		# The request may have reached SumUp, so it is not resent; a user retries after checking.
+		frappe.db.set_value(
+			REFUND_DOCTYPE,
+			row.name,
+			{"status": "Failed", "last_error": _("The refund was interrupted. Check SumUp before retrying.")},
+		)
+		frappe.db.set_value(
+			"POS Invoice", row.return_invoice, "sumup_refund_status", "FAILED", update_modified=False
+		)
+
+	due = frappe.get_all(
+		REFUND_DOCTYPE,
+		filters={"status": "Queued", "next_attempt_at": ["<=", now_datetime()]},
+		pluck="name",
+		order_by="next_attempt_at asc",
+		limit=REFUND_DRAIN_BATCH_SIZE,
+	)
+	for name in due:
+		enqueue_sumup_refund(name)
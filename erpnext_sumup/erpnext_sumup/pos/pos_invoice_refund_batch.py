@@ -0,0 +1,135 @@
+# Copyright (c) 2025, RocketQuackIT and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+
+from erpnext_sumup.erpnext_sumup.doctype.sumup_refund.sumup_refund import REFUND_DOCTYPE
+from erpnext_sumup.erpnext_sumup.integrations.sumup_client import get_sumup_settings
+from erpnext_sumup.erpnext_sumup.pos.pos_invoice import (
+	_get_refund_amount,
+	_get_return_rows,
+	_get_sumup_refund_context,
+	_queue_return_refund,
+)
+
+REFUND_BATCH_JOB_METHOD = "erpnext_sumup.erpnext_sumup.pos.pos_invoice_refund_batch.run_sumup_refund_batch"
+REFUND_BATCH_MAX_SIZE = 500
+SUMUP_REFUND_BATCH_EVENT = "sumup_refund_batch"
+
+
+def _parse_invoice_names(value) -> list[str]:
+	if isinstance(value, str):
+		value = frappe.parse_json(value) if value.lstrip().startswith("[") else [value]
+	# Duplicates would be refunded twice; keep the first occurrence.
+	return list(dict.fromkeys(str(name).strip() for name in value or [] if name and str(name).strip()))
+
+
+@frappe.whitelist()
+def refund_sumup_returns(pos_invoices):
+	"""Submit many return invoices and queue their SumUp refunds in one background job."""
+	frappe.only_for(("System Manager", "Accounts Manager"))
+	names = _parse_invoice_names(pos_invoices)
+	if not names:
+		frappe.throw(_("Select return invoices to refund."))
+	if len(names) > REFUND_BATCH_MAX_SIZE:
+		frappe.throw(_("At most {0} returns can be refunded at once.").format(REFUND_BATCH_MAX_SIZE))
+	if not get_sumup_settings().enabled:
+		frappe.throw(_("SumUp is disabled in settings."))
+
+	batch_id = frappe.generate_hash(length=10)
+	frappe.enqueue(
+		REFUND_BATCH_JOB_METHOD,
+		queue="long",
+		job_id=f"sumup_refund_batch::{batch_id}",
+		batch_id=batch_id,
+		return_invoices=names,
+		user=frappe.session.user,
+	)
+	return {
+		"batch_id": batch_id,
+		"message": _("Refunding {0} return(s) in the background.").format(len(names)),
+	}
+
+
+def run_sumup_refund_batch(return_invoices: list[str], batch_id: str | None = None, user: str | None = None):
+	"""Background job: queue the refunds of the given returns and report the outcome per invoice.
+
+	The refunds are sent by the refund outbox, which claims each one before calling SumUp,
+	paces the calls with the shared rate limiter and retries those that never reached SumUp.
+	"""
+	report = {name: {"pos_invoice": name, "status": "Skipped", "error": None} for name in return_invoices}
+	rows = _get_return_rows(return_invoices)
+	recorded = set(
+		frappe.get_all(
+			REFUND_DOCTYPE,
+			filters={"return_invoice": ["in", return_invoices]},
+			pluck="return_invoice",
+		)
+	)
+	for name in return_invoices:
+		error = _get_batch_refund_error(rows.get(name), recorded)
+		if error:
+			report[name]["error"] = error
+			continue
+
+		try:
+			status = _queue_batch_refund(name)
+			# One transaction per return, so a failing return leaves the others queued.
+			frappe.db.commit()
+		except Exception as exc:
+			frappe.db.rollback()
+			report[name]["error"] = str(exc) or exc.__class__.__name__
+			continue
+		if status == "PENDING":
+			report[name]["status"] = "Queued"
+		else:
+			report[name]["error"] = _("No SumUp refund was queued for this return.")
+
+	results = list(report.values())
+	frappe.publish_realtime(
+		SUMUP_REFUND_BATCH_EVENT,
+		{"batch_id": batch_id, "results": results},
+		user=user,
+		after_commit=True,
+	)
+	return results
+
+
+def _get_batch_refund_error(row, recorded: set) -> str | None:
+	if not row or not row.is_return or row.docstatus == 2:
+		return _("Not a draft or submitted return invoice.")
+	if row.name in recorded:
+		# Failed refunds are retried one by one after checking SumUp, see retry_sumup_return_refund.
+		return _("A refund is already recorded for this return.")
+	if row.docstatus == 1 and row.sumup_refund_status:
+		# Refunded, or failed, before the refund ledger existed.
+		return _("A SumUp refund was already attempted for this return.")
+	if not (row.sumup_transaction_id or "").strip():
+		return _("SumUp transaction id is missing for the original invoice.")
+	if (row.sumup_status or "").upper() != "SUCCESSFUL":
+		return _("SumUp payment is not completed for the original invoice.")
+
+	original_currency = (row.sumup_currency or "").strip() or (row.original_currency or "").strip()
+	if original_currency and row.currency and row.currency != original_currency:
+		return _("SumUp refund currency {0} does not match original currency {1}.").format(
+			row.currency, original_currency
+		)
+	if _get_refund_amount(row) <= 0:
+		return _("Nothing to refund.")
+	return None
+
+
+def _queue_batch_refund(name: str) -> str | None:
+	doc = frappe.get_doc("POS Invoice", name)
+	if doc.docstatus == 0:
+		# before_submit checks the remaining amount and queues the refund in the outbox.
+		doc.submit()
+		return doc.sumup_refund_status
+
+	# Submitted before the refund ledger existed or while SumUp was disabled.
+	context = _get_sumup_refund_context(doc, strict_missing_transaction=True, lock_original=True)
+	if not context:
+		return None
+	_queue_return_refund(doc, context)
+	return doc.sumup_refund_status
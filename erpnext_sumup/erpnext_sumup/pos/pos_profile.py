@@ -1,9 +1,14 @@
 # Copyright (c) 2025, RocketQuackIT and contributors
 # For license information, please see license.txt
 
+from functools import partial
+
 import frappe
 from frappe import _
 
+PROFILE_TERMINAL_CACHE_KEY = "erpnext_sumup:profile_terminals"
+PROFILE_TERMINAL_CACHE_TTL_SECONDS = 3600
+
 
 def _pos_profile_has_sumup_payment(doc, mode_of_payment: str | None = None) -> bool:
 	for row in doc.payments or []:
@@ -37,18 +42,124 @@ def validate_pos_profile_sumup_terminal(doc, method=None):
 	_ensure_terminal_enabled(terminal_name)
 
 
+def _load_profile_terminals(profile_names: list[str] | None = None) -> dict[str, dict]:
+	"""Resolve POS Profiles to their SumUp payment modes and terminal with three queries."""
+	filters = {"name": ["in", profile_names]} if profile_names else {}
+	profiles = frappe.get_all("POS Profile", filters=filters, fields=["name", "sumup_terminal"])
+	if not profiles:
+		return {}
+
+	payments = frappe.get_all(
+		"POS Payment Method",
+		filters={
+			"parenttype": "POS Profile",
+			"parent": ["in", [profile.name for profile in profiles]],
+			"use_sumup_terminal": 1,
+		},
+		fields=["parent", "mode_of_payment"],
+	)
+	sumup_modes = {}
+	for row in payments:
+		sumup_modes.setdefault(row.parent, set()).add(row.mode_of_payment)
+
+	terminal_names = {(profile.sumup_terminal or "").strip() for profile in profiles} - {""}
+	terminals = {}
+	if terminal_names:
+		for terminal in frappe.get_all(
+			"SumUp Terminal",
+			filters={"name": ["in", list(terminal_names)]},
+			fields=["name", "terminal_id", "enabled"],
+		):
+			terminals[terminal.name] = terminal
+
+	entries = {}
+	for profile in profiles:
+		terminal_name = (profile.sumup_terminal or "").strip()
+		terminal = terminals.get(terminal_name)
+		entries[profile.name] = {
+			"sumup_modes": sorted(sumup_modes.get(profile.name, ())),
+			"terminal": terminal_name or None,
+			"terminal_id": terminal.terminal_id if terminal else None,
+			"exists": bool(terminal),
+			"enabled": bool(terminal and terminal.enabled),
+		}
+	return entries
+
+
+def get_profile_terminal(pos_profile: str) -> dict | None:
+	"""Return the cached SumUp terminal resolution of a POS Profile.
+
+	Entries are kept in a Redis hash until the POS Profile or any SumUp Terminal changes, so
+	resolving the terminal of a checkout does not touch the database. The hash expires after
+	an hour, so an invalidation that was missed cannot last.
+	"""
+	entry = frappe.cache.hget(PROFILE_TERMINAL_CACHE_KEY, pos_profile)
+	if entry is None:
+		entry = _load_profile_terminals([pos_profile]).get(pos_profile)
+		if entry is not None:
+			_cache_profile_terminals({pos_profile: entry})
+	return entry
+
+
+def _cache_profile_terminals(entries: dict[str, dict]):
+	if not entries:
+		return
+
+	for pos_profile, entry in entries.items():
+		frappe.cache.hset(PROFILE_TERMINAL_CACHE_KEY, pos_profile, entry)
+	# Counted from the first entry, not renewed by later ones.
+	key = frappe.cache.make_key(PROFILE_TERMINAL_CACHE_KEY)
+	if frappe.cache.ttl(key) < 0:
+		frappe.cache.expire(key, PROFILE_TERMINAL_CACHE_TTL_SECONDS)
+
+
+def get_enabled_profile_terminal(pos_profile: str) -> dict:
+	"""Return `{"name", "terminal_id"}` of the terminal of a POS Profile or throw."""
+	entry = get_profile_terminal(pos_profile) or {}
+	terminal_name = entry.get("terminal")
+	if not terminal_name:
+		frappe.throw(_("SumUp Terminal is required when a payment method uses SumUp."))
+	if not entry.get("exists"):
+		frappe.throw(_("SumUp Terminal {0} does not exist.").format(terminal_name))
+	if not entry.get("enabled"):
+		frappe.throw(_("SumUp Terminal {0} is disabled.").format(terminal_name))
+	if not entry.get("terminal_id"):
+		frappe.throw(_("Terminal ID is missing for SumUp Terminal {0}.").format(terminal_name))
+	return frappe._dict(name=terminal_name, terminal_id=entry["terminal_id"])
+
+
+def warm_profile_terminal_cache():
+	_clear_profile_terminals()
+	_cache_profile_terminals(_load_profile_terminals())
+
+
+def _clear_profile_terminals(pos_profile: str | None = None):
+	if pos_profile:
+		frappe.cache.hdel(PROFILE_TERMINAL_CACHE_KEY, pos_profile)
+	else:
+		frappe.cache.delete_value(PROFILE_TERMINAL_CACHE_KEY)
+
+
+def clear_profile_terminal_cache(doc=None, method=None, *args):
+	pos_profile = None
+	if doc is not None and doc.doctype == "POS Profile" and method != "after_rename":
+		pos_profile = doc.name
+	# Anything else clears every entry, as a terminal may be linked from any profile.
+	clear = partial(_clear_profile_terminals, pos_profile)
+	clear()
+	# A checkout may re-cache the old values before this transaction commits.
+	frappe.db.after_commit.add(clear)
+
+
 @frappe.whitelist()
 def get_sumup_terminal_for_pos_profile(pos_profile: str, mode_of_payment: str | None = None):
 	if not pos_profile:
 		return {"terminal": None}
 
-	doc = frappe.get_cached_doc("POS Profile", pos_profile)
-	if not _pos_profile_has_sumup_payment(doc, mode_of_payment=mode_of_payment):
+	entry = get_profile_terminal(pos_profile)
+	if not entry or not entry["sumup_modes"]:
+		return {"terminal": None}
+	if mode_of_payment and mode_of_payment not in entry["sumup_modes"]:
 		return {"terminal": None}
 
-	terminal_name = (getattr(doc, "sumup_terminal", "") or "").strip()
-	if not terminal_name:
-		frappe.throw(_("SumUp Terminal is required when a payment method uses SumUp."))
-
-	_ensure_terminal_enabled(terminal_name)
-	return {"terminal": terminal_name}
+	return {"terminal": get_enabled_profile_terminal(pos_profile).name}
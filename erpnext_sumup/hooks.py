@@ -20,7 +20,7 @@ fixtures = [
 	{
 		"doctype": "Number Card",
 		"filters": [
-			["name", "in", ["SumUp Terminals"]],
+			["name", "in", ["SumUp Terminals", "SumUp API p95 Latency (ms)", "SumUp API Error Rate"]],
 		],
 	},
 ]
@@ -166,11 +166,19 @@ after_migrate = "erpnext_sumup.install.after_migrate"
 # }
 
 doc_events = {
+	"Currency": {
+		"on_update": "erpnext_sumup.erpnext_sumup.integrations.sumup_currency.clear_currency_table",
+		"on_trash": "erpnext_sumup.erpnext_sumup.integrations.sumup_currency.clear_currency_table",
+	},
 	"POS Profile": {
 		"validate": "erpnext_sumup.erpnext_sumup.pos.pos_profile.validate_pos_profile_sumup_terminal",
+		"on_update": "erpnext_sumup.erpnext_sumup.pos.pos_profile.clear_profile_terminal_cache",
+		"on_trash": "erpnext_sumup.erpnext_sumup.pos.pos_profile.clear_profile_terminal_cache",
+		"after_rename": "erpnext_sumup.erpnext_sumup.pos.pos_profile.clear_profile_terminal_cache",
 	},
 	"POS Invoice": {
 		"validate": "erpnext_sumup.erpnext_sumup.pos.pos_invoice.validate_pos_invoice_sumup_currency",
+		"on_update": "erpnext_sumup.erpnext_sumup.pos.pos_invoice.clear_refund_preview_cache",
 		"before_submit": [
 			"erpnext_sumup.erpnext_sumup.pos.pos_invoice.validate_pos_invoice_sumup_payment_status",
 			"erpnext_sumup.erpnext_sumup.pos.pos_invoice.validate_sumup_return_refund",
@@ -185,6 +193,18 @@ scheduler_events = {
 	"hourly": [
 		"erpnext_sumup.erpnext_sumup.doctype.sumup_terminal.sumup_terminal.refresh_terminal_statuses_hourly",
 	],
+	"daily": [
+		"erpnext_sumup.erpnext_sumup.doctype.sumup_terminal_status_log.sumup_terminal_status_log.clear_old_status_logs",
+	],
+	"cron": {
+		"* * * * *": [
+			"erpnext_sumup.erpnext_sumup.pos.pos_invoice_refund.drain_sumup_refund_outbox",
+		],
+		"*/10 * * * *": [
+			"erpnext_sumup.erpnext_sumup.pos.pos_invoice_reconciliation.reconcile_pending_sumup_payments_scheduled",
+			"erpnext_sumup.erpnext_sumup.doctype.sumup_terminal.sumup_terminal.retry_pending_terminal_removals",
+		],
+	},
 }
 
 # Testing
@@ -214,6 +234,7 @@ scheduler_events = {
 # -----------------------------------------------------------
 
 # ignore_links_on_delete = ["Communication", "ToDo"]
+ignore_links_on_delete = ["SumUp Terminal Status Log"]
 
 # Request Events
 # ----------------
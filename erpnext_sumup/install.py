@@ -3,6 +3,9 @@
 
 from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
 
+from erpnext_sumup.erpnext_sumup.integrations.sumup_client import clear_sumup_settings_cache
+from erpnext_sumup.erpnext_sumup.pos.pos_profile import warm_profile_terminal_cache
+
 
 def after_install():
 	create_custom_fields_for_erpnext()
@@ -10,6 +13,10 @@ def after_install():
 
 def after_migrate():
 	create_custom_fields_for_erpnext()
+	# New settings fields must show up in the cached snapshot.
+	clear_sumup_settings_cache()
+	# Resolve every POS Profile once so the first checkouts after a deploy skip the database.
+	warm_profile_terminal_cache()
 
 
 def create_custom_fields_for_erpnext():
@@ -49,6 +56,7 @@ def create_custom_fields_for_erpnext():
 				insert_after="sumup_section_break",
 				read_only=1,
 				hidden=0,
+				search_index=1,
 			),
 			dict(
 				fieldname="sumup_client_transaction_id",
@@ -101,6 +109,14 @@ def create_custom_fields_for_erpnext():
 				read_only=1,
 				hidden=0,
 			),
+			dict(
+				fieldname="sumup_started_at",
+				label="SumUp Started At",
+				fieldtype="Datetime",
+				insert_after="sumup_refund_amount",
+				read_only=1,
+				hidden=1,
+			),
 		],
 	}
 
@@ -0,0 +1,14 @@
+# Copyright (c) 2025, RocketQuackIT and contributors
+# For license information, please see license.txt
+
+import frappe
+
+
+def execute():
+	# Field defaults of a Single are only stored when it is saved, so sites that never saved
+	# SumUp Settings since the field was added would keep the rate limiter off.
+	stored = frappe.db.get_value(
+		"Singles", {"doctype": "SumUp Settings", "field": "enable_rate_limiting"}, "value"
+	)
+	if stored is None:
+		frappe.db.set_single_value("SumUp Settings", "enable_rate_limiting", 1)
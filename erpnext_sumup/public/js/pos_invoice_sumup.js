@@ -231,10 +231,17 @@
 	};
 
 	const sumup_stop_polling = (dialog) => {
+		dialog.__sumup_polling_active = false;
 		if (dialog.__sumup_poll) {
-			clearInterval(dialog.__sumup_poll);
+			clearTimeout(dialog.__sumup_poll);
 			dialog.__sumup_poll = null;
 		}
+		if (dialog.__sumup_push_handler) {
+			if (frappe.realtime && frappe.realtime.off) {
+				frappe.realtime.off("sumup_payment_status", dialog.__sumup_push_handler);
+			}
+			dialog.__sumup_push_handler = null;
+		}
 		dialog.__sumup_polling_locked = false;
 	};
 
@@ -317,9 +324,79 @@
 		return result;
 	};
 
-	const sumup_start_polling = (dialog, frm, original_submit) => {
+	const sumup_apply_status = (dialog, frm, original_submit, result) => {
+		if (dialog.__sumup_finished) {
+			return;
+		}
+		sumup_log_debug(result.debug_details, "status");
+		if (result.transaction_id && result.transaction_id !== frm.doc.sumup_transaction_id) {
+			sumup_update_fields(frm, {
+				sumup_transaction_id: result.transaction_id,
+			});
+		}
+		const status = String(result.status || "").toUpperCase();
+
+		if (status === "SUCCESSFUL") {
+			dialog.__sumup_finished = true;
+			sumup_stop_polling(dialog);
+			const update_values = {
+				sumup_status: "SUCCESSFUL",
+				sumup_amount: result.amount || frm.doc.sumup_amount,
+				sumup_currency: result.currency || frm.doc.sumup_currency,
+			};
+			if (result.transaction_id) {
+				update_values.sumup_transaction_id = result.transaction_id;
+			}
+			sumup_update_fields(frm, update_values);
+			sumup_render_steps(
+				dialog,
+				{ start: "done", wait: "done", done: "done" },
+				__("Payment confirmed."),
+				"success"
+			);
+			frm.__sumup_payment_in_progress = false;
+			const result_submit = sumup_submit_without_confirm(frm, original_submit);
+			if (result_submit && result_submit.then) {
+				result_submit.finally(() => dialog.hide());
+			} else {
+				setTimeout(() => dialog.hide(), 300);
+			}
+			return;
+		}
+
+		if (status === "FAILED" || status === "CANCELLED") {
+			dialog.__sumup_finished = true;
+			sumup_stop_polling(dialog);
+			sumup_update_fields(frm, { sumup_status: status });
+			sumup_render_steps(
+				dialog,
+				{ start: "done", wait: "error", done: "pending" },
+				__("SumUp payment failed."),
+				"danger"
+			);
+			frm.__sumup_payment_in_progress = false;
+			return;
+		}
+
+		sumup_render_steps(
+			dialog,
+			{ start: "done", wait: "active", done: "pending" },
+			__("Waiting for card confirmation..."),
+			"muted"
+		);
+	};
+
+	const sumup_start_polling = (dialog, frm, original_submit, options = {}) => {
+		const fallback_interval = cint(options.poll_interval_ms) || 3000;
+		const schedule = (delay) => {
+			if (!dialog.__sumup_polling_active || dialog.__sumup_finished) {
+				return;
+			}
+			dialog.__sumup_poll = setTimeout(poll, cint(delay) || fallback_interval);
+		};
+
 		const poll = async () => {
-			if (dialog.__sumup_polling_locked) {
+			if (dialog.__sumup_polling_locked || dialog.__sumup_finished) {
 				return;
 			}
 			dialog.__sumup_polling_locked = true;
@@ -329,63 +406,9 @@
 					args: { pos_invoice: frm.doc.name },
 				});
 				const result = res.message || {};
-				sumup_log_debug(result.debug_details, "status");
-				if (
-					result.transaction_id &&
-					result.transaction_id !== frm.doc.sumup_transaction_id
-				) {
-					sumup_update_fields(frm, {
-						sumup_transaction_id: result.transaction_id,
-					});
-				}
-				const status = String(result.status || "").toUpperCase();
-
-				if (status === "SUCCESSFUL") {
-					sumup_stop_polling(dialog);
-					const update_values = {
-						sumup_status: "SUCCESSFUL",
-						sumup_amount: result.amount || frm.doc.sumup_amount,
-						sumup_currency: result.currency || frm.doc.sumup_currency,
-					};
-					if (result.transaction_id) {
-						update_values.sumup_transaction_id = result.transaction_id;
-					}
-					sumup_update_fields(frm, update_values);
-					sumup_render_steps(
-						dialog,
-						{ start: "done", wait: "done", done: "done" },
-						__("Payment confirmed."),
-						"success"
-					);
-					frm.__sumup_payment_in_progress = false;
-					const result_submit = sumup_submit_without_confirm(frm, original_submit);
-					if (result_submit && result_submit.then) {
-						result_submit.finally(() => dialog.hide());
-					} else {
-						setTimeout(() => dialog.hide(), 300);
-					}
-					return;
-				}
-
-				if (status === "FAILED" || status === "CANCELLED") {
-					sumup_stop_polling(dialog);
-					sumup_update_fields(frm, { sumup_status: status });
-					sumup_render_steps(
-						dialog,
-						{ start: "done", wait: "error", done: "pending" },
-						__("SumUp payment failed."),
-						"danger"
-					);
-					frm.__sumup_payment_in_progress = false;
-					return;
-				}
-
-				sumup_render_steps(
-					dialog,
-					{ start: "done", wait: "active", done: "pending" },
-					__("Waiting for card confirmation..."),
-					"muted"
-				);
+				sumup_apply_status(dialog, frm, original_submit, result);
+				dialog.__sumup_polling_locked = false;
+				schedule(result.next_poll_after_ms);
 			} catch (error) {
 				sumup_stop_polling(dialog);
 				sumup_render_steps(
@@ -400,8 +423,76 @@
 			}
 		};
 
+		if (options.webhook && frappe.realtime && frappe.realtime.on) {
+			dialog.__sumup_push_handler = (data) => {
+				if (!data || data.pos_invoice !== frm.doc.name) {
+					return;
+				}
+				sumup_apply_status(dialog, frm, original_submit, data);
+			};
+			frappe.realtime.on("sumup_payment_status", dialog.__sumup_push_handler);
+		}
+
+		dialog.__sumup_finished = false;
+		dialog.__sumup_polling_active = true;
 		poll();
-		dialog.__sumup_poll = setInterval(poll, 3000);
+	};
+
+	const sumup_wait_for_checkout = (frm, timeout_ms) => {
+		let handler = null;
+		let timer = null;
+		let settle = null;
+		const cancel = () => {
+			if (handler && frappe.realtime && frappe.realtime.off) {
+				frappe.realtime.off("sumup_checkout_started", handler);
+			}
+			handler = null;
+			clearTimeout(timer);
+			if (settle) {
+				settle(null);
+				settle = null;
+			}
+		};
+		const promise = new Promise((resolve) => {
+			settle = resolve;
+			if (!frappe.realtime || !frappe.realtime.on) {
+				return;
+			}
+			handler = (data) => {
+				if (!data || data.pos_invoice !== frm.doc.name) {
+					return;
+				}
+				settle = null;
+				cancel();
+				resolve(data);
+			};
+			frappe.realtime.on("sumup_checkout_started", handler);
+		});
+		timer = setTimeout(cancel, timeout_ms);
+		return { promise, cancel };
+	};
+
+	const sumup_get_queued_checkout = async (frm, waiter) => {
+		const data = await waiter.promise;
+		if (data) {
+			if (String(data.status || "").toUpperCase() === "ERROR") {
+				const error = new Error(data.message);
+				error.sumup_message = data.message;
+				throw error;
+			}
+			return data;
+		}
+
+		// No realtime message in time: the job may still have stored the checkout.
+		const res = await frappe.db.get_value("POS Invoice", frm.doc.name, [
+			"sumup_status",
+			"sumup_client_transaction_id",
+		]);
+		const values = (res && res.message) || {};
+		if (values.sumup_status === "PENDING" && values.sumup_client_transaction_id) {
+			return { status: "PENDING", client_transaction_id: values.sumup_client_transaction_id };
+		}
+		return {};
 	};
 
 	const sumup_show_dialog = async (frm, pos, original_submit) => {
@@ -448,12 +539,21 @@
 		);
 		dialog.show();
 
+		// Listen before starting: a background checkout can finish before the call returns.
+		const waiter = sumup_wait_for_checkout(frm, 60000);
 		try {
 			const res = await frappe.call({
 				method: "erpnext_sumup.erpnext_sumup.pos.pos_invoice.start_sumup_payment",
 				args: { pos_invoice: frm.doc.name },
 			});
-			const result = res.message || {};
+			let result = res.message || {};
+			if (String(result.status || "").toUpperCase() === "QUEUED") {
+				const poll_interval_ms = result.poll_interval_ms;
+				result = await sumup_get_queued_checkout(frm, waiter);
+				result.poll_interval_ms = result.poll_interval_ms || poll_interval_ms;
+			} else {
+				waiter.cancel();
+			}
 			sumup_log_debug(result.debug_details, "start");
 			if (!result.client_transaction_id) {
 				throw new Error(__("Unable to start SumUp payment."));
@@ -472,13 +572,17 @@
 				__("Waiting for card confirmation..."),
 				"muted"
 			);
-			sumup_start_polling(dialog, frm, original_submit);
+			sumup_start_polling(dialog, frm, original_submit, {
+				webhook: !!result.webhook,
+				poll_interval_ms: result.poll_interval_ms,
+			});
 		} catch (error) {
+			waiter.cancel();
 			sumup_stop_polling(dialog);
 			sumup_render_steps(
 				dialog,
 				{ start: "error", wait: "pending", done: "pending" },
-				__("Unable to start SumUp payment."),
+				(error && error.sumup_message) || __("Unable to start SumUp payment."),
 				"danger"
 			);
 			frm.__sumup_payment_in_progress = false;
@@ -19,6 +19,22 @@
 		return Promise.resolve(true);
 	};
 
+	// Refunds are sent by a background job after submit; reload once it reports back.
+	const watch_sumup_refund = (frm) => {
+		if (frm.__sumup_refund_listener) {
+			return;
+		}
+		frm.__sumup_refund_listener = (data) => {
+			if (!data || data.pos_invoice !== frm.doc.name) {
+				return;
+			}
+			frappe.realtime.off("sumup_refund_status", frm.__sumup_refund_listener);
+			frm.__sumup_refund_listener = null;
+			frm.reload_doc();
+		};
+		frappe.realtime.on("sumup_refund_status", frm.__sumup_refund_listener);
+	};
+
 	frappe.ui.form.on("POS Invoice", {
 		refresh(frm) {
 			sumup_bind_refund_debug();
@@ -39,6 +55,10 @@
 			}
 
 			const status = String(frm.doc.sumup_refund_status || "").toUpperCase();
+			if (status === "PENDING") {
+				watch_sumup_refund(frm);
+				return;
+			}
 			if (status !== "FAILED") {
 				return;
 			}
@@ -0,0 +1,107 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+"""Micro-benchmark for transaction field extraction on the status-poll path.
+
+Run from the app directory without a site:
+
+	python -m erpnext_sumup.tests.bench_sumup_fields
+
+It reports the per-response cost of resolving the five fields the status lookup stores,
+for the response shapes the lookup sees: a typed SDK model, a model whose fields are only
+reachable through `model_dump()`, the raw JSON fallback and a list response. Uses
+pydantic models when pydantic is installed and a hand-written stand-in otherwise.
+"""
+
+import timeit
+
+from erpnext_sumup.erpnext_sumup.integrations.sumup_fields import compile_fields
+
+TRANSACTION = {
+	"id": "4f1f8a3c-0f0e-4c55-9d55-7d1c0b6a1e2f",
+	"transaction_code": "TEENSK4W2K",
+	"amount": 12.5,
+	"currency": "EUR",
+	"status": "SUCCESSFUL",
+	"refunded_amount": 0,
+	"payment_type": "POS",
+	"card": {"last_4_digits": "0001", "type": "VISA"},
+	"events": [{"id": index, "type": "PAYOUT", "amount": 12.5} for index in range(5)],
+}
+
+# Same specs as pos_invoice._TRANSACTION_FIELDS; kept local so the script runs without frappe.
+RESOLVER = compile_fields(
+	{
+		"status": ("status", "simple_status"),
+		"amount": ("amount",),
+		"currency": ("currency",),
+		"transaction_id": ("id", "transaction_id", "transactionId", "transaction_code", "transactionCode"),
+		"refunded_amount": ("refunded_amount",),
+	},
+	nested=("data", "transaction"),
+	first_item="items",
+)
+
+
+class DumpOnly:
+	"""Model whose fields are only exposed through model_dump()."""
+
+	def __init__(self, payload):
+		self._payload = payload
+
+	def model_dump(self):
+		return {
+			key: [dict(item) for item in value] if isinstance(value, list) else value
+			for key, value in self._payload.items()
+		}
+
+
+def _build_typed_model():
+	try:
+		from pydantic import BaseModel
+	except ImportError:
+		from types import SimpleNamespace
+
+		return SimpleNamespace(**TRANSACTION), "stand-in"
+
+	class Card(BaseModel):
+		last_4_digits: str
+		type: str
+
+	class Event(BaseModel):
+		id: int
+		type: str
+		amount: float
+
+	class Transaction(BaseModel):
+		id: str
+		transaction_code: str
+		amount: float
+		currency: str
+		status: str
+		refunded_amount: float
+		payment_type: str
+		card: Card
+		events: list[Event]
+
+	return Transaction(**TRANSACTION), "pydantic"
+
+
+def main(number: int = 20000):
+	typed, kind = _build_typed_model()
+	cases = {
+		f"typed model ({kind})": typed,
+		"model_dump only": DumpOnly(TRANSACTION),
+		"raw JSON": dict(TRANSACTION),
+		"list response": {"items": [dict(TRANSACTION)]},
+	}
+
+	print(f"iterations: {number}")
+	for label, response in cases.items():
+		timer = timeit.Timer(lambda response=response: RESOLVER.resolve(response))
+		seconds = min(timer.repeat(number=number, repeat=5))
+		print(f"{label:>24}: {seconds * 1e6 / number:8.2f} us/response")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,105 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+"""Regression benchmark for the transaction lookup fallback on affected SDK versions.
+
+Run from the app directory without a site:
+
+	python -m erpnext_sumup.tests.bench_sumup_status_fallback
+
+Simulates a status poll whose typed SDK parsing always fails. "without probe" forgets the
+capability before every poll, which is what every poll paid before the probe existed: a
+typed request, the validation error and a raw retry. "with probe" is the steady state after
+the first failure. Round trips are counted, not slept; the CPU cost per poll is measured.
+Uses pydantic for the failing parse when it is installed and a plain exception otherwise.
+"""
+
+import json
+import timeit
+
+from erpnext_sumup.erpnext_sumup.integrations import sumup_capabilities
+
+RAW_RESPONSE = json.dumps(
+	{
+		"id": "4f1f8a3c-0f0e-4c55-9d55-7d1c0b6a1e2f",
+		"transaction_code": "TEENSK4W2K",
+		"amount": 12.5,
+		"currency": "EUR",
+		"status": "SUCCESSFUL",
+		"payment_type": "POS",
+		"card": {"last_4_digits": "0001", "type": "UNKNOWN_BRAND"},
+		"events": [{"id": index, "type": "PAYOUT", "amount": 12.5} for index in range(5)],
+	}
+).encode()
+
+
+def _build_typed_parser():
+	try:
+		from typing import Literal
+
+		from pydantic import BaseModel
+	except ImportError:
+
+		class ValidationError(Exception):
+			pass
+
+		def parse(payload):
+			raise ValidationError("card.type")
+
+		return parse, "stand-in"
+
+	class Card(BaseModel):
+		last_4_digits: str
+		type: Literal["VISA", "MASTERCARD", "AMEX"]
+
+	class Transaction(BaseModel):
+		id: str
+		amount: float
+		currency: str
+		status: str
+		card: Card
+
+	return Transaction.model_validate_json, "pydantic"
+
+
+class Poller:
+	def __init__(self, parse_typed):
+		self.parse_typed = parse_typed
+		self.round_trips = 0
+
+	def typed(self):
+		self.round_trips += 1
+		return self.parse_typed(RAW_RESPONSE)
+
+	def raw(self):
+		self.round_trips += 1
+		return json.loads(RAW_RESPONSE)
+
+	def poll(self):
+		return sumup_capabilities.call_with_raw_fallback("transactions.get", self.typed, self.raw)
+
+
+def main(number: int = 20000):
+	parse_typed, kind = _build_typed_parser()
+	print(f"iterations: {number} (typed parsing: {kind})")
+
+	def without_probe(poller):
+		sumup_capabilities.clear_capabilities()
+		poller.poll()
+
+	cases = {"without probe": without_probe, "with probe": lambda poller: poller.poll()}
+	for label, run in cases.items():
+		sumup_capabilities.clear_capabilities()
+		poller = Poller(parse_typed)
+		poller.poll()
+		poller.round_trips = 0
+		timer = timeit.Timer(lambda run=run, poller=poller: run(poller))
+		seconds = min(timer.repeat(number=number, repeat=5))
+		round_trips = poller.round_trips / (number * 5)
+		print(f"{label:>14}: {seconds * 1e6 / number:8.2f} us/poll, {round_trips:.1f} round trips/poll")
+
+	sumup_capabilities.clear_capabilities()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,178 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_sumup.erpnext_sumup.pos import pos_invoice_reconciliation as reconciliation
+
+
+class DummyResponse:
+	def __init__(self, payload, status_code=200):
+		self._payload = payload
+		self.status_code = status_code
+		self.text = ""
+
+	def json(self):
+		return self._payload
+
+
+class DummyHttpClient:
+	def __init__(self, pages):
+		self._pages = list(pages)
+		self.calls = []
+
+	def get(self, path, params=None):
+		self.calls.append((path, dict(params or {})))
+		return DummyResponse(self._pages.pop(0))
+
+
+def _invoice(name, client_transaction_id, started_at):
+	return frappe._dict(
+		name=name,
+		owner="cashier@example.com",
+		sumup_client_transaction_id=client_transaction_id,
+		sumup_started_at=started_at,
+		creation=started_at,
+	)
+
+
+class TestPosInvoiceReconciliation(FrappeTestCase):
+	def test_history_windows_merge_overlapping_checkouts(self):
+		base = datetime(2025, 1, 1, 12, 0)
+		invoices = [
+			_invoice("INV-1", "C-1", base),
+			_invoice("INV-2", "C-2", base + timedelta(minutes=20)),
+			_invoice("INV-3", "C-3", base + timedelta(days=2)),
+		]
+
+		windows = reconciliation._get_history_windows(invoices, base + timedelta(days=3))
+
+		self.assertEqual(len(windows), 2)
+		self.assertEqual(windows[0][0], base - reconciliation.RECONCILE_WINDOW_MARGIN)
+		self.assertEqual(
+			windows[0][1], base + timedelta(minutes=20) + reconciliation.RECONCILE_CHECKOUT_DURATION
+		)
+
+	def test_history_follows_next_links(self):
+		http_client = DummyHttpClient(
+			[
+				{"items": [{"id": "T-1"}], "links": [{"rel": "next", "href": "limit=1&oldest_ref=T-1"}]},
+				{"items": [{"id": "T-2"}], "links": []},
+			]
+		)
+		window = (datetime(2025, 1, 1, 12, 0), datetime(2025, 1, 1, 13, 0))
+
+		transactions = reconciliation._fetch_transaction_history(
+			SimpleNamespace(_client=http_client), "MRC", window
+		)
+
+		self.assertEqual([row["id"] for row in transactions], ["T-1", "T-2"])
+		self.assertEqual(http_client.calls[1][1], {"limit": "1", "oldest_ref": "T-1"})
+
+	def test_reconcile_applies_updates_in_bulk(self):
+		started_at = datetime(2025, 1, 1, 12, 0)
+		invoices = [
+			_invoice("INV-1", "C-1", started_at),
+			_invoice("INV-2", "C-2", started_at),
+			_invoice("INV-3", "C-3", started_at),
+		]
+		history = [
+			{
+				"client_transaction_id": "C-1",
+				"status": "SUCCESSFUL",
+				"amount": 10,
+				"currency": "EUR",
+				"id": "T-1",
+			},
+			{"client_transaction_id": "C-2", "status": "FAILED", "id": "T-2"},
+			{"client_transaction_id": "OTHER", "status": "SUCCESSFUL", "id": "T-9"},
+		]
+
+		with self._patch_reconcile(invoices, history) as (writes, published):
+			result = reconciliation.reconcile_pending_sumup_payments(min_age=None)
+
+		self.assertEqual(result["checked"], 3)
+		self.assertEqual(result["pending"], 1)
+		self.assertEqual(len(writes), 1)
+		self.assertEqual(writes[0]["INV-1"]["sumup_status"], "SUCCESSFUL")
+		self.assertEqual(writes[0]["INV-1"]["sumup_amount"], 10)
+		self.assertEqual(writes[0]["INV-2"], {"sumup_transaction_id": "T-2", "sumup_status": "FAILED"})
+		self.assertNotIn("INV-3", writes[0])
+		self.assertEqual(sorted(published), ["INV-1", "INV-2"])
+
+	def test_pending_invoices_skip_cancelled_and_abandoned_checkouts(self):
+		now = datetime(2025, 1, 10, 12, 0)
+		prefix = f"TEST-RECON-{frappe.generate_hash(length=6)}"
+		rows = [
+			("NEW", now - timedelta(minutes=1), now - timedelta(days=3), 1),
+			("DUE", now - timedelta(hours=1), now - timedelta(days=3), 1),
+			("DUE-UNSTARTED", None, now - timedelta(hours=2), 0),
+			("OLD", now - timedelta(days=3), now - timedelta(days=3), 1),
+			("CANCELLED", now - timedelta(hours=1), now - timedelta(hours=1), 2),
+		]
+		frappe.db.bulk_insert(
+			"POS Invoice",
+			fields=[
+				"name",
+				"sumup_status",
+				"sumup_client_transaction_id",
+				"sumup_started_at",
+				"creation",
+				"modified",
+				"docstatus",
+			],
+			values=[
+				(f"{prefix}-{name}", "PENDING", f"C-{name}", started_at, creation, creation, docstatus)
+				for name, started_at, creation, docstatus in rows
+			],
+		)
+
+		pending = reconciliation._get_pending_sumup_invoices(
+			started_before=now - reconciliation.RECONCILE_MIN_AGE,
+			started_after=now - reconciliation.RECONCILE_MAX_AGE,
+		)
+
+		self.assertEqual(
+			[row.name for row in pending if row.name.startswith(prefix)],
+			[f"{prefix}-DUE", f"{prefix}-DUE-UNSTARTED"],
+		)
+
+	def test_reconcile_skips_when_disabled(self):
+		settings = SimpleNamespace(enabled=0, merchant_code="MRC")
+		with (
+			patch.object(reconciliation, "get_sumup_settings", return_value=settings),
+			patch.object(reconciliation, "_get_pending_sumup_invoices") as pending,
+		):
+			result = reconciliation.reconcile_pending_sumup_payments()
+
+		self.assertEqual(result["checked"], 0)
+		pending.assert_not_called()
+
+	@contextmanager
+	def _patch_reconcile(self, invoices, history):
+		settings = SimpleNamespace(enabled=1, merchant_code="MRC", max_parallel_requests=2)
+		writes = []
+		published = []
+		with (
+			patch.object(reconciliation, "get_sumup_settings", return_value=settings),
+			patch.object(reconciliation, "get_sumup_client", return_value=SimpleNamespace()),
+			patch.object(reconciliation, "_get_pending_sumup_invoices", return_value=invoices),
+			patch.object(reconciliation, "_fetch_transaction_history", return_value=history),
+			patch.object(
+				reconciliation.frappe.db,
+				"bulk_update",
+				side_effect=lambda doctype, updates, **kwargs: writes.append(updates),
+			),
+			patch.object(
+				reconciliation,
+				"_publish_sumup_payment_status",
+				side_effect=lambda invoice, result: published.append(invoice.name),
+			),
+		):
+			yield writes, published
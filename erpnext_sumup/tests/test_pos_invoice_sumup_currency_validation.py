@@ -1,7 +1,6 @@
 # Copyright (c) 2025, RocketQuackIT and Contributors
 # See license.txt
 
-from types import SimpleNamespace
 from unittest.mock import patch
 
 import frappe
@@ -36,15 +35,14 @@ class DummyInvoice:
 
 class TestPosInvoiceSumUpCurrencyValidation(FrappeTestCase):
 	def _run_validation(self, doc, pos_profile, merchant_currency):
-		settings = SimpleNamespace(merchant_currency=merchant_currency)
 		with (
 			patch(
 				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.get_cached_doc",
 				return_value=pos_profile,
 			),
 			patch(
-				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.get_sumup_settings",
-				return_value=settings,
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.get_merchant_currency",
+				return_value=merchant_currency,
 			),
 		):
 			validate_pos_invoice_sumup_currency(doc)
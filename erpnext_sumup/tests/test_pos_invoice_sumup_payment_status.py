@@ -6,8 +6,14 @@ from unittest.mock import patch
 
 import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_to_date, now_datetime
 
-from erpnext_sumup.erpnext_sumup.pos.pos_invoice import validate_pos_invoice_sumup_payment_status
+from erpnext_sumup.erpnext_sumup.pos import pos_invoice
+from erpnext_sumup.erpnext_sumup.pos.pos_invoice import (
+	_get_next_poll_after_ms,
+	get_sumup_payment_status,
+	validate_pos_invoice_sumup_payment_status,
+)
 
 
 class DummyPosPaymentMethod:
@@ -118,3 +124,79 @@ class TestPosInvoiceSumUpPaymentStatus(FrappeTestCase):
 		)
 
 		self._run_validation(doc, pos_profile)
+
+	def test_final_status_skips_remote_lookup(self):
+		doc = DummyInvoice(
+			payments=[DummyInvoicePayment("Card", 100)],
+			sumup_status="SUCCESSFUL",
+			sumup_client_transaction_id="TX-4",
+			sumup_amount=100,
+			sumup_currency="EUR",
+		)
+		doc.name = "INV-4"
+		doc.sumup_transaction_id = "SUMUP-4"
+		doc.sumup_refund_amount = 0
+
+		with (
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._get_sumup_invoice",
+				return_value=doc,
+			),
+			patch("erpnext_sumup.erpnext_sumup.pos.pos_invoice.get_sumup_client") as get_client,
+		):
+			result = get_sumup_payment_status(doc.name)
+
+		get_client.assert_not_called()
+		self.assertEqual(result["status"], "SUCCESSFUL")
+		self.assertEqual(result["transaction_id"], "SUMUP-4")
+		self.assertIsNone(result["next_poll_after_ms"])
+
+	def test_status_poll_loads_only_invoice_columns(self):
+		invoice = frappe._dict(name="INV-5", sumup_status="SUCCESSFUL", sumup_transaction_id="SUMUP-5")
+		with (
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.db.get_value",
+				return_value=invoice,
+			) as get_value,
+			patch("erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.get_doc") as get_doc,
+		):
+			result = get_sumup_payment_status("INV-5")
+
+		get_doc.assert_not_called()
+		get_value.assert_called_once_with(
+			"POS Invoice", "INV-5", pos_invoice.SUMUP_INVOICE_FIELDS, as_dict=True
+		)
+		self.assertEqual(result["transaction_id"], "SUMUP-5")
+
+	def test_missing_invoice_raises(self):
+		with (
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.db.get_value",
+				return_value=None,
+			),
+			self.assertRaises(frappe.DoesNotExistError),
+		):
+			get_sumup_payment_status("INV-MISSING")
+
+	def test_poll_interval_backs_off(self):
+		settings = SimpleNamespace(enable_webhooks=0)
+		with patch(
+			"erpnext_sumup.erpnext_sumup.pos.pos_invoice.random.uniform",
+			return_value=0,
+		):
+			self.assertEqual(_get_next_poll_after_ms(None, settings), 3000)
+			self.assertEqual(
+				_get_next_poll_after_ms(add_to_date(now_datetime(), seconds=-25), settings),
+				12000,
+			)
+			self.assertEqual(
+				_get_next_poll_after_ms(add_to_date(now_datetime(), seconds=-600), settings),
+				15000,
+			)
+
+	def test_poll_interval_jitter_is_bounded(self):
+		settings = SimpleNamespace(enable_webhooks=0)
+		for _ in range(20):
+			delay = _get_next_poll_after_ms(None, settings)
+			self.assertGreaterEqual(delay, 2400)
+			self.assertLessEqual(delay, 3600)
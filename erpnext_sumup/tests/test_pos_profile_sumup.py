@@ -1,9 +1,13 @@
 # Copyright (c) 2025, RocketQuackIT and Contributors
 # See license.txt
 
+from types import SimpleNamespace
+from unittest.mock import patch
+
 import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from erpnext_sumup.erpnext_sumup.pos import pos_profile
 from erpnext_sumup.erpnext_sumup.pos.pos_profile import validate_pos_profile_sumup_terminal
 
 
@@ -63,3 +67,64 @@ class TestPOSProfileSumUp(FrappeTestCase):
 	def test_no_sumup_payment_skips_validation(self):
 		doc = DummyDoc(None, [DummyPayment(0)])
 		validate_pos_profile_sumup_terminal(doc)
+
+	def test_profile_terminal_is_cached_until_invalidated(self):
+		profile_name = f"TEST-PROFILE-{frappe.generate_hash(length=8)}"
+		entry = self._make_entry(self.enabled_terminal)
+		self.addCleanup(pos_profile.clear_profile_terminal_cache)
+
+		loaded = {profile_name: entry}
+		with patch.object(pos_profile, "_load_profile_terminals", return_value=loaded) as load:
+			self.assertEqual(pos_profile.get_profile_terminal(profile_name), entry)
+			self.assertEqual(pos_profile.get_profile_terminal(profile_name), entry)
+			self.assertEqual(load.call_count, 1)
+
+			profile = SimpleNamespace(doctype="POS Profile", name=profile_name)
+			pos_profile.clear_profile_terminal_cache(profile)
+			pos_profile.get_profile_terminal(profile_name)
+			self.assertEqual(load.call_count, 2)
+
+			frappe.get_doc("SumUp Terminal", self.enabled_terminal).save(ignore_permissions=True)
+			pos_profile.get_profile_terminal(profile_name)
+			self.assertEqual(load.call_count, 3)
+
+		key = frappe.cache.make_key(pos_profile.PROFILE_TERMINAL_CACHE_KEY)
+		self.assertTrue(0 < frappe.cache.ttl(key) <= pos_profile.PROFILE_TERMINAL_CACHE_TTL_SECONDS)
+
+	def test_invalidation_is_repeated_after_commit(self):
+		profile = SimpleNamespace(doctype="POS Profile", name="TEST-PROFILE")
+		with (
+			patch.object(pos_profile.frappe.cache, "hdel") as hdel,
+			patch.object(pos_profile.frappe.db.after_commit, "add") as after_commit,
+		):
+			pos_profile.clear_profile_terminal_cache(profile, "on_update")
+			hdel.assert_called_once_with(pos_profile.PROFILE_TERMINAL_CACHE_KEY, "TEST-PROFILE")
+
+			after_commit.call_args.args[0]()
+			self.assertEqual(hdel.call_count, 2)
+
+	def test_get_sumup_terminal_for_pos_profile_uses_cached_entry(self):
+		entries = {
+			"Enabled": self._make_entry(self.enabled_terminal),
+			"Disabled": self._make_entry(self.disabled_terminal, enabled=False),
+		}
+		with (
+			patch.object(pos_profile, "get_profile_terminal", side_effect=entries.get),
+			patch.object(pos_profile.frappe.db, "get_value") as get_value,
+		):
+			result = pos_profile.get_sumup_terminal_for_pos_profile("Enabled", mode_of_payment="Card")
+			self.assertEqual(result, {"terminal": self.enabled_terminal})
+			result = pos_profile.get_sumup_terminal_for_pos_profile("Enabled", mode_of_payment="Cash")
+			self.assertEqual(result, {"terminal": None})
+			with self.assertRaises(frappe.ValidationError):
+				pos_profile.get_sumup_terminal_for_pos_profile("Disabled")
+			get_value.assert_not_called()
+
+	def _make_entry(self, terminal, enabled=True):
+		return {
+			"sumup_modes": ["Card"],
+			"terminal": terminal,
+			"terminal_id": frappe.db.get_value("SumUp Terminal", terminal, "terminal_id"),
+			"exists": True,
+			"enabled": enabled,
+		}
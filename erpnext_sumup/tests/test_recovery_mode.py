@@ -23,6 +23,27 @@ class DummyClient:
 		self.readers = DummyReaders(items)
 
 
+class DummyResponse:
+	status_code = 200
+	text = ""
+
+	def __init__(self, payload):
+		self._payload = payload
+
+	def json(self):
+		return self._payload
+
+
+class DummyHttpClient:
+	def __init__(self, pages):
+		self.pages = pages
+		self.calls = []
+
+	def get(self, path, params=None):
+		self.calls.append((path, params))
+		return DummyResponse(self.pages[params["cursor"]])
+
+
 class TestRecoveryMode(FrappeTestCase):
 	def _make_settings(self, *, enabled=True, recovery=True, merchant_code="MRC-TEST"):
 		return SimpleNamespace(
@@ -87,3 +108,109 @@ class TestRecoveryMode(FrappeTestCase):
 		self.assertEqual(result["created"], [])
 		self.assertEqual(result["updated"], [])
 		self.assertEqual(result["failed"], [])
+
+	def test_diff_terminals(self):
+		readers = [
+			{"terminal_id": "R-1", "terminal_name": "Same"},
+			{"terminal_id": "R-2", "terminal_name": "Renamed"},
+			{"terminal_id": "R-3", "terminal_name": "Back"},
+			{"terminal_id": "R-4", "terminal_name": "New"},
+		]
+		local_rows = [
+			{"name": "R-1", "terminal_id": "R-1", "terminal_name": "Same", "missing_in_sumup": 0},
+			{"name": "R-2", "terminal_id": "R-2", "terminal_name": "Old", "missing_in_sumup": 0},
+			{"name": "R-3", "terminal_id": "R-3", "terminal_name": "Back", "missing_in_sumup": 1},
+			{"name": "R-5", "terminal_id": "R-5", "terminal_name": "Gone", "missing_in_sumup": 0},
+		]
+
+		diff = sumup_terminal._diff_terminals(readers, local_rows)
+
+		self.assertEqual([row["terminal_id"] for row in diff["create"]], ["R-4"])
+		self.assertEqual([row["name"] for row in diff["rename"]], ["R-2"])
+		self.assertEqual([row["name"] for row in diff["restore"]], ["R-3"])
+		self.assertEqual([row["name"] for row in diff["orphan"]], ["R-5"])
+		self.assertEqual([row["name"] for row in diff["unchanged"]], ["R-1"])
+
+		diff = sumup_terminal._diff_terminals(readers, local_rows, complete=False)
+
+		self.assertEqual(diff["orphan"], [])
+		self.assertEqual([row["name"] for row in diff["restore"]], ["R-3"])
+
+	def test_recovery_dry_run_does_not_write(self):
+		items = [SimpleNamespace(id="READER-DRY", name="Preview")]
+		settings = self._make_settings()
+
+		with (
+			patch.object(sumup_terminal, "get_sumup_settings", return_value=settings),
+			patch.object(sumup_terminal, "get_sumup_client", return_value=DummyClient(items)),
+		):
+			result = sumup_terminal.recover_terminals_from_sumup(dry_run=1)
+
+		self.assertTrue(result["dry_run"])
+		self.assertEqual(len(result["created"]), 1)
+		self.assertFalse(frappe.db.exists("SumUp Terminal", "READER-DRY"))
+
+	def test_recovery_marks_missing_and_follows_pages(self):
+		self._create_terminal("READER-GONE", "Gone")
+		client = DummyClient([SimpleNamespace(id="READER-P1", name="Page One")])
+		client.readers.list = lambda merchant_code: {
+			"items": [{"id": "READER-P1", "name": "Page One"}],
+			"links": [{"rel": "next", "href": "?cursor=2"}],
+		}
+		client._client = DummyHttpClient({"2": {"items": [{"id": "READER-P2", "name": "Page Two"}]}})
+		self.addCleanup(
+			lambda: [
+				frappe.delete_doc("SumUp Terminal", name, force=1)
+				for name in ("READER-P1", "READER-P2")
+				if frappe.db.exists("SumUp Terminal", name)
+			]
+		)
+
+		with (
+			patch.object(sumup_terminal, "get_sumup_settings", return_value=self._make_settings()),
+			patch.object(sumup_terminal, "get_sumup_client", return_value=client),
+		):
+			result = sumup_terminal.recover_terminals_from_sumup()
+
+		self.assertEqual(len(client._client.calls), 1)
+		self.assertEqual({row["terminal_id"] for row in result["created"]}, {"READER-P1", "READER-P2"})
+		self.assertIn("READER-GONE", [row["terminal_id"] for row in result["orphaned"]])
+		self.assertEqual(frappe.db.get_value("SumUp Terminal", "READER-GONE", "missing_in_sumup"), 1)
+
+	def test_fetch_all_readers_reports_truncated_listing(self):
+		first_page = {"items": [{"id": "READER-P1"}], "links": [{"rel": "next", "href": "?cursor=2"}]}
+		client = DummyClient([])
+		client.readers.list = lambda merchant_code: first_page
+
+		items, truncated = sumup_terminal._fetch_all_readers(client, "MRC-TEST")
+		self.assertEqual(len(items), 1)
+		self.assertTrue(truncated)
+
+		client._client = DummyHttpClient(
+			{"2": {"items": [{"id": "READER-P2"}], "links": [{"rel": "next", "href": "?cursor=2"}]}}
+		)
+		with patch.object(sumup_terminal, "RECOVERY_MAX_PAGES", 3):
+			items, truncated = sumup_terminal._fetch_all_readers(client, "MRC-TEST")
+		self.assertEqual(len(client._client.calls), 2)
+		self.assertEqual(len(items), 3)
+		self.assertTrue(truncated)
+
+		client._client = DummyHttpClient({"2": {"items": [{"id": "READER-P2"}]}})
+		items, truncated = sumup_terminal._fetch_all_readers(client, "MRC-TEST")
+		self.assertEqual(len(items), 2)
+		self.assertFalse(truncated)
+
+	def test_recovery_keeps_terminals_when_a_reader_fails_to_parse(self):
+		self._create_terminal("READER-KEPT", "Kept")
+		self._create_terminal("READER-UNLISTED", "Unlisted")
+		items = [SimpleNamespace(id="READER-KEPT", name="Kept"), SimpleNamespace(id=None, name="Broken")]
+
+		with (
+			patch.object(sumup_terminal, "get_sumup_settings", return_value=self._make_settings()),
+			patch.object(sumup_terminal, "get_sumup_client", return_value=DummyClient(items)),
+		):
+			result = sumup_terminal.recover_terminals_from_sumup()
+
+		self.assertEqual(len(result["failed"]), 1)
+		self.assertEqual(result["orphaned"], [])
+		self.assertEqual(frappe.db.get_value("SumUp Terminal", "READER-UNLISTED", "missing_in_sumup"), 0)
@@ -0,0 +1,60 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_sumup.erpnext_sumup.pos import pos_invoice
+
+
+class TestSumUpAsyncCheckout(FrappeTestCase):
+	def test_enqueue_deduplicates_per_invoice(self):
+		with patch.object(pos_invoice.frappe, "enqueue") as enqueue:
+			result = pos_invoice._enqueue_sumup_checkout("INV-1", SimpleNamespace(enable_webhooks=0))
+
+		self.assertEqual(result["status"], "QUEUED")
+		self.assertEqual(result["job_id"], "sumup_checkout::INV-1")
+		kwargs = enqueue.call_args.kwargs
+		self.assertEqual(enqueue.call_args.args, (pos_invoice.SUMUP_CHECKOUT_JOB_METHOD,))
+		self.assertEqual(kwargs["queue"], "short")
+		self.assertEqual(kwargs["job_id"], "sumup_checkout::INV-1")
+		self.assertTrue(kwargs["deduplicate"])
+		self.assertEqual(kwargs["pos_invoice"], "INV-1")
+
+	def test_job_publishes_transaction_after_commit(self):
+		started = {"status": "PENDING", "client_transaction_id": "CTX-1", "webhook": False}
+		with (
+			patch.object(pos_invoice, "_start_sumup_payment", return_value=started) as start,
+			patch.object(pos_invoice.frappe, "publish_realtime") as publish,
+		):
+			pos_invoice.run_sumup_checkout_job("INV-1")
+
+		start.assert_called_once_with("INV-1")
+		args, kwargs = publish.call_args
+		self.assertEqual(args[0], pos_invoice.SUMUP_CHECKOUT_EVENT)
+		self.assertEqual(args[1]["client_transaction_id"], "CTX-1")
+		self.assertEqual(args[1]["pos_invoice"], "INV-1")
+		self.assertTrue(kwargs["after_commit"])
+
+	def test_job_publishes_errors(self):
+		with (
+			patch.object(
+				pos_invoice,
+				"_start_sumup_payment",
+				side_effect=frappe.ValidationError("SumUp API error: timeout"),
+			),
+			patch.object(pos_invoice.frappe.db, "rollback") as rollback,
+			patch.object(pos_invoice.frappe, "log_error") as log_error,
+			patch.object(pos_invoice.frappe, "publish_realtime") as publish,
+		):
+			pos_invoice.run_sumup_checkout_job("INV-1")
+
+		rollback.assert_called_once()
+		log_error.assert_not_called()
+		payload = publish.call_args.args[1]
+		self.assertEqual(payload["status"], "ERROR")
+		self.assertEqual(payload["message"], "SumUp API error: timeout")
+		self.assertNotIn("after_commit", publish.call_args.kwargs)
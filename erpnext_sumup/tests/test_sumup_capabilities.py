@@ -0,0 +1,54 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_sumup.erpnext_sumup.integrations import sumup_capabilities
+
+
+class ValidationError(Exception):
+	"""Stand-in for pydantic.ValidationError raised by the SDK models."""
+
+
+class TestSumUpCapabilities(FrappeTestCase):
+	def setUp(self):
+		sumup_capabilities.clear_capabilities()
+		self.addCleanup(sumup_capabilities.clear_capabilities)
+		self.typed_calls = 0
+		self.raw_calls = 0
+
+	def _typed(self):
+		self.typed_calls += 1
+		raise ValidationError("invalid transaction")
+
+	def _raw(self):
+		self.raw_calls += 1
+		return {"status": "SUCCESSFUL"}
+
+	def test_failed_typed_parsing_is_remembered(self):
+		first = sumup_capabilities.call_with_raw_fallback("transactions.get", self._typed, self._raw)
+		second = sumup_capabilities.call_with_raw_fallback("transactions.get", self._typed, self._raw)
+
+		self.assertEqual(first, ({"status": "SUCCESSFUL"}, True))
+		self.assertEqual(second, first)
+		self.assertEqual(self.typed_calls, 1)
+		self.assertEqual(self.raw_calls, 2)
+
+	def test_probe_is_per_sdk_version(self):
+		sumup_capabilities.call_with_raw_fallback("transactions.get", self._typed, self._raw)
+		with patch.object(sumup_capabilities, "get_sdk_version", return_value="99.0.0"):
+			self.assertTrue(sumup_capabilities.is_typed_parsing_supported("transactions.get"))
+		self.assertFalse(sumup_capabilities.is_typed_parsing_supported("transactions.get"))
+
+	def test_other_errors_are_raised(self):
+		def typed():
+			raise frappe.ValidationError("SumUp is degraded")
+
+		with self.assertRaises(frappe.ValidationError):
+			sumup_capabilities.call_with_raw_fallback("transactions.get", typed, self._raw)
+
+		self.assertEqual(self.raw_calls, 0)
+		self.assertTrue(sumup_capabilities.is_typed_parsing_supported("transactions.get"))
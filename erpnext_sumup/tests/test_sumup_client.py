@@ -0,0 +1,404 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_sumup.erpnext_sumup.integrations import sumup_client
+
+
+class DummyHttpClient:
+	def __init__(self):
+		self.closed = False
+
+	def close(self):
+		self.closed = True
+
+
+class DummySumup:
+	def __init__(self, api_key):
+		self.api_key = api_key
+		self._client = DummyHttpClient()
+
+
+class DummyCache:
+	def __init__(self):
+		self.values = {}
+
+	def get_value(self, key):
+		return self.values.get(key)
+
+	def set_value(self, key, value, expires_in_sec=None):
+		self.values[key] = value
+
+	def delete_value(self, key):
+		self.values.pop(key, None)
+
+	def make_key(self, key):
+		return key
+
+	def set(self, name, value, ex=None, nx=False):
+		if nx and name in self.values:
+			return None
+		self.values[name] = value
+		return True
+
+	def execute_command(self, command, name, *fields):
+		values = self.values.get(name) or {}
+		return [values.get(field) for field in fields]
+
+	def register_script(self, script):
+		def run_circuit_failure(keys, args):
+			# Mirrors _CIRCUIT_FAILURE_SCRIPT.
+			state = self.values.setdefault(keys[0], {})
+			state["failures"] = state.get("failures", 0) + 1
+			if state["failures"] >= args[0]:
+				state["opened_until"] = args[1]
+			return state["failures"]
+
+		return run_circuit_failure
+
+
+class DummyApiError(Exception):
+	def __init__(self, status):
+		super().__init__(f"status {status}")
+		self.status = status
+
+
+class TestSumUpClientCache(FrappeTestCase):
+	def setUp(self):
+		sumup_client.clear_sumup_client_cache()
+		patcher = patch.object(sumup_client, "Sumup", DummySumup)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+		self.addCleanup(sumup_client.clear_sumup_client_cache)
+
+	def test_reuses_client_for_same_key(self):
+		first = sumup_client.get_cached_client("sk_test_1")
+		second = sumup_client.get_cached_client("sk_test_1")
+		self.assertIs(first, second)
+
+	def test_separate_clients_per_key(self):
+		first = sumup_client.get_cached_client("sk_test_1")
+		second = sumup_client.get_cached_client("sk_test_2")
+		self.assertIsNot(first, second)
+		self.assertEqual(second.api_key, "sk_test_2")
+
+	def test_cache_is_keyed_by_digest(self):
+		sumup_client.get_cached_client("sk_test_secret")
+		self.assertNotIn("sk_test_secret", sumup_client._client_cache)
+
+	def test_clear_closes_transports(self):
+		client = sumup_client.get_cached_client("sk_test_1")
+		sumup_client.clear_sumup_client_cache()
+		self.assertTrue(client._client.closed)
+		self.assertIsNot(sumup_client.get_cached_client("sk_test_1"), client)
+
+
+class TestMapSumUpCalls(FrappeTestCase):
+	def test_results_keep_input_order(self):
+		results = sumup_client.map_sumup_calls(lambda value: value * 2, [3, 1, 2], max_workers=3)
+		self.assertEqual([result for result, error in results], [6, 2, 4])
+		self.assertTrue(all(error is None for result, error in results))
+
+	def test_errors_are_returned_per_item(self):
+		def func(value):
+			if value == 2:
+				raise ValueError("boom")
+			return value
+
+		results = sumup_client.map_sumup_calls(func, [1, 2, 3], max_workers=2)
+		self.assertEqual(results[0], (1, None))
+		self.assertIsNone(results[1][0])
+		self.assertIsInstance(results[1][1], ValueError)
+		self.assertEqual(results[2], (3, None))
+
+	def test_concurrency_is_bounded(self):
+		lock = threading.Lock()
+		state = {"active": 0, "peak": 0}
+		barrier = threading.Event()
+
+		def func(value):
+			with lock:
+				state["active"] += 1
+				state["peak"] = max(state["peak"], state["active"])
+			barrier.wait(0.05)
+			with lock:
+				state["active"] -= 1
+			return value
+
+		sumup_client.map_sumup_calls(func, range(10), max_workers=3)
+		self.assertLessEqual(state["peak"], 3)
+
+	def test_empty_items(self):
+		self.assertEqual(sumup_client.map_sumup_calls(lambda value: value, []), [])
+
+
+class TestMerchantFacts(FrappeTestCase):
+	def setUp(self):
+		self.cache = DummyCache()
+		snapshot = sumup_client.SumUpSettingsSnapshot({"merchant_code": "MRC"}, {"api_key": "sk_test"}, "v1")
+		patchers = [
+			patch.object(sumup_client.frappe, "cache", self.cache),
+			patch.object(sumup_client, "get_sumup_settings", return_value=snapshot),
+		]
+		for patcher in patchers:
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+	def _patch_profile(self):
+		return patch.object(
+			sumup_client,
+			"fetch_merchant_profile",
+			return_value={"merchant_code": "MRC", "currency": "EUR"},
+		)
+
+	def test_profile_is_fetched_once(self):
+		with (
+			self._patch_profile() as fetch_profile,
+			patch.object(sumup_client, "get_currency_minor_unit", return_value=2),
+		):
+			first = sumup_client.get_merchant_facts(api_key="sk_test", merchant_code="MRC")
+			second = sumup_client.get_merchant_facts(api_key="sk_test", merchant_code="MRC")
+
+		self.assertEqual(first, {"merchant_code": "MRC", "currency": "EUR", "minor_unit": 2})
+		self.assertEqual(second, first)
+		fetch_profile.assert_called_once()
+
+	def test_force_and_other_merchant_refetch(self):
+		with (
+			self._patch_profile() as fetch_profile,
+			patch.object(sumup_client, "get_currency_minor_unit", return_value=2),
+		):
+			sumup_client.get_merchant_facts(api_key="sk_test", merchant_code="MRC")
+			sumup_client.get_merchant_facts(api_key="sk_test", merchant_code="MRC", force=True)
+			sumup_client.get_merchant_facts(api_key="sk_test", merchant_code="OTHER")
+
+		self.assertEqual(fetch_profile.call_count, 3)
+
+	def test_unsaved_key_is_not_cached(self):
+		with (
+			self._patch_profile() as fetch_profile,
+			patch.object(sumup_client, "get_currency_minor_unit", return_value=2),
+		):
+			sumup_client.get_merchant_facts(api_key="sk_other", merchant_code="MRC")
+			sumup_client.get_merchant_facts(api_key="sk_test", merchant_code="MRC")
+
+		self.assertEqual(fetch_profile.call_count, 2)
+
+	def test_merchant_currency_prefers_cache_of_saved_merchant(self):
+		self.cache.set_value(
+			sumup_client.MERCHANT_FACTS_CACHE_KEY, {"merchant_code": "MRC", "currency": "CHF"}
+		)
+		snapshot = sumup_client.SumUpSettingsSnapshot(
+			{"merchant_code": "MRC", "merchant_currency": "EUR"}, {}, "v1"
+		)
+		with patch.object(sumup_client, "get_sumup_settings", return_value=snapshot):
+			self.assertEqual(sumup_client.get_merchant_currency(), "CHF")
+
+		snapshot = sumup_client.SumUpSettingsSnapshot(
+			{"merchant_code": "OTHER", "merchant_currency": "EUR"}, {}, "v1"
+		)
+		with patch.object(sumup_client, "get_sumup_settings", return_value=snapshot):
+			self.assertEqual(sumup_client.get_merchant_currency(), "EUR")
+
+		sumup_client.clear_merchant_facts_cache()
+		snapshot = sumup_client.SumUpSettingsSnapshot(
+			{"merchant_code": "MRC", "merchant_currency": "EUR"}, {}, "v1"
+		)
+		with patch.object(sumup_client, "get_sumup_settings", return_value=snapshot):
+			self.assertEqual(sumup_client.get_merchant_currency(), "EUR")
+
+
+class TestSumUpSettingsSnapshot(FrappeTestCase):
+	def setUp(self):
+		self.cache = DummyCache()
+		patchers = [
+			patch.object(sumup_client.frappe, "cache", self.cache),
+			patch.object(sumup_client.frappe.db, "after_commit", SimpleNamespace(add=lambda func: None)),
+		]
+		for patcher in patchers:
+			patcher.start()
+			self.addCleanup(patcher.stop)
+		sumup_client._clear_settings_snapshot()
+		self.addCleanup(sumup_client._clear_settings_snapshot)
+
+	def _patch_loaders(self, version="2025-01-01 00:00:00"):
+		return (
+			patch.object(
+				sumup_client,
+				"_load_settings_values",
+				return_value={"version": version, "values": {"enabled": 1, "merchant_code": "MRC"}},
+			),
+			patch.object(sumup_client, "get_decrypted_password", return_value="sk_test"),
+		)
+
+	def test_snapshot_is_read_only(self):
+		snapshot = sumup_client.SumUpSettingsSnapshot({"enabled": 1}, {"api_key": "sk_test"}, "v1")
+		self.assertEqual(snapshot.enabled, 1)
+		self.assertEqual(snapshot.get_password("api_key"), "sk_test")
+		self.assertIsNone(getattr(snapshot, "missing", None))
+		with self.assertRaises(AttributeError):
+			snapshot.enabled = 0
+
+	def test_snapshot_is_built_once_per_request(self):
+		load_values, decrypt = self._patch_loaders()
+		with load_values as load, decrypt as get_password:
+			first = sumup_client.get_sumup_settings()
+			second = sumup_client.get_sumup_settings()
+
+		self.assertIs(first, second)
+		self.assertEqual(first.merchant_code, "MRC")
+		load.assert_called_once()
+		self.assertEqual(get_password.call_count, len(sumup_client.SETTINGS_SECRET_FIELDS))
+
+	def test_secrets_stay_out_of_redis(self):
+		load_values, decrypt = self._patch_loaders()
+		with load_values, decrypt:
+			sumup_client.get_sumup_settings()
+
+		cached = self.cache.get_value(sumup_client.SETTINGS_CACHE_KEY)
+		self.assertNotIn("api_key", cached["values"])
+		self.assertNotIn("sk_test", repr(cached))
+
+	def test_next_request_reuses_redis_and_decrypted_key(self):
+		load_values, decrypt = self._patch_loaders()
+		with load_values as load, decrypt as get_password:
+			sumup_client.get_sumup_settings()
+			sumup_client.frappe.local.sumup_settings = None
+			snapshot = sumup_client.get_sumup_settings()
+
+		load.assert_called_once()
+		self.assertEqual(get_password.call_count, len(sumup_client.SETTINGS_SECRET_FIELDS))
+		self.assertEqual(snapshot.get_password("api_key"), "sk_test")
+
+
+class TestSumUpCircuitBreaker(FrappeTestCase):
+	def setUp(self):
+		self.cache = DummyCache()
+		self.now = 1000.0
+		settings = SimpleNamespace(
+			circuit_failure_threshold=2,
+			circuit_cooldown_seconds=30,
+			request_timeout_seconds=1,
+			latency_budget_seconds=5,
+		)
+		patch.object(sumup_client.frappe, "cache", self.cache).start()
+		patch.object(sumup_client, "get_sumup_settings", return_value=settings).start()
+		patch.object(sumup_client.time, "time", side_effect=lambda: self.now).start()
+		self.addCleanup(patch.stopall)
+
+	def _fail(self, status=503):
+		def call():
+			raise DummyApiError(status)
+
+		with self.assertRaises(DummyApiError):
+			sumup_client.call_sumup("readers.get_status", call)
+
+	def test_opens_after_threshold_and_fails_fast(self):
+		self._fail()
+		self._fail()
+		calls = []
+		with self.assertRaises(sumup_client.SumUpDegradedError):
+			sumup_client.call_sumup("readers.get_status", lambda: calls.append(1))
+
+		self.assertEqual(calls, [])
+		# Other operations keep their own counters.
+		self.assertEqual(sumup_client.call_sumup("transactions.get", lambda: "ok"), "ok")
+
+	def test_rejected_requests_do_not_count(self):
+		for _attempt in range(3):
+			self._fail(status=404)
+
+		self.assertIsNone(self.cache.get_value("erpnext_sumup:circuit_state:readers.get_status"))
+
+	def test_single_probe_after_cooldown_closes_circuit(self):
+		self._fail()
+		self._fail()
+		self.now += 31
+
+		self.assertEqual(sumup_client.call_sumup("readers.get_status", lambda: "ok"), "ok")
+		self.assertEqual(sumup_client.call_sumup("readers.get_status", lambda: "again"), "again")
+
+	def test_concurrent_probe_is_rejected(self):
+		self._fail()
+		self._fail()
+		self.now += 31
+		self.cache.set("erpnext_sumup:circuit_state:readers.get_status:probe", 1)
+
+		with self.assertRaises(sumup_client.SumUpDegradedError):
+			sumup_client.call_sumup("readers.get_status", lambda: "ok")
+
+	def test_server_error_responses_count(self):
+		for _attempt in range(2):
+			sumup_client.call_sumup("transactions.history", lambda: SimpleNamespace(status_code=503))
+
+		with self.assertRaises(sumup_client.SumUpDegradedError):
+			sumup_client.call_sumup("transactions.history", lambda: SimpleNamespace(status_code=200))
+
+	def test_failures_of_concurrent_callers_all_count(self):
+		# Both callers entered while the circuit was closed and fail afterwards.
+		state = sumup_client._enter_circuit("readers.get_status", sumup_client.get_circuit_policy())
+		for _caller in range(2):
+			sumup_client._record_circuit_result(
+				"readers.get_status", sumup_client.get_circuit_policy(), state, failed=True
+			)
+
+		with self.assertRaises(sumup_client.SumUpDegradedError):
+			sumup_client.call_sumup("readers.get_status", lambda: "ok")
+
+
+class TestSumUpRateLimit(FrappeTestCase):
+	def setUp(self):
+		self.settings = SimpleNamespace(
+			enable_rate_limiting=1,
+			rate_limit_per_second=10,
+			rate_limit_burst=20,
+			rate_limit_max_wait_seconds=5,
+		)
+		patch.object(sumup_client.frappe, "cache", DummyCache()).start()
+		patch.object(sumup_client, "get_sumup_settings", return_value=self.settings).start()
+		self.sleep = patch.object(sumup_client.time, "sleep").start()
+		self.drain = patch.object(sumup_client, "_drain_rate_limit").start()
+		self.addCleanup(patch.stopall)
+
+	def test_waits_for_a_token(self):
+		with patch.object(sumup_client, "_take_rate_limit_token", side_effect=[0.2, 0]) as take:
+			self.assertEqual(sumup_client.call_sumup("transactions.get", lambda: "ok"), "ok")
+
+		self.sleep.assert_called_once_with(0.2)
+		self.assertEqual(take.call_count, 2)
+
+	def test_status_calls_leave_a_reserve(self):
+		with patch.object(sumup_client, "_take_rate_limit_token", return_value=0) as take:
+			sumup_client.call_sumup("readers.get_status", lambda: None)
+			sumup_client.call_sumup("transactions.refund", lambda: None)
+
+		self.assertEqual(take.call_args_list[0].args, (10, 20, 5))
+		self.assertEqual(take.call_args_list[1].args, (10, 20, 0))
+
+	def test_gives_up_after_max_wait(self):
+		calls = []
+		with (
+			patch.object(sumup_client, "_take_rate_limit_token", return_value=30),
+			self.assertRaises(sumup_client.SumUpRateLimitedError),
+		):
+			sumup_client.call_sumup("readers.list", lambda: calls.append(1))
+
+		self.assertEqual(calls, [])
+		self.sleep.assert_not_called()
+
+	def test_too_many_requests_drains_the_bucket(self):
+		def call():
+			raise DummyApiError(429)
+
+		with (
+			patch.object(sumup_client, "_take_rate_limit_token", return_value=0),
+			self.assertRaises(sumup_client.SumUpRateLimitedError),
+		):
+			sumup_client.call_sumup("transactions.refund", call)
+
+		self.drain.assert_called_once()
@@ -0,0 +1,66 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_sumup.erpnext_sumup.integrations import sumup_currency
+
+
+class DummyCache:
+	def __init__(self):
+		self.values = {}
+
+	def get_value(self, key):
+		return self.values.get(key)
+
+	def set_value(self, key, value, expires_in_sec=None):
+		self.values[key] = value
+
+
+CURRENCY_ROWS = [
+	frappe._dict(name="EUR", fraction_units=100, smallest_currency_fraction_value=0.01),
+	frappe._dict(name="JPY", fraction_units=0, smallest_currency_fraction_value=1),
+	frappe._dict(name="KWD", fraction_units=None, smallest_currency_fraction_value=0.001),
+]
+
+
+class TestSumUpCurrencyTable(FrappeTestCase):
+	def setUp(self):
+		self.cache = DummyCache()
+		patch.object(sumup_currency.frappe, "cache", self.cache).start()
+		self.get_all = patch.object(sumup_currency.frappe, "get_all", return_value=CURRENCY_ROWS).start()
+		self.addCleanup(patch.stopall)
+		sumup_currency.clear_currency_table()
+		self.addCleanup(sumup_currency.clear_currency_table)
+
+	def test_table_is_built_once(self):
+		self.assertEqual(sumup_currency.get_currency_minor_unit("EUR"), 2)
+		self.assertEqual(sumup_currency.get_currency_minor_unit("JPY"), 0)
+		self.assertEqual(sumup_currency.get_currency_minor_unit("KWD"), 3)
+		self.assertEqual(sumup_currency.get_currency_minor_unit("XXX"), sumup_currency.DEFAULT_MINOR_UNIT)
+		self.assertEqual(self.get_all.call_count, 1)
+
+	def test_currency_change_rebuilds_the_table(self):
+		sumup_currency.get_currency_minor_unit("EUR")
+		sumup_currency.clear_currency_table()
+		sumup_currency.get_currency_minor_unit("EUR")
+		self.assertEqual(self.get_all.call_count, 2)
+
+	def test_other_worker_rebuilds_after_version_change(self):
+		sumup_currency.get_currency_minor_unit("EUR")
+		# Another worker saved a Currency: only the Redis version changed.
+		self.cache.set_value(sumup_currency.CURRENCY_TABLE_VERSION_KEY, "changed")
+		frappe.local.sumup_currency_table_version = None
+		sumup_currency.get_currency_minor_unit("EUR")
+		self.assertEqual(self.get_all.call_count, 2)
+
+	def test_to_minor_value_rounds_half_up(self):
+		self.assertEqual(
+			[sumup_currency.to_minor_value(amount, 2) for amount in (10, 0.015, "12.345", 1.005)],
+			[1000, 2, 1235, 101],
+		)
+		self.assertEqual(sumup_currency.to_minor_value(1.5, 0), 2)
+		self.assertEqual(sumup_currency.to_minor_value(1.0005, 3), 1001)
@@ -0,0 +1,82 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+from types import SimpleNamespace
+
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_sumup.erpnext_sumup.integrations.sumup_fields import compile_fields, dump_model
+from erpnext_sumup.erpnext_sumup.pos.pos_invoice import _extract_transaction_fields
+
+
+class CountingModel:
+	def __init__(self, payload):
+		self._payload = payload
+		self.dump_calls = 0
+
+	def model_dump(self):
+		self.dump_calls += 1
+		return dict(self._payload)
+
+
+class TestSumUpFieldResolver(FrappeTestCase):
+	def test_paths_are_tried_in_order(self):
+		resolver = compile_fields({"currency": ("currency", "profile.currency", "profile.currencyCode")})
+		self.assertEqual(resolver.resolve_one({"profile": {"currencyCode": "EUR"}}, "currency"), "EUR")
+		self.assertEqual(
+			resolver.resolve_one({"currency": "CHF", "profile": {"currency": "EUR"}}, "currency"),
+			"CHF",
+		)
+		self.assertIsNone(resolver.resolve_one({}, "currency"))
+
+	def test_model_is_dumped_once(self):
+		resolver = compile_fields({"id": ("id",), "status": ("status",), "name": ("name",)})
+		model = CountingModel({"id": "R-1", "status": "PAIRED", "name": "Front"})
+
+		self.assertEqual(resolver.resolve(model), {"id": "R-1", "status": "PAIRED", "name": "Front"})
+		self.assertEqual(model.dump_calls, 1)
+
+	def test_attributes_skip_the_dump(self):
+		resolver = compile_fields({"id": ("id",), "status": ("status",)})
+		model = CountingModel({})
+		model.id = "R-1"
+		model.status = "PAIRED"
+
+		self.assertEqual(resolver.resolve(model), {"id": "R-1", "status": "PAIRED"})
+		self.assertEqual(model.dump_calls, 0)
+
+	def test_plain_objects_use_attributes(self):
+		resolver = compile_fields({"code": ("merchant_code", "merchant_profile.merchant_code")})
+		profile = SimpleNamespace(merchant_profile=SimpleNamespace(merchant_code="MRC"))
+		self.assertEqual(resolver.resolve_one(profile, "code"), "MRC")
+		self.assertIsNone(resolver.resolve_one(object(), "code"))
+
+	def test_dump_model_keeps_plain_values(self):
+		payload = {"id": 1}
+		self.assertIs(dump_model(payload), payload)
+		self.assertIsNone(dump_model(None))
+
+
+class TestTransactionFields(FrappeTestCase):
+	def test_top_level_transaction(self):
+		fields = _extract_transaction_fields(
+			CountingModel({"status": "successful", "amount": 12.5, "currency": "EUR", "id": 42})
+		)
+		self.assertEqual(fields["status"], "SUCCESSFUL")
+		self.assertEqual(fields["amount"], 12.5)
+		self.assertEqual(fields["currency"], "EUR")
+		self.assertEqual(fields["transaction_id"], "42")
+		self.assertIsNone(fields["refunded_amount"])
+
+	def test_nested_and_list_responses(self):
+		fields = _extract_transaction_fields(
+			{
+				"data": {"simple_status": "pending"},
+				"items": [{"amount": 0, "currency": "SEK", "transaction_code": "TX-9", "refunded_amount": 0}],
+			}
+		)
+		self.assertEqual(fields["status"], "PENDING")
+		self.assertEqual(fields["amount"], 0)
+		self.assertEqual(fields["currency"], "SEK")
+		self.assertEqual(fields["transaction_id"], "TX-9")
+		self.assertEqual(fields["refunded_amount"], 0)
@@ -0,0 +1,116 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_sumup.erpnext_sumup.integrations import sumup_client, sumup_metrics
+
+
+class DummyPipeline:
+	def __init__(self, cache):
+		self.cache = cache
+		self.commands = []
+
+	def hincrby(self, key, field, amount):
+		self.commands.append(("hincrby", key, field, amount))
+
+	def expire(self, key, seconds):
+		pass
+
+	def hgetall(self, key):
+		self.commands.append(("hgetall", key))
+
+	def execute(self):
+		results = []
+		for command in self.commands:
+			if command[0] == "hincrby":
+				_name, key, field, amount = command
+				values = self.cache.hashes.setdefault(key, {})
+				values[field.encode()] = values.get(field.encode(), 0) + amount
+				results.append(values[field.encode()])
+			else:
+				results.append(dict(self.cache.hashes.get(command[1], {})))
+		self.cache.round_trips += 1
+		return results
+
+
+class DummyCache:
+	def __init__(self):
+		self.hashes = {}
+		self.round_trips = 0
+
+	def make_key(self, key):
+		return key
+
+	def pipeline(self):
+		return DummyPipeline(self)
+
+
+class TestSumUpMetrics(FrappeTestCase):
+	def setUp(self):
+		self.cache = DummyCache()
+		patch.object(sumup_metrics.frappe, "cache", self.cache).start()
+		self.addCleanup(patch.stopall)
+
+	def test_percentiles_use_bucket_upper_bounds(self):
+		buckets = {
+			sumup_metrics._get_bucket(10): 90,
+			sumup_metrics._get_bucket(100): 8,
+			sumup_metrics._get_bucket(1000): 2,
+		}
+
+		result = sumup_metrics.get_percentiles(buckets)
+
+		self.assertAlmostEqual(result["p50"], 10, delta=1)
+		self.assertAlmostEqual(result["p95"], 100, delta=9)
+		self.assertAlmostEqual(result["p99"], 1000, delta=90)
+		self.assertEqual(sumup_metrics.get_percentiles({}), {"p50": None, "p95": None, "p99": None})
+
+	def test_record_uses_one_round_trip_and_aggregates(self):
+		sumup_metrics.record_sumup_call("transactions.get", 0.2, failed=False)
+		sumup_metrics.record_sumup_call("transactions.get", 0.4, failed=True)
+		sumup_metrics.record_sumup_call("readers.list", 0.05, failed=False)
+		self.assertEqual(self.cache.round_trips, 3)
+
+		metrics = sumup_metrics.get_sumup_metrics(hours=2)
+
+		operations = {row["operation"]: row for row in metrics["operations"]}
+		self.assertEqual(operations["transactions.get"]["count"], 2)
+		self.assertEqual(operations["transactions.get"]["error_rate"], 50)
+		self.assertEqual(metrics["total"]["count"], 3)
+		self.assertEqual(metrics["total"]["errors"], 1)
+
+	def test_call_sumup_skips_metrics_when_disabled(self):
+		settings = SimpleNamespace(enable_api_metrics=0)
+		with (
+			patch.object(sumup_client, "get_sumup_settings", return_value=settings),
+			patch.object(sumup_client, "_enter_circuit", return_value=None),
+			patch.object(sumup_client, "_record_circuit_result"),
+			patch.object(sumup_client, "record_sumup_call") as record,
+		):
+			self.assertEqual(sumup_client.call_sumup("readers.list", lambda: "ok"), "ok")
+			record.assert_not_called()
+
+			settings.enable_api_metrics = 1
+			sumup_client.call_sumup("readers.list", lambda: "ok")
+			record.assert_called_once()
+
+	def test_number_cards_are_empty_for_other_users(self):
+		cards = (sumup_metrics.get_sumup_latency_card, sumup_metrics.get_sumup_error_rate_card)
+		with (
+			patch.object(sumup_metrics.frappe, "get_roles", return_value=["Sales User"]),
+			patch.object(sumup_metrics, "get_sumup_metrics") as get_metrics,
+		):
+			self.assertEqual([card()["value"] for card in cards], [None, None])
+		get_metrics.assert_not_called()
+
+		totals = {"total": {"p95": 120, "error_rate": 5}}
+		with (
+			patch.object(sumup_metrics.frappe, "get_roles", return_value=["System Manager"]),
+			patch.object(sumup_metrics, "get_sumup_metrics", return_value=totals),
+		):
+			self.assertEqual([card()["value"] for card in cards], [120, 5])
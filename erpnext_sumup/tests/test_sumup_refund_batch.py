@@ -0,0 +1,100 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_sumup.erpnext_sumup.pos import pos_invoice_refund_batch as batch
+
+
+def _return_row(name, *, return_against="INV-1", amount=10, transaction_id="TX-1", **values):
+	row = {
+		"name": name,
+		"is_return": 1,
+		"docstatus": 0,
+		"return_against": return_against,
+		"currency": "EUR",
+		"grand_total": -amount,
+		"rounded_total": -amount,
+		"sumup_refund_status": None,
+		"sumup_transaction_id": transaction_id,
+		"sumup_status": "SUCCESSFUL",
+		"sumup_amount": 100,
+		"sumup_refund_amount": 20,
+		"sumup_currency": "EUR",
+		"original_currency": "EUR",
+	}
+	row.update(values)
+	return frappe._dict(row)
+
+
+class TestSumUpRefundBatch(FrappeTestCase):
+	def test_parse_invoice_names_drops_duplicates(self):
+		self.assertEqual(batch._parse_invoice_names('["RET-1", "RET-2", "RET-1"]'), ["RET-1", "RET-2"])
+		self.assertEqual(batch._parse_invoice_names("RET-1"), ["RET-1"])
+
+	def test_batch_refund_errors(self):
+		recorded = {"RET-2"}
+
+		self.assertIsNone(batch._get_batch_refund_error(_return_row("RET-1"), recorded))
+		self.assertIsNone(batch._get_batch_refund_error(_return_row("RET-1", docstatus=1), recorded))
+		self.assertIn("already recorded", batch._get_batch_refund_error(_return_row("RET-2"), recorded))
+		self.assertIn(
+			"already attempted",
+			batch._get_batch_refund_error(
+				_return_row("RET-3", docstatus=1, sumup_refund_status="FAILED"), recorded
+			),
+		)
+		self.assertIn(
+			"not completed",
+			batch._get_batch_refund_error(_return_row("RET-4", sumup_status="FAILED"), recorded),
+		)
+		self.assertIn("draft or submitted", batch._get_batch_refund_error(None, recorded))
+
+	def test_batch_queues_refunds_through_the_outbox(self):
+		names = ["RET-1", "RET-2", "RET-3"]
+		rows = {
+			"RET-1": _return_row("RET-1"),
+			"RET-2": _return_row("RET-2"),
+			"RET-3": _return_row("RET-3", sumup_status="FAILED"),
+		}
+
+		def fake_queue(name):
+			if name == "RET-2":
+				frappe.throw("SumUp refund amount exceeds the original payment amount.")
+			return "PENDING"
+
+		with (
+			patch.object(batch, "_get_return_rows", return_value=rows),
+			patch.object(batch.frappe, "get_all", return_value=[]),
+			patch.object(batch, "_queue_batch_refund", side_effect=fake_queue) as queue,
+			patch.object(batch.frappe.db, "commit") as commit,
+			patch.object(batch.frappe.db, "rollback") as rollback,
+			patch.object(batch.frappe, "publish_realtime") as publish,
+		):
+			results = batch.run_sumup_refund_batch(names, batch_id="B-1", user="test@example.com")
+
+		self.assertEqual([call.args[0] for call in queue.call_args_list], ["RET-1", "RET-2"])
+		self.assertEqual([result["status"] for result in results], ["Queued", "Skipped", "Skipped"])
+		self.assertIn("exceeds", results[1]["error"])
+		self.assertIn("not completed", results[2]["error"])
+		commit.assert_called_once()
+		rollback.assert_called_once()
+		self.assertEqual(publish.call_args.args[1]["batch_id"], "B-1")
+
+	def test_draft_returns_are_submitted(self):
+		doc = frappe._dict(docstatus=0, sumup_refund_status=None)
+
+		def submit():
+			doc.sumup_refund_status = "PENDING"
+
+		doc.submit = submit
+		with (
+			patch.object(batch.frappe, "get_doc", return_value=doc),
+			patch.object(batch, "_queue_return_refund") as queue,
+		):
+			self.assertEqual(batch._queue_batch_refund("RET-1"), "PENDING")
+
+		queue.assert_not_called()
@@ -0,0 +1,103 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_sumup.erpnext_sumup.integrations.sumup_client import SumUpDegradedError
+from erpnext_sumup.erpnext_sumup.pos import pos_invoice, pos_invoice_refund
+
+
+class TestSumUpRefundOutbox(FrappeTestCase):
+	def test_before_submit_queues_without_calling_sumup(self):
+		doc = SimpleNamespace(name="RET-1", is_return=1, currency="EUR", sumup_refund_status=None)
+		context = {"return_against": "INV-1", "transaction_id": "TX-1", "refund_amount": 10}
+
+		with (
+			patch.object(pos_invoice, "get_sumup_settings", return_value=SimpleNamespace(enabled=1)),
+			patch.object(pos_invoice, "_get_sumup_refund_context", return_value=context),
+			patch.object(pos_invoice, "queue_sumup_refund") as queue,
+			patch.object(pos_invoice, "_attempt_sumup_return_refund") as attempt,
+			patch.object(pos_invoice.frappe.db, "set_value"),
+		):
+			pos_invoice.process_sumup_return_refund_before_submit(doc)
+
+		attempt.assert_not_called()
+		queue.assert_called_once_with(
+			return_invoice="RET-1", return_against="INV-1", transaction_id="TX-1", amount=10, currency="EUR"
+		)
+		self.assertEqual(doc.sumup_refund_status, "PENDING")
+
+	def test_successful_refund_is_recorded(self):
+		with self._patch_worker(result=True) as writes:
+			pos_invoice_refund.process_sumup_refund("REF-1")
+
+		self.assertEqual(writes["REF-1"]["status"], "Successful")
+
+	def test_retryable_error_requeues_with_backoff(self):
+		with self._patch_worker(error=SumUpDegradedError("open"), attempts=0) as writes:
+			pos_invoice_refund.process_sumup_refund("REF-1")
+
+		self.assertEqual(writes["REF-1"]["status"], "Queued")
+		self.assertIn("next_attempt_at", writes["REF-1"])
+		self.set_state.assert_not_called()
+
+	def test_retryable_error_fails_after_max_attempts(self):
+		attempts = pos_invoice_refund.REFUND_MAX_ATTEMPTS - 1
+		with self._patch_worker(error=SumUpDegradedError("open"), attempts=attempts) as writes:
+			pos_invoice_refund.process_sumup_refund("REF-1")
+
+		self.assertEqual(writes["REF-1"]["status"], "Failed")
+		self.set_state.assert_called_once()
+
+	def test_claimed_refund_is_not_sent_twice(self):
+		with self._patch_worker(result=True, status="Processing") as writes:
+			pos_invoice_refund.process_sumup_refund("REF-1")
+
+		self.attempt.assert_not_called()
+		self.assertEqual(writes, {})
+
+	@contextmanager
+	def _patch_worker(self, *, result=None, error=None, attempts=0, status="Queued"):
+		row = frappe._dict(
+			name="REF-1",
+			return_invoice="RET-1",
+			return_against="INV-1",
+			transaction_id="TX-1",
+			amount=10,
+			status=status,
+			attempts=attempts,
+		)
+		invoice = frappe._dict(name="RET-1", owner="Administrator", sumup_refund_status="PENDING")
+		original = frappe._dict(name="INV-1", sumup_refund_amount=0)
+		writes = {}
+
+		def set_value(doctype, name, values, *args, **kwargs):
+			if doctype == pos_invoice_refund.REFUND_DOCTYPE and values.get("status") != "Processing":
+				writes[name] = values
+
+		with (
+			patch.object(pos_invoice_refund.frappe.db, "get_value", return_value=row),
+			patch.object(pos_invoice_refund.frappe.db, "set_value", side_effect=set_value),
+			patch.object(pos_invoice_refund.frappe.db, "commit"),
+			patch.object(pos_invoice_refund.frappe, "publish_realtime"),
+			patch.object(
+				pos_invoice_refund,
+				"_get_sumup_invoice",
+				side_effect=lambda name: invoice if name == "RET-1" else original,
+			),
+			patch.object(
+				pos_invoice_refund,
+				"_attempt_sumup_return_refund",
+				side_effect=error,
+				return_value=result,
+			) as attempt,
+			patch.object(pos_invoice_refund, "_set_sumup_refund_state") as set_state,
+		):
+			self.attempt = attempt
+			self.set_state = set_state
+			yield writes
@@ -90,13 +90,32 @@ class TestSumUpReturnRefund(FrappeTestCase):
 			self._patch_defaults(),
 			self._patch_settings(),
 			patch(
-				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.get_doc",
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._get_sumup_invoice",
 				return_value=original_doc,
 			),
 		):
 			with self.assertRaises(frappe.ValidationError):
 				pos_invoice.validate_sumup_return_refund(return_doc)
 
+	def test_validate_refund_counts_queued_refunds(self):
+		return_doc = DummyReturnDoc(grand_total=-40, rounded_total=-40)
+		original_doc = DummyOriginalDoc(sumup_amount=100, sumup_refund_amount=20)
+
+		with (
+			self._patch_defaults(),
+			self._patch_settings(),
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._get_sumup_invoice",
+				return_value=original_doc,
+			),
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.get_refund_totals",
+				return_value={"Successful": 20, "Queued": 50},
+			),
+		):
+			with self.assertRaises(frappe.ValidationError):
+				pos_invoice.validate_sumup_return_refund(return_doc)
+
 	def test_validate_refund_currency_mismatch(self):
 		return_doc = DummyReturnDoc(currency="EUR")
 		original_doc = DummyOriginalDoc(sumup_currency="USD", currency="USD")
@@ -105,7 +124,7 @@ class TestSumUpReturnRefund(FrappeTestCase):
 			self._patch_defaults(),
 			self._patch_settings(),
 			patch(
-				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.get_doc",
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._get_sumup_invoice",
 				return_value=original_doc,
 			),
 		):
@@ -120,7 +139,7 @@ class TestSumUpReturnRefund(FrappeTestCase):
 			self._patch_defaults(),
 			self._patch_settings(),
 			patch(
-				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.get_doc",
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._get_sumup_invoice",
 				return_value=original_doc,
 			),
 		):
@@ -137,7 +156,7 @@ class TestSumUpReturnRefund(FrappeTestCase):
 		client = DummyClient()
 		set_calls = []
 
-		def fake_get_doc(doctype, name):
+		def fake_get_invoice(name):
 			if name == return_doc.name:
 				return return_doc
 			if name == original_doc.name:
@@ -151,8 +170,8 @@ class TestSumUpReturnRefund(FrappeTestCase):
 			self._patch_defaults(),
 			self._patch_settings(),
 			patch(
-				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.get_doc",
-				side_effect=fake_get_doc,
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._get_sumup_invoice",
+				side_effect=fake_get_invoice,
 			),
 			patch(
 				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.db.set_value",
@@ -191,7 +210,7 @@ class TestSumUpReturnRefund(FrappeTestCase):
 		client = SimpleNamespace(transactions=FailingTransactions())
 		set_calls = []
 
-		def fake_get_doc(doctype, name):
+		def fake_get_invoice(name):
 			if name == return_doc.name:
 				return return_doc
 			if name == original_doc.name:
@@ -205,8 +224,8 @@ class TestSumUpReturnRefund(FrappeTestCase):
 			self._patch_defaults(),
 			self._patch_settings(),
 			patch(
-				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.get_doc",
-				side_effect=fake_get_doc,
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._get_sumup_invoice",
+				side_effect=fake_get_invoice,
 			),
 			patch(
 				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.db.set_value",
@@ -232,28 +251,27 @@ class TestSumUpReturnRefund(FrappeTestCase):
 		return_doc = DummyReturnDoc(sumup_refund_status="SUCCESSFUL")
 		original_doc = DummyOriginalDoc()
 
-		def fake_get_doc(doctype, name):
+		def fake_get_invoice(name):
 			if name == return_doc.name:
 				return return_doc
 			return original_doc
 
 		with (
 			patch(
-				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.get_doc",
-				side_effect=fake_get_doc,
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._get_sumup_invoice",
+				side_effect=fake_get_invoice,
 			),
 			self._patch_settings(),
 		):
 			with self.assertRaises(frappe.ValidationError):
 				pos_invoice.retry_sumup_return_refund(return_doc.name)
 
-	def test_retry_sets_pending_and_calls_execute(self):
+	def test_retry_requeues_refund_in_outbox(self):
 		return_doc = DummyReturnDoc(sumup_refund_status="FAILED")
 		original_doc = DummyOriginalDoc()
 		set_calls = []
-		attempt_calls = []
 
-		def fake_get_doc(doctype, name):
+		def fake_get_invoice(name):
 			if name == return_doc.name:
 				return return_doc
 			return original_doc
@@ -261,33 +279,29 @@ class TestSumUpReturnRefund(FrappeTestCase):
 		def fake_set_value(doctype, name, values, *args, **kwargs):
 			set_calls.append((doctype, name, values))
 
-		def fake_attempt(doc, context, raise_on_error):
-			attempt_calls.append((doc.name, context, raise_on_error))
-			return True
-
 		with (
 			self._patch_defaults(),
 			self._patch_settings(),
 			patch(
-				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.get_doc",
-				side_effect=fake_get_doc,
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._get_sumup_invoice",
+				side_effect=fake_get_invoice,
 			),
 			patch(
 				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.db.set_value",
 				side_effect=fake_set_value,
 			),
+			patch("erpnext_sumup.erpnext_sumup.pos.pos_invoice.queue_sumup_refund") as queue,
 			patch(
 				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._attempt_sumup_return_refund",
-				side_effect=fake_attempt,
-			),
-			patch(
-				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.db.get_value",
-				return_value="PENDING",
-			),
+			) as attempt,
 		):
 			result = pos_invoice.retry_sumup_return_refund(return_doc.name)
 
-		self.assertEqual([call[0] for call in attempt_calls], [return_doc.name])
+		attempt.assert_not_called()
+		queue.assert_called_once()
+		self.assertEqual(queue.call_args.kwargs["return_invoice"], return_doc.name)
+		self.assertEqual(queue.call_args.kwargs["amount"], 50)
+		self.assertTrue(queue.call_args.kwargs["retry_failed"])
 		self.assertTrue(
 			any(
 				call[1] == return_doc.name
@@ -297,3 +311,89 @@ class TestSumUpReturnRefund(FrappeTestCase):
 			)
 		)
 		self.assertEqual(result.get("status"), "PENDING")
+
+	def test_execute_refund_skips_refund_recorded_as_successful(self):
+		return_doc = DummyReturnDoc(sumup_refund_status="PENDING", grand_total=-10, rounded_total=-10)
+		context = {"transaction_id": "TX-1", "refund_amount": 10, "refunded_total": 0}
+		client = DummyClient()
+		set_calls = []
+
+		def fake_set_value(doctype, name, values, *args, **kwargs):
+			set_calls.append((doctype, name, values))
+
+		with (
+			self._patch_settings(),
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.get_refund_status",
+				return_value="Successful",
+			),
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.db.set_value",
+				side_effect=fake_set_value,
+			),
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.get_sumup_client",
+				return_value=client,
+			) as get_client,
+		):
+			succeeded = pos_invoice._attempt_sumup_return_refund(return_doc, context, raise_on_error=True)
+
+		self.assertTrue(succeeded)
+		get_client.assert_not_called()
+		self.assertEqual(return_doc.sumup_refund_status, "SUCCESSFUL")
+
+	def test_retry_uses_recorded_refund_without_reload(self):
+		return_doc = DummyReturnDoc(sumup_refund_status="FAILED")
+		recorded = frappe._dict(name="REF-1", status="Successful", amount=50, transaction_id="TX-1")
+
+		with (
+			self._patch_settings(),
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._get_sumup_invoice",
+				return_value=return_doc,
+			) as get_invoice,
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.get_recorded_refund",
+				return_value=recorded,
+			),
+			patch("erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.db.set_value"),
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._attempt_sumup_return_refund",
+			) as attempt,
+		):
+			result = pos_invoice.retry_sumup_return_refund(return_doc.name)
+
+		get_invoice.assert_called_once_with(return_doc.name)
+		attempt.assert_not_called()
+		self.assertEqual(result.get("status"), "SUCCESSFUL")
+
+	def test_preview_is_served_from_cache_until_the_return_is_saved(self):
+		return_doc = DummyReturnDoc(name="RET-PREVIEW", grand_total=-25, rounded_total=-25, docstatus=0)
+		row = frappe._dict(
+			name=return_doc.name,
+			is_return=1,
+			return_against="INV-1",
+			currency="EUR",
+			grand_total=-25,
+			rounded_total=-25,
+			sumup_transaction_id="TX-1",
+		)
+		pos_invoice.clear_refund_preview_cache(return_doc)
+
+		with (
+			self._patch_defaults(),
+			self._patch_settings(),
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice._get_return_rows",
+				return_value={return_doc.name: row},
+			) as get_rows,
+		):
+			first = pos_invoice.get_sumup_return_refund_preview(return_doc.name)
+			second = pos_invoice.get_sumup_return_refund_preview(return_doc.name)
+			pos_invoice.clear_refund_preview_cache(return_doc)
+			pos_invoice.get_sumup_return_refund_preview(return_doc.name)
+
+		self.assertEqual(first, {"needs_refund": True, "amount": 25, "currency": "EUR"})
+		self.assertEqual(second, first)
+		self.assertEqual(get_rows.call_count, 2)
+		pos_invoice.clear_refund_preview_cache(return_doc)
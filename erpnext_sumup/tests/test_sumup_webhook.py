@@ -0,0 +1,131 @@
+# Copyright (c) 2025, RocketQuackIT and Contributors
+# See license.txt
+
+from types import SimpleNamespace
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_sumup.erpnext_sumup.pos import pos_invoice
+
+
+class TestSumUpWebhook(FrappeTestCase):
+	def _patch_settings(self, *, enabled=True, webhooks=True):
+		return patch(
+			"erpnext_sumup.erpnext_sumup.pos.pos_invoice.get_sumup_settings",
+			return_value=SimpleNamespace(
+				enabled=1 if enabled else 0,
+				enable_webhooks=1 if webhooks else 0,
+			),
+		)
+
+	def _patch_invoice(self, client_transaction_id="CTX-1"):
+		return patch(
+			"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.db.get_value",
+			return_value=frappe._dict(
+				name="INV-1",
+				owner="cashier@example.com",
+				sumup_client_transaction_id=client_transaction_id,
+			),
+		)
+
+	def test_webhook_url_contains_valid_token(self):
+		url = pos_invoice._get_sumup_webhook_url("INV-1")
+		query = parse_qs(urlparse(url).query)
+		self.assertEqual(query["pos_invoice"], ["INV-1"])
+		self.assertEqual(query["token"], [pos_invoice._get_sumup_webhook_token("INV-1")])
+		self.assertNotEqual(
+			pos_invoice._get_sumup_webhook_token("INV-1"),
+			pos_invoice._get_sumup_webhook_token("INV-2"),
+		)
+
+	def test_invalid_token_is_rejected(self):
+		with self._patch_settings(), self.assertRaises(frappe.AuthenticationError):
+			pos_invoice.handle_sumup_webhook(pos_invoice="INV-1", token="invalid")
+
+	def test_mismatched_transaction_is_ignored(self):
+		token = pos_invoice._get_sumup_webhook_token("INV-1")
+		with (
+			self._patch_settings(),
+			self._patch_invoice(),
+			patch.object(pos_invoice, "get_sumup_payment_status") as status_lookup,
+		):
+			result = pos_invoice.handle_sumup_webhook(
+				pos_invoice="INV-1",
+				token=token,
+				payload={"client_transaction_id": "CTX-OTHER", "status": "successful"},
+			)
+
+		self.assertEqual(result["status"], "ignored")
+		status_lookup.assert_not_called()
+
+	def test_verified_event_updates_and_publishes(self):
+		token = pos_invoice._get_sumup_webhook_token("INV-1")
+		published = []
+
+		def fake_publish(event, message, **kwargs):
+			published.append((event, message, kwargs))
+
+		with (
+			self._patch_settings(),
+			self._patch_invoice(),
+			patch.object(
+				pos_invoice,
+				"get_sumup_payment_status",
+				return_value={"status": "SUCCESSFUL", "transaction_id": "TX-1"},
+			) as status_lookup,
+			patch(
+				"erpnext_sumup.erpnext_sumup.pos.pos_invoice.frappe.publish_realtime",
+				side_effect=fake_publish,
+			),
+		):
+			result = pos_invoice.handle_sumup_webhook(
+				pos_invoice="INV-1",
+				token=token,
+				payload={"client_transaction_id": "CTX-1", "status": "successful"},
+			)
+
+		self.assertEqual(result["status"], "ok")
+		status_lookup.assert_called_once_with("INV-1")
+		self.assertEqual(len(published), 1)
+		event, message, kwargs = published[0]
+		self.assertEqual(event, "sumup_payment_status")
+		self.assertEqual(message["pos_invoice"], "INV-1")
+		self.assertEqual(message["status"], "SUCCESSFUL")
+		self.assertEqual(kwargs["user"], "cashier@example.com")
+
+	def test_disabled_webhooks_are_ignored(self):
+		token = pos_invoice._get_sumup_webhook_token("INV-1")
+		with (
+			self._patch_settings(webhooks=False),
+			patch.object(pos_invoice, "get_sumup_payment_status") as status_lookup,
+		):
+			result = pos_invoice.handle_sumup_webhook(pos_invoice="INV-1", token=token)
+
+		self.assertEqual(result["status"], "ignored")
+		status_lookup.assert_not_called()
+
+	def test_resumed_checkout_reports_webhooks(self):
+		doc = SimpleNamespace(
+			name="INV-1",
+			docstatus=0,
+			pos_profile="POS-1",
+			payments=[SimpleNamespace(mode_of_payment="SumUp", amount=10)],
+			grand_total=10,
+			rounded_total=10,
+			sumup_status="PENDING",
+			sumup_client_transaction_id="CTX-1",
+		)
+		with (
+			self._patch_settings(),
+			patch.object(pos_invoice.frappe, "get_doc", return_value=doc),
+			patch.object(pos_invoice.frappe, "get_cached_doc"),
+			patch.object(pos_invoice, "_get_sumup_payment_modes", return_value={"SumUp"}),
+			patch.object(pos_invoice.frappe.db, "get_default", return_value=0),
+		):
+			result = pos_invoice.start_sumup_payment("INV-1")
+
+		self.assertEqual(result["status"], "PENDING")
+		self.assertTrue(result["webhook"])